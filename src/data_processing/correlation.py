@@ -4,12 +4,10 @@ Computes and stores correlation coefficients between health metrics
 """
 
 import logging
-import warnings
 from typing import Dict, List, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
-from scipy.stats import pearsonr, spearmanr
-from scipy.stats import t as t_dist
+from scipy.special import stdtr
 from sqlalchemy.orm import Session
 
 from ..database import get_session, crud
@@ -17,6 +15,57 @@ from ..database import get_session, crud
 logger = logging.getLogger(__name__)
 
 
+def _correlation_p_value(correlation: float, sample_size: int) -> float:
+    """Two-sided p-value of a correlation coefficient from its t-statistic with n - 2 degrees of freedom"""
+    if sample_size <= 2:
+        return 1.0
+    if abs(correlation) >= 1.0:
+        return 0.0
+    t_stat = correlation * np.sqrt((sample_size - 2) / ((1.0 - correlation) * (1.0 + correlation)))
+    # stdtr is the Student t CDF without the overhead of the scipy.stats distribution wrapper
+    return float(2 * stdtr(sample_size - 2, -abs(t_stat)))
+
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    """Rank a NaN-free 1-D array, or each column of a 2-D one, from 1 with ties averaged (scipy's rankdata)"""
+    # Average ranks do not depend on the order within ties, so the unstable default sort is enough
+    columns = np.ascontiguousarray(np.atleast_2d(values.T))
+    n_columns, n = columns.shape
+    order = np.argsort(columns, axis=1)
+    sorted_columns = np.take_along_axis(columns, order, axis=1)
+    tied = sorted_columns[:, 1:] == sorted_columns[:, :-1]
+    positions = np.arange(n)
+    
+    if tied.any():
+        # Each run of equal values gets the mean of the first and last sorted position it spans
+        edge = np.ones((n_columns, 1), dtype=bool)
+        starts = np.where(np.hstack((edge, ~tied)), positions, 0)
+        np.maximum.accumulate(starts, axis=1, out=starts)
+        ends = np.where(np.hstack((~tied, edge)), positions, n)[:, ::-1]
+        ends = np.minimum.accumulate(ends, axis=1)[:, ::-1]
+        sorted_ranks = (starts + ends) / 2 + 1
+    else:
+        sorted_ranks = np.broadcast_to(positions + 1.0, (n_columns, n))
+    
+    ranks = np.empty((n_columns, n))
+    np.put_along_axis(ranks, order, sorted_ranks, axis=1)
+    return ranks.T if values.ndim == 2 else ranks[0]
+
+
+def _centred_correlation(values: np.ndarray) -> np.ndarray:
+    """Pearson correlation between the columns of a complete 2-D array from one centred matrix product"""
+    centered = values - values.mean(axis=0)
+    covariance = centered.T @ centered
+    scale = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = np.clip(covariance / np.outer(scale, scale), -1.0, 1.0)
+    
+    # Match pandas: an exact 1 on the diagonal, NaN for constant columns
+    diagonal = np.diag_indices_from(correlation)
+    correlation[diagonal] = np.where(scale > 0, 1.0, np.nan)
+    return correlation
+
+
 class CorrelationAnalyzer:
     """Analyzes correlations between health metrics"""
     
@@ -48,44 +97,18 @@ class CorrelationAnalyzer:
             raise ValueError("Insufficient valid data points (need at least 2)")
         
         try:
-            # Suppress warnings and handle SVD convergence issues
-            with warnings.catch_warnings():
-                warnings.filterwarnings('ignore', category=RuntimeWarning)
-                warnings.filterwarnings('ignore', message='.*SVD.*')
-                try:
-                    correlation, p_value = pearsonr(x_clean, y_clean)
-                    # Check if result is valid (not NaN)
-                    if np.isnan(correlation) or np.isnan(p_value):
-                        raise ValueError("Correlation computation resulted in NaN values")
-                    # If we got here, correlation was computed successfully
-                    return float(correlation), float(p_value), len(x_clean)
-                except (np.linalg.LinAlgError, ValueError) as e:
-                    # If SVD fails, try alternative computation
-                    logger.warning(f"SVD convergence issue in Pearson correlation, using alternative method: {e}")
-                    # Use manual computation as fallback
-                    x_mean = np.mean(x_clean)
-                    y_mean = np.mean(y_clean)
-                    x_centered = x_clean - x_mean
-                    y_centered = y_clean - y_mean
-                    
-                    numerator = np.sum(x_centered * y_centered)
-                    x_std = np.std(x_clean, ddof=1)
-                    y_std = np.std(y_clean, ddof=1)
-                    
-                    if x_std == 0 or y_std == 0:
-                        raise ValueError("Cannot compute correlation: one or both variables have zero variance")
-                    
-                    correlation = numerator / (len(x_clean) - 1) / (x_std * y_std)
-                    correlation = np.clip(correlation, -1.0, 1.0)
-                    
-                    # Approximate p-value using t-test (for large samples)
-                    if len(x_clean) > 2:
-                        t_stat = correlation * np.sqrt((len(x_clean) - 2) / (1 - correlation**2))
-                        p_value = 2 * (1 - t_dist.cdf(abs(t_stat), len(x_clean) - 2))
-                    else:
-                        p_value = 1.0
-                    
-                    return float(correlation), float(p_value), len(x_clean)
+            # Constant input has no correlation; centring it can leave rounding noise instead of zeros
+            if (x_clean == x_clean[0]).all() or (y_clean == y_clean[0]).all():
+                raise ValueError("Cannot compute correlation: one or both variables have zero variance")
+            
+            # Two passes: centre each variable, then three dot products
+            x_centred = x_clean - x_clean.mean()
+            y_centred = y_clean - y_clean.mean()
+            x_ss = np.dot(x_centred, x_centred)
+            y_ss = np.dot(y_centred, y_centred)
+            
+            correlation = float(np.clip(np.dot(x_centred, y_centred) / np.sqrt(x_ss * y_ss), -1.0, 1.0))
+            return correlation, _correlation_p_value(correlation, len(x_clean)), len(x_clean)
         except Exception as e:
             logger.error(f"Error computing Pearson correlation: {e}")
             raise
@@ -93,9 +116,10 @@ class CorrelationAnalyzer:
     def compute_spearman_correlation(
         self,
         x: Union[pd.Series, np.ndarray, List[float]],
-        y: Union[pd.Series, np.ndarray, List[float]]
-    ) -> Tuple[float, float, int]:
-        """Compute Spearman rank correlation coefficient"""
+        y: Union[pd.Series, np.ndarray, List[float]],
+        compute_pvalue: bool = True
+    ) -> Tuple[float, Optional[float], int]:
+        """Compute Spearman rank correlation coefficient; the p-value is None when compute_pvalue is False"""
         if isinstance(x, (pd.Series, pd.DataFrame)):
             x = x.values
         if isinstance(y, (pd.Series, pd.DataFrame)):
@@ -115,49 +139,21 @@ class CorrelationAnalyzer:
             raise ValueError("Insufficient valid data points (need at least 2)")
         
         try:
-            # Suppress warnings and handle SVD convergence issues
-            with warnings.catch_warnings():
-                warnings.filterwarnings('ignore', category=RuntimeWarning)
-                warnings.filterwarnings('ignore', message='.*SVD.*')
-                try:
-                    correlation, p_value = spearmanr(x_clean, y_clean)
-                    # Check if result is valid (not NaN)
-                    if np.isnan(correlation) or np.isnan(p_value):
-                        raise ValueError("Correlation computation resulted in NaN values")
-                    # If we got here, correlation was computed successfully
-                    return float(correlation), float(p_value), len(x_clean)
-                except (np.linalg.LinAlgError, ValueError) as e:
-                    # If SVD fails, use rank-based computation manually
-                    logger.warning(f"SVD convergence issue in Spearman correlation, using alternative method: {e}")
-                    # Manual Spearman computation using ranks
-                    from scipy.stats import rankdata
-                    x_ranks = rankdata(x_clean)
-                    y_ranks = rankdata(y_clean)
-                    
-                    # Compute Pearson correlation on ranks
-                    x_rank_mean = np.mean(x_ranks)
-                    y_rank_mean = np.mean(y_ranks)
-                    x_rank_centered = x_ranks - x_rank_mean
-                    y_rank_centered = y_ranks - y_rank_mean
-                    
-                    numerator = np.sum(x_rank_centered * y_rank_centered)
-                    x_rank_std = np.std(x_ranks, ddof=1)
-                    y_rank_std = np.std(y_ranks, ddof=1)
-                    
-                    if x_rank_std == 0 or y_rank_std == 0:
-                        raise ValueError("Cannot compute correlation: one or both variables have zero variance")
-                    
-                    correlation = numerator / (len(x_clean) - 1) / (x_rank_std * y_rank_std)
-                    correlation = np.clip(correlation, -1.0, 1.0)
-                    
-                    # Approximate p-value using t-test (for large samples)
-                    if len(x_clean) > 2:
-                        t_stat = correlation * np.sqrt((len(x_clean) - 2) / (1 - correlation**2))
-                        p_value = 2 * (1 - t_dist.cdf(abs(t_stat), len(x_clean) - 2))
-                    else:
-                        p_value = 1.0
-                    
-                    return float(correlation), float(p_value), len(x_clean)
+            # Rank each variable once; Spearman is Pearson on the (tie-averaged) ranks
+            x_ranks = _average_ranks(x_clean)
+            y_ranks = _average_ranks(y_clean)
+            
+            x_ranks -= x_ranks.mean()
+            y_ranks -= y_ranks.mean()
+            x_ss = np.dot(x_ranks, x_ranks)
+            y_ss = np.dot(y_ranks, y_ranks)
+            
+            if x_ss == 0 or y_ss == 0:
+                raise ValueError("Cannot compute correlation: one or both variables have zero variance")
+            
+            correlation = float(np.clip(np.dot(x_ranks, y_ranks) / np.sqrt(x_ss * y_ss), -1.0, 1.0))
+            p_value = _correlation_p_value(correlation, len(x_clean)) if compute_pvalue else None
+            return correlation, p_value, len(x_clean)
         except Exception as e:
             logger.error(f"Error computing Spearman correlation: {e}")
             raise
@@ -179,8 +175,19 @@ class CorrelationAnalyzer:
             raise ValueError("Need at least 2 metrics for correlation matrix")
         
         data_subset = data[metrics]
-        correlation_matrix = data_subset.corr(method=method)
-        return correlation_matrix
+        if method.lower() not in ('pearson', 'spearman'):
+            return data_subset.corr(method=method)
+        
+        values = data_subset.to_numpy(dtype=np.float64)
+        
+        # pandas drops missing values pair by pair; only complete data can share one centred product
+        if np.isnan(values).any():
+            return data_subset.corr(method=method)
+        
+        if method.lower() == 'spearman':
+            values = _average_ranks(values)
+        
+        return pd.DataFrame(_centred_correlation(values), index=data_subset.columns, columns=data_subset.columns)
     
     def analyze_metric_pair(
         self,
@@ -216,29 +223,33 @@ class CorrelationAnalyzer:
         }
         
         if store_in_db:
-            session = self.session or get_session()
-            should_close = self.session is None
-            
-            try:
-                crud.insert_correlation_result(
-                    session=session,
-                    metric1=metric1,
-                    metric2=metric2,
-                    correlation_value=correlation,
-                    correlation_type=method.lower(),
-                    sample_size=sample_size,
-                    p_value=p_value
-                )
-                session.commit()
-            except Exception as e:
-                logger.error(f"Error storing correlation result: {e}")
-                session.rollback()
-            finally:
-                if should_close:
-                    session.close()
+            self._store_correlation_result(result)
         
         return result
     
+    def _store_correlation_result(self, result: Dict[str, any]) -> None:
+        """Insert one pair result into the database, logging rather than raising on failure"""
+        session = self.session or get_session()
+        should_close = self.session is None
+        
+        try:
+            crud.insert_correlation_result(
+                session=session,
+                metric1=result['metric1'],
+                metric2=result['metric2'],
+                correlation_value=result['correlation'],
+                correlation_type=result['method'],
+                sample_size=result['sample_size'],
+                p_value=result['p_value']
+            )
+            session.commit()
+        except Exception as e:
+            logger.error(f"Error storing correlation result: {e}")
+            session.rollback()
+        finally:
+            if should_close:
+                session.close()
+    
     def analyze_multiple_pairs(
         self,
         data: pd.DataFrame,
@@ -248,12 +259,30 @@ class CorrelationAnalyzer:
     ) -> List[Dict[str, any]]:
         """Analyze correlations for multiple metric pairs"""
         results = []
+        matrix, positions = self._complete_case_matrix(data, metric_pairs, method)
+        sample_size = len(data)
         
         for metric1, metric2 in metric_pairs:
             try:
-                result = self.analyze_metric_pair(
-                    data, metric1, metric2, method, store_in_db
-                )
+                if metric1 in positions and metric2 in positions:
+                    correlation = matrix[positions[metric1], positions[metric2]]
+                    if np.isnan(correlation):
+                        raise ValueError("Cannot compute correlation: one or both variables have zero variance")
+                    
+                    result = {
+                        'metric1': metric1,
+                        'metric2': metric2,
+                        'correlation': float(correlation),
+                        'p_value': _correlation_p_value(correlation, sample_size),
+                        'sample_size': sample_size,
+                        'method': method.lower()
+                    }
+                    if store_in_db:
+                        self._store_correlation_result(result)
+                else:
+                    result = self.analyze_metric_pair(
+                        data, metric1, metric2, method, store_in_db
+                    )
                 results.append(result)
             except Exception as e:
                 logger.error(f"Error analyzing {metric1} vs {metric2}: {e}")
@@ -265,6 +294,31 @@ class CorrelationAnalyzer:
         
         return results
     
+    def _complete_case_matrix(
+        self,
+        data: pd.DataFrame,
+        metric_pairs: List[Tuple[str, str]],
+        method: str
+    ) -> Tuple[Optional[np.ndarray], Dict[str, int]]:
+        """Correlate every metric named in the pairs at once; empty positions when the pairs need pairwise handling"""
+        metrics = list(dict.fromkeys(
+            metric for pair in metric_pairs for metric in pair if metric in data.columns
+        ))
+        if (method.lower() not in ('pearson', 'spearman') or len(data) < 2 or not metrics
+                or not all(pd.api.types.is_numeric_dtype(data[metric]) for metric in metrics)):
+            return None, {}
+        
+        values = data[metrics].to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        # Missing values are dropped pair by pair, so each pair would have its own sample
+        if np.isnan(values).any():
+            return None, {}
+        
+        if method.lower() == 'spearman':
+            values = _average_ranks(values)
+        
+        return _centred_correlation(values), {metric: i for i, metric in enumerate(metrics)}
+    
     def get_correlation_summary(
         self,
         data: pd.DataFrame,
@@ -274,34 +328,41 @@ class CorrelationAnalyzer:
     ) -> pd.DataFrame:
         """Get summary of significant correlations"""
         corr_matrix = self.compute_correlation_matrix(data, method=method, metrics=metrics)
+        columns = corr_matrix.columns
+        correlations = corr_matrix.to_numpy()
+        
+        # Slice the metrics once and read each pair by position
+        values = data[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Without missing values every pair shares one sample, so its p-value follows from the matrix entry
+        complete = method.lower() in ('pearson', 'spearman') and not np.isnan(values).any()
         
         summary_data = []
         
-        for i, metric1 in enumerate(corr_matrix.columns):
-            for j, metric2 in enumerate(corr_matrix.columns):
-                if i < j:
-                    correlation = corr_matrix.loc[metric1, metric2]
-                    
-                    if abs(correlation) >= min_correlation:
-                        try:
-                            x = data[metric1]
-                            y = data[metric2]
-                            
-                            if method.lower() == 'pearson':
-                                _, p_value, sample_size = self.compute_pearson_correlation(x, y)
-                            else:
-                                _, p_value, sample_size = self.compute_spearman_correlation(x, y)
-                            
-                            summary_data.append({
-                                'metric1': metric1,
-                                'metric2': metric2,
-                                'correlation': correlation,
-                                'p_value': p_value,
-                                'sample_size': sample_size,
-                                'abs_correlation': abs(correlation)
-                            })
-                        except Exception as e:
-                            logger.debug(f"Error computing p-value for {metric1} vs {metric2}: {e}")
+        for i, metric1 in enumerate(columns):
+            for j in range(i + 1, len(columns)):
+                metric2 = columns[j]
+                correlation = correlations[i, j]
+                
+                if abs(correlation) >= min_correlation:
+                    try:
+                        if complete:
+                            sample_size = len(values)
+                            p_value = _correlation_p_value(correlation, sample_size)
+                        elif method.lower() == 'pearson':
+                            _, p_value, sample_size = self.compute_pearson_correlation(values[:, i], values[:, j])
+                        else:
+                            _, p_value, sample_size = self.compute_spearman_correlation(values[:, i], values[:, j])
+                        
+                        summary_data.append({
+                            'metric1': metric1,
+                            'metric2': metric2,
+                            'correlation': correlation,
+                            'p_value': p_value,
+                            'sample_size': sample_size,
+                            'abs_correlation': abs(correlation)
+                        })
+                    except Exception as e:
+                        logger.debug(f"Error computing p-value for {metric1} vs {metric2}: {e}")
         
         if not summary_data:
             return pd.DataFrame()
@@ -3,18 +3,36 @@ CSV data loader module for MediAnalyze Pro
 Handles loading and parsing of CSV files with health data
 """
 
+import importlib.util
 import logging
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import IO, Dict, List, Optional, Tuple, Any, Union
 import pandas as pd
 import numpy as np
 
 from .validator import DataValidator, ValidationError
 
+# Optional pyarrow (multithreaded CSV parsing); pandas imports it for the engine itself
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
 logger = logging.getLogger(__name__)
 
+# Compact dtypes for the cardio dataset columns (nullable so missing values survive)
+_CARDIO_SCHEMA = {
+    'age': 'Int32',
+    'gender': 'Int8',
+    'ap_hi': 'Int16',
+    'ap_lo': 'Int16',
+    'cholesterol': 'Int8',
+    'gluc': 'Int8',
+    'smoke': 'Int8',
+    'alco': 'Int8',
+    'active': 'Int8',
+    'cardio': 'Int8'
+}
+
 
 class CSVLoader:
     """
@@ -70,20 +88,30 @@ class CSVLoader:
         self.skip_validation = skip_validation
         self.validator = DataValidator()
     
-    def detect_delimiter(self, file_path: str, sample_lines: int = 5) -> str:
+    def detect_delimiter(self, file_path: Union[str, IO], sample_lines: int = 5) -> str:
         """
         Auto-detect CSV delimiter by analyzing file content
         
         Args:
-            file_path: Path to CSV file
+            file_path: Path to CSV file or a seekable file-like object
             sample_lines: Number of lines to sample
         
         Returns:
             Detected delimiter
         """
         try:
-            with open(file_path, 'r', encoding=self.encoding) as f:
-                sample = ''.join(f.readline() for _ in range(sample_lines))
+            if hasattr(file_path, 'read'):
+                # Sample the buffer, then rewind so the full read starts at the same place
+                start = file_path.tell()
+                lines = [file_path.readline() for _ in range(sample_lines)]
+                file_path.seek(start)
+                sample = ''.join(
+                    line.decode(self.encoding) if isinstance(line, bytes) else line
+                    for line in lines
+                )
+            else:
+                with open(file_path, 'r', encoding=self.encoding) as f:
+                    sample = ''.join(f.readline() for _ in range(sample_lines))
             
             # Count occurrences of each delimiter
             delimiter_counts = {
@@ -107,7 +135,7 @@ class CSVLoader:
     
     def load_csv(
         self,
-        file_path: str,
+        file_path: Union[str, IO],
         delimiter: Optional[str] = None,
         encoding: Optional[str] = None,
         n_rows: Optional[int] = None
@@ -116,7 +144,7 @@ class CSVLoader:
         Load CSV file into pandas DataFrame
         
         Args:
-            file_path: Path to CSV file
+            file_path: Path to CSV file, or a seekable file-like object (e.g. io.BytesIO)
             delimiter: CSV delimiter (if None, uses instance default or auto-detects)
             encoding: File encoding (if None, uses instance default)
             n_rows: Number of rows to read (None = all rows)
@@ -128,8 +156,10 @@ class CSVLoader:
             FileNotFoundError: If file doesn't exist
             ValueError: If file cannot be parsed
         """
-        if not os.path.exists(file_path):
+        is_buffer = hasattr(file_path, 'read')
+        if not is_buffer and not os.path.exists(file_path):
             raise FileNotFoundError(f"CSV file not found: {file_path}")
+        start = file_path.tell() if is_buffer else None
         
         # Use provided parameters or fall back to instance defaults
         delimiter = delimiter or self.delimiter
@@ -142,28 +172,30 @@ class CSVLoader:
         try:
             logger.info(f"Loading CSV file: {file_path}")
             
+            read_kwargs = {
+                'delimiter': delimiter,
+                'encoding': encoding,
+                'na_values': ['', 'NA', 'N/A', 'null', 'NULL', 'None', 'nan', 'NaN']
+            }
+            # The pyarrow engine can't stop after n_rows
+            if HAS_PYARROW and n_rows is None:
+                read_kwargs['engine'] = 'pyarrow'
+            else:
+                read_kwargs.update(nrows=n_rows, low_memory=False)
+            
             # Read CSV with error handling
-            df = pd.read_csv(
-                file_path,
-                delimiter=delimiter,
-                encoding=encoding,
-                nrows=n_rows,
-                low_memory=False,
-                na_values=['', 'NA', 'N/A', 'null', 'NULL', 'None', 'nan', 'NaN']
-            )
+            try:
+                df = pd.read_csv(file_path, dtype=_CARDIO_SCHEMA, **read_kwargs)
+            except (ValueError, TypeError) as e:
+                # Values that don't fit the compact schema fall back to inferred dtypes
+                logger.debug(f"Compact schema not applicable ({e}), inferring dtypes")
+                if is_buffer:
+                    file_path.seek(start)
+                df = pd.read_csv(file_path, **read_kwargs)
             
             logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns")
             
-            # Normalize column names (lowercase, strip whitespace)
-            df.columns = df.columns.str.lower().str.strip()
-            
-            # Map columns to standard names
-            df = self._map_columns(df)
-            
-            # Clean data
-            df = self._clean_dataframe(df)
-            
-            return df
+            return self.prepare_dataframe(df)
             
         except pd.errors.EmptyDataError:
             raise ValueError(f"CSV file is empty: {file_path}")
@@ -172,6 +204,25 @@ class CSVLoader:
         except Exception as e:
             raise ValueError(f"Unexpected error loading CSV file {file_path}: {e}")
     
+    def prepare_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Normalize, map and clean a DataFrame read from a health data CSV
+        
+        Args:
+            df: DataFrame with raw CSV column names
+        
+        Returns:
+            DataFrame with internal column names and cleaned values
+        """
+        # Normalize column names (lowercase, strip whitespace)
+        df = df.rename(columns=lambda col: str(col).lower().strip())
+        
+        # Map columns to standard names
+        df = self._map_columns(df)
+        
+        # Clean data
+        return self._clean_dataframe(df)
+    
     def _map_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Map CSV columns to standard internal column names
@@ -248,7 +299,6 @@ class CSVLoader:
             Tuple of (is_valid, list_of_errors, validated_dataframe)
         """
         errors = []
-        valid_rows = []
         
         # Validate DataFrame structure
         is_valid, struct_errors = self.validator.validate_dataframe(df)
@@ -257,16 +307,10 @@ class CSVLoader:
             if strict:
                 return False, errors, df
         
-        # Validate each row
-        for idx, row in df.iterrows():
-            is_valid_row, row_errors = self.validator.validate_row(row, row_index=idx)
-            
-            if is_valid_row:
-                valid_rows.append(idx)
-            else:
-                errors.extend(row_errors)
-                if not strict:
-                    valid_rows.append(idx)  # Keep row even if invalid
+        # Validate all rows at once
+        valid_mask, row_errors = self.validator.validate_frame(df)
+        errors.extend(row_errors)
+        valid_rows = df.index[valid_mask] if strict else df.index
         
         # Filter DataFrame if strict mode
         if strict and errors:
@@ -284,7 +328,7 @@ class CSVLoader:
     
     def load_and_validate(
         self,
-        file_path: str,
+        file_path: Union[str, IO],
         strict_validation: bool = False,
         **kwargs
     ) -> Tuple[pd.DataFrame, List[str]]:
@@ -292,7 +336,7 @@ class CSVLoader:
         Load CSV file and validate data
         
         Args:
-            file_path: Path to CSV file
+            file_path: Path to CSV file or a seekable file-like object
             strict_validation: If True, remove invalid rows
             **kwargs: Additional arguments for load_csv()
         
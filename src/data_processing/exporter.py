@@ -28,6 +28,18 @@ class DataExporter:
         """
         self.retriever = retriever or DataRetriever()
     
+    @staticmethod
+    def _write_csv(df: pd.DataFrame, output_path: str) -> None:
+        """
+        Write a DataFrame to CSV without the index
+        
+        Args:
+            df: DataFrame to write
+            output_path: Output file path (parent directories are created)
+        """
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        df.to_csv(output_path, index=False)
+    
     def export_patients_to_csv(
         self,
         output_path: str,
@@ -59,11 +71,8 @@ class DataExporter:
                 logger.warning("No patients to export")
                 return False
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-            
             # Export to CSV
-            df.to_csv(output_path, index=False)
+            self._write_csv(df, output_path)
             
             logger.info(f"Exported {len(df)} patients to {output_path}")
             return True
@@ -103,11 +112,8 @@ class DataExporter:
                 logger.warning("No health metrics to export")
                 return False
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-            
             # Export to CSV
-            df.to_csv(output_path, index=False)
+            self._write_csv(df, output_path)
             
             logger.info(f"Exported {len(df)} health metrics to {output_path}")
             return True
@@ -168,11 +174,8 @@ class DataExporter:
             else:
                 combined_df = metrics_df
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-            
             # Export to CSV
-            combined_df.to_csv(output_path, index=False)
+            self._write_csv(combined_df, output_path)
             
             logger.info(f"Exported combined data ({len(combined_df)} rows) to {output_path}")
             return True
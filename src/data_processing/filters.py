@@ -4,13 +4,40 @@ Provides various filtering techniques for health data analysis
 """
 
 import logging
+from functools import lru_cache
 from typing import List, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
-from scipy.signal import savgol_filter
+from scipy.signal import savgol_coeffs, savgol_filter
 
 logger = logging.getLogger(__name__)
 
+# savgol_filter fits its 'interp' edges on the raw 0..window_length-1 grid, whose
+# polynomial columns span (window_length - 1) ** polyorder; past this span that fit
+# is ill-conditioned and the cached weights no longer reproduce it
+_SAVGOL_MAX_EDGE_SPAN = 1e6
+
+
+@lru_cache(maxsize=32)
+def _savgol_fit_weights(window_length: int, polyorder: int) -> np.ndarray:
+    """
+    Get cached Savitzky-Golay weights for every position in the window
+    
+    Args:
+        window_length: Odd window length in samples
+        polyorder: Order of the fitted polynomial
+    
+    Returns:
+        Read-only (window_length, window_length) array whose row k evaluates the
+        least-squares polynomial fit of one window at its k-th sample
+    """
+    weights = np.array([
+        savgol_coeffs(window_length, polyorder, pos=pos, use='dot')
+        for pos in range(window_length)
+    ]).reshape(window_length, window_length)
+    weights.setflags(write=False)
+    return weights
+
 
 class DataFilter:
     """
@@ -31,28 +58,56 @@ class DataFilter:
             data = data.values
         
         data = np.array(data, dtype=float)
+        valid = ~np.isnan(data)
         
-        if np.any(np.isnan(data)):
+        if not valid.all():
             logger.warning("Input data contains NaN values, they will be preserved")
         
         if center and window_size % 2 == 0:
             logger.warning(f"Window size {window_size} is even, adding 1 for centered window")
             window_size += 1
         
-        if center:
-            filtered = pd.Series(data).rolling(
+        if np.any(np.isinf(data)):
+            # Running sums cannot subtract an infinity back out; let pandas handle these windows
+            return pd.Series(data).rolling(
                 window=window_size,
-                center=True,
+                center=center,
                 min_periods=1
             ).mean().values
+        
+        # Samples before and after each position that fall in its window
+        if center:
+            lead = trail = window_size // 2
         else:
-            filtered = pd.Series(data).rolling(
-                window=window_size,
-                min_periods=1
-            ).mean().values
+            lead, trail = window_size - 1, 0
+        
+        # Window sums from running totals of the mean-centred data, which keeps the totals small
+        if valid.all():
+            offset = data.mean() if len(data) else 0.0
+            sums = DataFilter._window_sums(data - offset, lead, trail)
+            # Full windows in the middle, truncated ones at the edges like min_periods=1
+            positions = np.arange(len(data))
+            window_counts = np.minimum(positions + trail + 1, len(data)) - np.maximum(positions - lead, 0)
+        else:
+            offset = data[valid].mean() if valid.any() else 0.0
+            sums = DataFilter._window_sums(np.where(valid, data - offset, 0.0), lead, trail)
+            window_counts = DataFilter._window_sums(valid, lead, trail)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            filtered = sums / window_counts + offset
         
         return filtered
     
+    @staticmethod
+    def _window_sums(values: np.ndarray, lead: int, trail: int) -> np.ndarray:
+        """Sum of values[i - lead:i + trail + 1] for every i, from one running total padded with its edge values"""
+        n = len(values)
+        totals = np.empty(n + lead + trail + 1)
+        totals[:lead + 1] = 0.0
+        np.cumsum(values, out=totals[lead + 1:lead + 1 + n])
+        totals[lead + 1 + n:] = totals[lead + n]
+        return totals[lead + trail + 1:] - totals[:n]
+    
     @staticmethod
     def threshold_filter(
         data: Union[pd.Series, np.ndarray, List[float]],
@@ -111,8 +166,8 @@ class DataFilter:
             return data, np.ones(len(data), dtype=bool)
         
         if method == 'iqr':
-            Q1 = np.percentile(valid_data, 25)
-            Q3 = np.percentile(valid_data, 75)
+            # Both quartiles from one partition of the data
+            Q1, Q3 = np.percentile(valid_data, [25, 75])
             IQR = Q3 - Q1
             lower_bound = Q1 - threshold * IQR
             upper_bound = Q3 + threshold * IQR
@@ -137,7 +192,8 @@ class DataFilter:
             raise ValueError(f"Unknown outlier detection method: {method}")
         
         final_mask = valid_mask & outlier_mask
-        filtered = data.copy()
+        # data is already a private copy of the input, so outliers can be replaced in place
+        filtered = data
         
         if not np.all(final_mask):
             if replace_with == 'nan':
@@ -179,7 +235,18 @@ class DataFilter:
             raise ValueError("Polynomial order must be less than window length")
         
         try:
-            filtered = savgol_filter(data, window_length, polyorder)
+            if (window_length - 1) ** polyorder > _SAVGOL_MAX_EDGE_SPAN:
+                return savgol_filter(data, window_length, polyorder)
+            
+            weights = _savgol_fit_weights(window_length, polyorder)
+            half = window_length // 2
+            filtered = np.empty_like(data)
+            
+            # Interior samples use the centre row as a kernel; the edges evaluate the fit of the
+            # first and last full windows, matching savgol_filter's default 'interp' mode
+            filtered[half:len(data) - half] = np.convolve(data, weights[half][::-1], mode='valid')
+            filtered[:half] = weights[:half] @ data[:window_length]
+            filtered[len(data) - half:] = weights[window_length - half:] @ data[len(data) - window_length:]
             return filtered
         except Exception as e:
             logger.error(f"Error applying Savitzky-Golay filter: {e}")
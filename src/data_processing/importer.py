@@ -3,18 +3,45 @@ Data import module for MediAnalyze Pro
 Handles bulk import of CSV data into the database
 """
 
+import csv
+import io
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
+import numpy as np
 import pandas as pd
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from ..database import get_session, crud
+from ..database import get_session, Patient, HealthMetric
 from .csv_loader import CSVLoader
 from .validator import DataValidator
 
 logger = logging.getLogger(__name__)
 
+# Imported columns as (name, converter, value used when missing)
+_PATIENT_FIELDS = (
+    ('age', int, None),
+    ('gender', int, None),
+    ('height', float, None),
+    ('weight', float, None)
+)
+_METRIC_FIELDS = (
+    ('systolic_bp', int, None),
+    ('diastolic_bp', int, None),
+    ('heart_rate', int, None),
+    ('body_temperature', float, None),
+    ('oxygen_saturation', float, None),
+    ('cholesterol', int, None),
+    ('glucose', int, None),
+    ('smoking', bool, False),
+    ('alcohol_intake', bool, False),
+    ('physical_activity', bool, False),
+    ('cardiovascular_disease', bool, None)
+)
+_PATIENT_KEYS = tuple(field[0] for field in _PATIENT_FIELDS) + ('name',)
+_METRIC_KEYS = tuple(field[0] for field in _METRIC_FIELDS)
+
 
 class DataImporter:
     """
@@ -58,7 +85,79 @@ class DataImporter:
             csv_file_path: Path to CSV file
             create_patients: Whether to create patient records
             create_health_metrics: Whether to create health metric records
-            progress_callback: Optional callback function(processed, total, message)
+            progress_callback: Optional callback function(processed, total, message),
+                called once after each batch is committed
+        
+        Returns:
+            Dictionary with import statistics
+        """
+        # Load and validate CSV
+        logger.info("Loading CSV file: %s", csv_file_path)
+        df, validation_errors = self.csv_loader.load_and_validate(
+            csv_file_path,
+            strict_validation=False
+        )
+        
+        return self._import_frame(
+            df,
+            validation_errors,
+            create_patients,
+            create_health_metrics,
+            progress_callback
+        )
+    
+    def import_from_dataframe(
+        self,
+        df: pd.DataFrame,
+        create_patients: bool = True,
+        create_health_metrics: bool = True,
+        progress_callback: Optional[callable] = None
+    ) -> Dict[str, Any]:
+        """
+        Import data already held in a DataFrame into database
+        
+        Args:
+            df: DataFrame with CSV (e.g. ap_hi, gluc) or internal column names
+            create_patients: Whether to create patient records
+            create_health_metrics: Whether to create health metric records
+            progress_callback: Optional callback function(processed, total, message),
+                called once after each batch is committed
+        
+        Returns:
+            Dictionary with import statistics
+        """
+        df = self.csv_loader.prepare_dataframe(df)
+        
+        validation_errors = []
+        if not self.csv_loader.skip_validation:
+            _, validation_errors, df = self.csv_loader.validate_loaded_data(df)
+        
+        return self._import_frame(
+            df,
+            validation_errors,
+            create_patients,
+            create_health_metrics,
+            progress_callback
+        )
+    
+    def _import_frame(
+        self,
+        df: pd.DataFrame,
+        validation_errors: List[str],
+        create_patients: bool,
+        create_health_metrics: bool,
+        progress_callback: Optional[callable]
+    ) -> Dict[str, Any]:
+        """
+        Import a loaded and validated DataFrame in batches
+        
+        Args:
+            df: DataFrame with internal column names
+            validation_errors: Validation messages reported as warnings
+            create_patients: Whether to create patient records
+            create_health_metrics: Whether to create health metric records
+            progress_callback: Optional callback function(processed, total, message),
+                called once after each batch is committed
         
         Returns:
             Dictionary with import statistics
@@ -78,16 +177,9 @@ class DataImporter:
         should_close_session = self.session is None
         
         try:
-            # Load and validate CSV
-            logger.info(f"Loading CSV file: {csv_file_path}")
-            df, validation_errors = self.csv_loader.load_and_validate(
-                csv_file_path,
-                strict_validation=False
-            )
-            
             if validation_errors:
                 stats['warnings'].extend(validation_errors[:10])  # Limit warnings
-                logger.warning(f"Found {len(validation_errors)} validation warnings")
+                logger.warning("Found %d validation warnings", len(validation_errors))
             
             stats['total_rows'] = len(df)
             
@@ -103,13 +195,6 @@ class DataImporter:
                 end_idx = min(start_idx + self.batch_size, len(df))
                 batch_df = df.iloc[start_idx:end_idx]
                 
-                if progress_callback:
-                    progress_callback(
-                        start_idx,
-                        len(df),
-                        f"Processing batch {batch_num + 1}/{total_batches}"
-                    )
-                
                 # Process batch
                 batch_stats = self._process_batch(
                     session,
@@ -127,17 +212,25 @@ class DataImporter:
                 
                 # Commit batch
                 session.commit()
-                logger.debug(f"Committed batch {batch_num + 1}/{total_batches}")
+                logger.debug("Committed batch %d/%d", batch_num + 1, total_batches)
+                
+                if progress_callback:
+                    progress_callback(
+                        end_idx,
+                        len(df),
+                        f"Imported batch {batch_num + 1}/{total_batches}"
+                    )
             
             logger.info(
-                f"Import complete: {stats['patients_created']} patients, "
-                f"{stats['health_metrics_created']} health metrics"
+                "Import complete: %d patients, %d health metrics",
+                stats['patients_created'],
+                stats['health_metrics_created']
             )
             
             return stats
             
         except Exception as e:
-            logger.error(f"Error during import: {e}", exc_info=True)
+            logger.error("Error during import: %s", e, exc_info=True)
             session.rollback()
             stats['errors'].append(str(e))
             raise
@@ -172,75 +265,171 @@ class DataImporter:
             'errors': []
         }
         
-        # Create patient mapping (to avoid duplicates within batch)
+        # Rows to insert, with patients deduplicated within the batch
+        patient_rows = []
         patient_cache = {}
+        metric_rows = []
+        metric_patients = []
+        
+        # Validate the whole batch once, then look results up per row
+        patient_valid, _ = self.validator.validate_patient_frame(batch_df)
+        health_valid, health_codes = self.validator.validate_health_frame(batch_df)
+        
+        # Convert each column to Python values once, then walk plain tuples
+        names = (
+            batch_df['name'].astype(object).where(batch_df['name'].notna(), None).tolist()
+            if 'name' in batch_df.columns else [None] * len(batch_df)
+        )
+        patient_tuples = zip(
+            *[self._column_values(batch_df, *field) for field in _PATIENT_FIELDS], names
+        )
+        metric_tuples = zip(
+            *[self._column_values(batch_df, *field) for field in _METRIC_FIELDS]
+        )
         
-        for idx, row in batch_df.iterrows():
-            try:
-                # Extract patient data
-                patient_data = self._extract_patient_data(row)
+        # One try per batch; a failure anywhere rolls back and skips the whole batch
+        try:
+            for pos, (idx, patient_values, metric_values) in enumerate(
+                zip(batch_df.index, patient_tuples, metric_tuples)
+            ):
+                patient_data = dict(zip(_PATIENT_KEYS, patient_values))
                 
-                # Get or create patient
-                patient = None
+                # Find or queue patient
+                patient_pos = None
                 if create_patients:
-                    patient = self._get_or_create_patient(
-                        session,
+                    patient_pos = self._queue_patient(
                         patient_data,
+                        patient_valid[pos],
+                        patient_rows,
                         patient_cache,
                         batch_stats
                     )
                 
-                # Create health metrics
-                if create_health_metrics and patient:
-                    health_metric = self._create_health_metric(session, row, patient.patient_id)
-                    if health_metric:
-                        batch_stats['health_metrics_created'] += 1
+                # Queue health metrics
+                if create_health_metrics and patient_pos is not None:
+                    if health_valid[pos]:
+                        metric_rows.append(dict(zip(_METRIC_KEYS, metric_values)))
+                        metric_patients.append(patient_pos)
                     else:
+                        logger.debug("Skipping invalid health metric in row %s: code %s", idx, health_codes[pos])
                         batch_stats['health_metrics_skipped'] += 1
-                
-            except Exception as e:
-                error_msg = f"Error processing row {idx}: {e}"
-                logger.error(error_msg)
-                batch_stats['errors'].append(error_msg)
+            
+            if not patient_rows:
+                return batch_stats
+            
+            # One multi-row INSERT per table; RETURNING hands back the new ids
+            patient_ids = session.execute(
+                insert(Patient).returning(Patient.patient_id, sort_by_parameter_order=True),
+                patient_rows
+            ).scalars().all()
+            batch_stats['patients_created'] += len(patient_ids)
+            
+            if metric_rows:
+                for health_data, patient_pos in zip(metric_rows, metric_patients):
+                    health_data['patient_id'] = patient_ids[patient_pos]
+                self._insert_metrics(session, metric_rows)
+                batch_stats['health_metrics_created'] += len(metric_rows)
+        except Exception as e:
+            session.rollback()
+            error_msg = f"Error importing batch: {e}"
+            logger.error(error_msg)
+            batch_stats['errors'].append(error_msg)
+            batch_stats['patients_skipped'] += len(patient_rows)
+            batch_stats['health_metrics_skipped'] += len(metric_rows)
         
         return batch_stats
     
-    def _extract_patient_data(self, row: pd.Series) -> Dict[str, Any]:
+    def _insert_metrics(self, session: Session, metric_rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert health metric rows, streaming them with COPY on PostgreSQL
+        
+        Args:
+            session: Database session
+            metric_rows: Health metric rows with patient_id set
+        """
+        if session.get_bind().dialect.name != 'postgresql':
+            session.execute(insert(HealthMetric), metric_rows)
+            return
+        
+        # COPY bypasses the ORM, so fill in the Python-side column defaults
+        now = datetime.utcnow()
+        columns = ('patient_id',) + _METRIC_KEYS + ('timestamp', 'created_at')
+        for row in metric_rows:
+            row['timestamp'] = row['created_at'] = now
+        
+        buffer = self._copy_buffer(metric_rows, columns)
+        sql = (
+            f"COPY {HealthMetric.__tablename__} ({', '.join(columns)}) "
+            "FROM STDIN WITH (FORMAT csv)"
+        )
+        cursor = session.connection().connection.cursor()
+        try:
+            if hasattr(cursor, 'copy_expert'):  # psycopg2
+                cursor.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _copy_buffer(rows: List[Dict[str, Any]], columns: Tuple[str, ...]) -> io.StringIO:
         """
-        Extract patient data from row
+        Serialize rows as CSV for COPY FROM STDIN (None becomes an unquoted empty field, i.e. NULL)
         
         Args:
-            row: DataFrame row
+            rows: Row dictionaries
+            columns: Columns to write, in COPY column order
         
         Returns:
-            Dictionary with patient data
+            Buffer positioned at the start
         """
-        return {
-            'age': int(row.get('age', 0)) if pd.notna(row.get('age')) else None,
-            'gender': int(row.get('gender', 0)) if pd.notna(row.get('gender')) else None,
-            'height': float(row.get('height', 0)) if pd.notna(row.get('height')) else None,
-            'weight': float(row.get('weight', 0)) if pd.notna(row.get('weight')) else None,
-            'name': row.get('name') if pd.notna(row.get('name')) else None
-        }
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+        buffer.seek(0)
+        return buffer
     
-    def _get_or_create_patient(
+    @staticmethod
+    def _column_values(df: pd.DataFrame, column: str, convert: type, default: Any) -> List[Any]:
+        """
+        Convert a numeric column to a list of Python values
+        
+        Args:
+            df: DataFrame batch
+            column: Column name
+            convert: Python type for present values (int, float or bool)
+            default: Value for missing entries or a missing column
+        
+        Returns:
+            List with one value per row
+        """
+        if column not in df.columns:
+            return [default] * len(df)
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        return [convert(value) if value == value else default for value in values]
+    
+    def _queue_patient(
         self,
-        session: Session,
         patient_data: Dict[str, Any],
-        patient_cache: Dict[Tuple, Any],
+        is_valid: bool,
+        patient_rows: List[Dict[str, Any]],
+        patient_cache: Dict[Tuple, int],
         stats: Dict[str, Any]
-    ) -> Optional[Any]:
+    ) -> Optional[int]:
         """
-        Get existing patient or create new one
+        Find patient in this batch or queue it for insertion
         
         Args:
-            session: Database session
             patient_data: Patient data dictionary
-            patient_cache: Cache of created patients in this batch
+            is_valid: Result of validate_patient_frame() for this row
+            patient_rows: Patient rows queued for insertion
+            patient_cache: Positions in patient_rows keyed by patient values
             stats: Statistics dictionary to update
         
         Returns:
-            Patient object or None
+            Position of the patient in patient_rows or None if invalid
         """
         # Create cache key (age, gender, height, weight)
         cache_key = (
@@ -254,69 +443,13 @@ class DataImporter:
         if cache_key in patient_cache:
             return patient_cache[cache_key]
         
-        # Validate patient data
-        is_valid, errors = self.validator.validate_patient_data(**patient_data)
-        if not is_valid:
-            logger.debug(f"Skipping invalid patient data: {errors}")
+        # Missing values pass validation but the patient columns are NOT NULL
+        if not is_valid or None in cache_key:
+            logger.debug("Skipping invalid patient data: %s", patient_data)
             stats['patients_skipped'] += 1
             return None
         
-        # Check for existing patient (simple check - could be improved)
         # For now, we'll create new patients (can be enhanced with duplicate detection)
-        try:
-            patient = crud.insert_patient_data(
-                session=session,
-                **patient_data
-            )
-            patient_cache[cache_key] = patient
-            stats['patients_created'] += 1
-            return patient
-        except Exception as e:
-            logger.error(f"Error creating patient: {e}")
-            stats['patients_skipped'] += 1
-            return None
-    
-    def _create_health_metric(
-        self,
-        session: Session,
-        row: pd.Series,
-        patient_id: int
-    ) -> Optional[Any]:
-        """
-        Create health metric from row
-        
-        Args:
-            session: Database session
-            row: DataFrame row
-            patient_id: Patient ID
-        
-        Returns:
-            HealthMetric object or None
-        """
-        # Extract health metric data
-        health_data = {
-            'patient_id': patient_id,
-            'systolic_bp': int(row.get('systolic_bp', 0)) if pd.notna(row.get('systolic_bp')) else None,
-            'diastolic_bp': int(row.get('diastolic_bp', 0)) if pd.notna(row.get('diastolic_bp')) else None,
-            'heart_rate': int(row.get('heart_rate', 0)) if pd.notna(row.get('heart_rate')) else None,
-            'body_temperature': float(row.get('body_temperature', 0)) if pd.notna(row.get('body_temperature')) else None,
-            'oxygen_saturation': float(row.get('oxygen_saturation', 0)) if pd.notna(row.get('oxygen_saturation')) else None,
-            'cholesterol': int(row.get('cholesterol', 0)) if pd.notna(row.get('cholesterol')) else None,
-            'glucose': int(row.get('glucose', 0)) if pd.notna(row.get('glucose')) else None,
-            'smoking': bool(row.get('smoking', False)) if pd.notna(row.get('smoking')) else False,
-            'alcohol_intake': bool(row.get('alcohol_intake', False)) if pd.notna(row.get('alcohol_intake')) else False,
-            'physical_activity': bool(row.get('physical_activity', False)) if pd.notna(row.get('physical_activity')) else False,
-            'cardiovascular_disease': bool(row.get('cardiovascular_disease', False)) if pd.notna(row.get('cardiovascular_disease')) else None
-        }
-        
-        # Validate health data
-        is_valid, errors = self.validator.validate_health_metrics(**health_data)
-        if not is_valid:
-            logger.debug(f"Skipping invalid health metric: {errors}")
-            return None
-        
-        try:
-            return crud.insert_health_metrics(session=session, **health_data)
-        except Exception as e:
-            logger.error(f"Error creating health metric: {e}")
-            return None
+        patient_cache[cache_key] = len(patient_rows)
+        patient_rows.append(patient_data)
+        return patient_cache[cache_key]
@@ -7,8 +7,8 @@ import logging
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, or_, func, select
 
 from ..database import get_session, crud
 from ..database.models import Patient, HealthMetric
@@ -21,6 +21,20 @@ class DataRetriever:
     Retrieves data from database with flexible filtering options
     """
     
+    # Columns returned by the DataFrame variants of the getters
+    PATIENT_COLUMNS = [
+        Patient.patient_id, Patient.name, Patient.age, Patient.gender,
+        Patient.height, Patient.weight, Patient.created_at
+    ]
+    HEALTH_METRIC_COLUMNS = [
+        HealthMetric.metric_id, HealthMetric.patient_id, HealthMetric.timestamp,
+        HealthMetric.systolic_bp, HealthMetric.diastolic_bp, HealthMetric.heart_rate,
+        HealthMetric.body_temperature, HealthMetric.oxygen_saturation,
+        HealthMetric.cholesterol, HealthMetric.glucose, HealthMetric.smoking,
+        HealthMetric.alcohol_intake, HealthMetric.physical_activity,
+        HealthMetric.cardiovascular_disease
+    ]
+    
     def __init__(self, session: Optional[Session] = None):
         """
         Initialize data retriever
@@ -39,7 +53,10 @@ class DataRetriever:
         min_bmi: Optional[float] = None,
         max_bmi: Optional[float] = None,
         limit: Optional[int] = None,
-        as_dataframe: bool = False
+        as_dataframe: bool = False,
+        include_metrics: bool = False,
+        include_images: bool = False,
+        include_signals: bool = False
     ) -> Any:
         """
         Retrieve patients with optional filters
@@ -53,6 +70,9 @@ class DataRetriever:
             max_bmi: Maximum BMI
             limit: Maximum number of results
             as_dataframe: Return as pandas DataFrame
+            include_metrics: Eager-load each patient's health metrics
+            include_images: Eager-load each patient's medical images
+            include_signals: Eager-load each patient's biomedical signals
         
         Returns:
             List of Patient objects or DataFrame
@@ -61,47 +81,46 @@ class DataRetriever:
         should_close = self.session is None
         
         try:
-            # Build query
-            query = session.query(Patient)
+            # Build filters
+            filters = []
             
             if patient_ids:
-                query = query.filter(Patient.patient_id.in_(patient_ids))
+                filters.append(Patient.patient_id.in_(patient_ids))
             
             if gender:
-                query = query.filter(Patient.gender == gender)
+                filters.append(Patient.gender == gender)
             
             if min_age:
-                query = query.filter(Patient.age >= min_age)
+                filters.append(Patient.age >= min_age)
             
             if max_age:
-                query = query.filter(Patient.age <= max_age)
+                filters.append(Patient.age <= max_age)
             
-            # BMI filtering (requires calculation)
+            # BMI = weight (kg) / (height (m))^2, computed by the database
             if min_bmi or max_bmi:
-                # BMI = weight (kg) / (height (m))^2
-                # We need to filter after calculating BMI
-                patients = query.all()
-                filtered = []
-                
-                for patient in patients:
-                    height_m = patient.height / 100.0  # Convert cm to m
-                    bmi = patient.weight / (height_m ** 2)
-                    
-                    if min_bmi and bmi < min_bmi:
-                        continue
-                    if max_bmi and bmi > max_bmi:
-                        continue
-                    
-                    filtered.append(patient)
-                
-                patients = filtered
-            else:
-                patients = query.limit(limit).all() if limit else query.all()
+                height_m = Patient.height / 100.0  # Convert cm to m
+                bmi = Patient.weight / (height_m * height_m)
+                if min_bmi:
+                    filters.append(bmi >= min_bmi)
+                if max_bmi:
+                    filters.append(bmi <= max_bmi)
             
             if as_dataframe:
-                return self._patients_to_dataframe(patients)
+                # Read rows straight into pandas, skipping ORM object construction
+                stmt = select(*self.PATIENT_COLUMNS).where(*filters)
+                return self._read_dataframe(session, stmt, limit)
+            
+            # One IN query per relationship instead of a lazy load per patient
+            options = []
+            if include_metrics:
+                options.append(selectinload(Patient.health_metrics))
+            if include_images:
+                options.append(selectinload(Patient.medical_images))
+            if include_signals:
+                options.append(selectinload(Patient.biomedical_signals))
             
-            return patients
+            query = session.query(Patient).options(*options).filter(*filters)
+            return query.limit(limit).all() if limit else query.all()
             
         finally:
             if should_close:
@@ -142,46 +161,49 @@ class DataRetriever:
         should_close = self.session is None
         
         try:
-            # Build query
-            query = session.query(HealthMetric)
+            # Build filters
+            filters = []
             
             if patient_ids:
-                query = query.filter(HealthMetric.patient_id.in_(patient_ids))
+                filters.append(HealthMetric.patient_id.in_(patient_ids))
             
             if start_date:
-                query = query.filter(HealthMetric.timestamp >= start_date)
+                filters.append(HealthMetric.timestamp >= start_date)
             
             if end_date:
-                query = query.filter(HealthMetric.timestamp <= end_date)
+                filters.append(HealthMetric.timestamp <= end_date)
             
             if min_systolic_bp:
-                query = query.filter(HealthMetric.systolic_bp >= min_systolic_bp)
+                filters.append(HealthMetric.systolic_bp >= min_systolic_bp)
             
             if max_systolic_bp:
-                query = query.filter(HealthMetric.systolic_bp <= max_systolic_bp)
+                filters.append(HealthMetric.systolic_bp <= max_systolic_bp)
             
             if min_diastolic_bp:
-                query = query.filter(HealthMetric.diastolic_bp >= min_diastolic_bp)
+                filters.append(HealthMetric.diastolic_bp >= min_diastolic_bp)
             
             if max_diastolic_bp:
-                query = query.filter(HealthMetric.diastolic_bp <= max_diastolic_bp)
+                filters.append(HealthMetric.diastolic_bp <= max_diastolic_bp)
             
             if has_cardiovascular_disease is not None:
-                query = query.filter(
+                filters.append(
                     HealthMetric.cardiovascular_disease == has_cardiovascular_disease
                 )
             
+            if as_dataframe:
+                # Read rows straight into pandas, skipping ORM object construction
+                stmt = select(*self.HEALTH_METRIC_COLUMNS).where(*filters).order_by(
+                    HealthMetric.timestamp.desc()
+                )
+                return self._read_dataframe(session, stmt, limit)
+            
+            query = session.query(HealthMetric).filter(*filters)
             query = query.order_by(HealthMetric.timestamp.desc())
             
             if limit:
                 query = query.limit(limit)
             
-            metrics = query.all()
-            
-            if as_dataframe:
-                return self._health_metrics_to_dataframe(metrics)
-            
-            return metrics
+            return query.all()
             
         finally:
             if should_close:
@@ -283,24 +305,21 @@ class DataRetriever:
                 session.close()
     
     @staticmethod
-    def _patients_to_dataframe(patients: List[Patient]) -> pd.DataFrame:
-        """Convert list of Patient objects to DataFrame"""
-        if not patients:
-            return pd.DataFrame()
+    def _read_dataframe(session: Session, stmt, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Run a Core select on the session's connection and load it into a DataFrame
         
-        data = []
-        for patient in patients:
-            data.append({
-                'patient_id': patient.patient_id,
-                'name': patient.name,
-                'age': patient.age,
-                'gender': patient.gender,
-                'height': patient.height,
-                'weight': patient.weight,
-                'created_at': patient.created_at
-            })
+        Args:
+            session: Database session
+            stmt: SQLAlchemy select statement
+            limit: Maximum number of results
         
-        return pd.DataFrame(data)
+        Returns:
+            DataFrame with one column per selected column
+        """
+        if limit:
+            stmt = stmt.limit(limit)
+        return pd.read_sql_query(stmt, session.connection())
     
     @staticmethod
     def _health_metrics_to_dataframe(metrics: List[HealthMetric]) -> pd.DataFrame:
@@ -50,34 +50,29 @@ class TimeSeriesAnalyzer:
             return {'slope': 0.0, 'intercept': 0.0, 'r_squared': 0.0}
         
         if method == 'linear':
-            x = np.arange(len(valid_data))
-            y = valid_data.values
+            y = valid_data.to_numpy(dtype=np.float64)
+            n = len(y)
             
-            n = len(x)
-            sum_x = np.sum(x)
-            sum_y = np.sum(y)
-            sum_xy = np.sum(x * y)
-            sum_x2 = np.sum(x ** 2)
+            # Least squares on x = 0..n-1 in centred form, which avoids the integer
+            # overflow of sum(x)**2 on long series; sum((x - x_mean)**2) is n(n^2 - 1)/12
+            x_centred = np.arange(n) - (n - 1) / 2
+            y_mean = y.mean()
+            y_centred = y - y_mean
+            s_xx = n * (n * n - 1) / 12
+            s_xy = float(np.dot(x_centred, y_centred))
+            s_yy = float(np.dot(y_centred, y_centred))
             
-            denominator = n * sum_x2 - sum_x ** 2
-            if denominator == 0:
-                slope = 0.0
-                intercept = np.mean(y)
-            else:
-                slope = (n * sum_xy - sum_x * sum_y) / denominator
-                intercept = (sum_y - slope * sum_x) / n
-            
-            y_pred = slope * x + intercept
-            ss_res = np.sum((y - y_pred) ** 2)
-            ss_tot = np.sum((y - np.mean(y)) ** 2)
-            r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0.0
+            slope = s_xy / s_xx
+            intercept = y_mean - slope * (n - 1) / 2
+            # Equal to 1 - ss_res / ss_tot for a least-squares line
+            r_squared = min(s_xy * s_xy / (s_xx * s_yy), 1.0) if s_yy != 0 else 0.0
             
             return {
                 'slope': float(slope),
                 'intercept': float(intercept),
                 'r_squared': float(r_squared),
-                'mean': float(np.mean(y)),
-                'std': float(np.std(y))
+                'mean': float(y_mean),
+                'std': float(np.sqrt(s_yy / n))
             }
         
         elif method == 'mean':
@@ -100,34 +95,36 @@ class TimeSeriesAnalyzer:
         threshold: float = 3.0
     ) -> Tuple[pd.Series, pd.Series]:
         """Detect anomalies in time-series data"""
-        valid_data = data.dropna()
+        # Work on the raw values; NaNs compare False, so they are never flagged
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid_data = values[~np.isnan(values)]
         
         if len(valid_data) < 3:
             return pd.Series([False] * len(data), index=data.index), pd.Series([], dtype=float)
         
         if method == 'zscore':
             mean = valid_data.mean()
-            std = valid_data.std()
+            std = valid_data.std(ddof=1)
             
             if std == 0:
                 return pd.Series([False] * len(data), index=data.index), pd.Series([], dtype=float)
             
-            z_scores = np.abs((data - mean) / std)
-            anomaly_mask = z_scores > threshold
+            z_scores = np.abs((values - mean) / std)
+            anomalies = z_scores > threshold
         
         elif method == 'iqr':
-            Q1 = valid_data.quantile(0.25)
-            Q3 = valid_data.quantile(0.75)
+            Q1, Q3 = np.percentile(valid_data, [25, 75])
             IQR = Q3 - Q1
             
             lower_bound = Q1 - threshold * IQR
             upper_bound = Q3 + threshold * IQR
             
-            anomaly_mask = (data < lower_bound) | (data > upper_bound)
+            anomalies = (values < lower_bound) | (values > upper_bound)
         
         else:
             raise ValueError(f"Unknown anomaly detection method: {method}")
         
+        anomaly_mask = pd.Series(anomalies, index=data.index, name=data.name)
         anomaly_values = data[anomaly_mask]
         return anomaly_mask, anomaly_values
     
@@ -197,7 +194,21 @@ class TimeSeriesAnalyzer:
         period: int = 1
     ) -> pd.Series:
         """Compute rate of change in time-series"""
-        return data.pct_change(periods=period) * 100
+        # Same result as data.pct_change(periods=period) * 100, without the shifted intermediate Series
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+        shift = min(abs(period), len(values))
+        previous = np.full_like(values, np.nan)
+        if period >= 0:
+            previous[shift:] = values[:len(values) - shift]
+        else:
+            previous[:len(values) - shift] = values[shift:]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.divide(values, previous, out=previous)
+        rate -= 1
+        rate *= 100
+        
+        return pd.Series(rate, index=data.index, name=data.name)
     
     @staticmethod
     def analyze_patient_timeseries(
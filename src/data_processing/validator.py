@@ -6,6 +6,7 @@ Provides comprehensive validation for health data and patient information
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -44,6 +45,22 @@ class DataValidator:
     VALID_CHOLESTEROL = [1, 2, 3]  # 1=normal, 2=above normal, 3=well above normal
     VALID_GLUCOSE = [1, 2, 3]  # Same as cholesterol
     
+    # Error bits reported by validate_patient_frame()
+    AGE_ERROR = 1
+    GENDER_ERROR = 2
+    HEIGHT_ERROR = 4
+    WEIGHT_ERROR = 8
+    
+    # Error bits reported by validate_health_frame()
+    SYSTOLIC_BP_ERROR = 1
+    DIASTOLIC_BP_ERROR = 2
+    BP_ORDER_ERROR = 4
+    HEART_RATE_ERROR = 8
+    TEMPERATURE_ERROR = 16
+    OXYGEN_SAT_ERROR = 32
+    CHOLESTEROL_ERROR = 64
+    GLUCOSE_ERROR = 128
+    
     @classmethod
     def validate_patient_data(
         cls,
@@ -212,6 +229,140 @@ class DataValidator:
         
         return len(errors) == 0, errors
     
+    @staticmethod
+    def _out_of_range(df: pd.DataFrame, column: str, low: float, high: float) -> np.ndarray:
+        """
+        Flag present values of a column that are non-numeric or outside [low, high]
+        
+        Args:
+            df: DataFrame to check
+            column: Column name (missing columns pass)
+            low: Minimum allowed value
+            high: Maximum allowed value
+        
+        Returns:
+            Boolean array, True for failing rows
+        """
+        if column not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        values = df[column]
+        numeric = pd.to_numeric(values, errors='coerce')
+        return (values.notna() & ~numeric.between(low, high)).to_numpy(dtype=bool, na_value=False)
+    
+    @staticmethod
+    def _not_in(df: pd.DataFrame, column: str, allowed: List[int]) -> np.ndarray:
+        """
+        Flag present values of a column that are not one of the allowed codes
+        
+        Args:
+            df: DataFrame to check
+            column: Column name (missing columns pass)
+            allowed: Allowed values
+        
+        Returns:
+            Boolean array, True for failing rows
+        """
+        if column not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        values = df[column]
+        numeric = pd.to_numeric(values, errors='coerce')
+        return (values.notna() & ~numeric.isin(allowed)).to_numpy(dtype=bool, na_value=False)
+    
+    @classmethod
+    def validate_patient_frame(cls, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Validate patient columns of a whole DataFrame at once
+        
+        Missing values pass, as they do in validate_patient_data().
+        
+        Args:
+            df: DataFrame with age, gender, height and weight columns
+        
+        Returns:
+            Tuple of (valid_mask, error_codes) where error_codes is an int8
+            array of AGE_ERROR/GENDER_ERROR/HEIGHT_ERROR/WEIGHT_ERROR bits
+        """
+        codes = np.zeros(len(df), dtype=np.int8)
+        codes[cls._out_of_range(df, 'age', cls.AGE_MIN_DAYS, cls.AGE_MAX_DAYS)] |= cls.AGE_ERROR
+        codes[cls._not_in(df, 'gender', cls.VALID_GENDERS)] |= cls.GENDER_ERROR
+        codes[cls._out_of_range(df, 'height', cls.HEIGHT_MIN_CM, cls.HEIGHT_MAX_CM)] |= cls.HEIGHT_ERROR
+        codes[cls._out_of_range(df, 'weight', cls.WEIGHT_MIN_KG, cls.WEIGHT_MAX_KG)] |= cls.WEIGHT_ERROR
+        return codes == 0, codes
+    
+    @classmethod
+    def validate_health_frame(cls, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Validate health metric columns of a whole DataFrame at once
+        
+        Args:
+            df: DataFrame with internal health metric column names
+        
+        Returns:
+            Tuple of (valid_mask, error_codes) where error_codes is a uint8
+            array of the *_ERROR health bits
+        """
+        codes = np.zeros(len(df), dtype=np.uint8)
+        codes[cls._out_of_range(df, 'systolic_bp', cls.SYSTOLIC_BP_MIN, cls.SYSTOLIC_BP_MAX)] |= cls.SYSTOLIC_BP_ERROR
+        codes[cls._out_of_range(df, 'diastolic_bp', cls.DIASTOLIC_BP_MIN, cls.DIASTOLIC_BP_MAX)] |= cls.DIASTOLIC_BP_ERROR
+        if 'systolic_bp' in df.columns and 'diastolic_bp' in df.columns:
+            systolic = pd.to_numeric(df['systolic_bp'], errors='coerce')
+            diastolic = pd.to_numeric(df['diastolic_bp'], errors='coerce')
+            codes[(systolic < diastolic).to_numpy(dtype=bool, na_value=False)] |= cls.BP_ORDER_ERROR
+        codes[cls._out_of_range(df, 'heart_rate', cls.HEART_RATE_MIN, cls.HEART_RATE_MAX)] |= cls.HEART_RATE_ERROR
+        codes[cls._out_of_range(df, 'body_temperature', cls.TEMPERATURE_MIN, cls.TEMPERATURE_MAX)] |= cls.TEMPERATURE_ERROR
+        codes[cls._out_of_range(df, 'oxygen_saturation', cls.OXYGEN_SAT_MIN, cls.OXYGEN_SAT_MAX)] |= cls.OXYGEN_SAT_ERROR
+        codes[cls._not_in(df, 'cholesterol', cls.VALID_CHOLESTEROL)] |= cls.CHOLESTEROL_ERROR
+        codes[cls._not_in(df, 'glucose', cls.VALID_GLUCOSE)] |= cls.GLUCOSE_ERROR
+        return codes == 0, codes
+    
+    @classmethod
+    def validate_frame(cls, df: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+        """
+        Validate patient and health columns of a DataFrame
+        
+        Error messages are only built for the failing rows.
+        
+        Args:
+            df: DataFrame with internal column names
+        
+        Returns:
+            Tuple of (valid_mask, list_of_errors)
+        """
+        patient_valid, patient_codes = cls.validate_patient_frame(df)
+        health_valid, health_codes = cls.validate_health_frame(df)
+        
+        patient_checks = [
+            (cls.AGE_ERROR, 'age', f"Age must be between {cls.AGE_MIN_DAYS} and {cls.AGE_MAX_DAYS} days"),
+            (cls.GENDER_ERROR, 'gender', f"Gender must be one of {cls.VALID_GENDERS}"),
+            (cls.HEIGHT_ERROR, 'height', f"Height must be between {cls.HEIGHT_MIN_CM} and {cls.HEIGHT_MAX_CM} cm"),
+            (cls.WEIGHT_ERROR, 'weight', f"Weight must be between {cls.WEIGHT_MIN_KG} and {cls.WEIGHT_MAX_KG} kg")
+        ]
+        health_checks = [
+            (cls.SYSTOLIC_BP_ERROR, 'systolic_bp',
+             f"Systolic BP must be between {cls.SYSTOLIC_BP_MIN} and {cls.SYSTOLIC_BP_MAX}"),
+            (cls.DIASTOLIC_BP_ERROR, 'diastolic_bp',
+             f"Diastolic BP must be between {cls.DIASTOLIC_BP_MIN} and {cls.DIASTOLIC_BP_MAX}"),
+            (cls.BP_ORDER_ERROR, 'systolic_bp', "Systolic BP must be >= Diastolic BP"),
+            (cls.HEART_RATE_ERROR, 'heart_rate',
+             f"Heart rate must be between {cls.HEART_RATE_MIN} and {cls.HEART_RATE_MAX} bpm"),
+            (cls.TEMPERATURE_ERROR, 'body_temperature',
+             f"Body temperature must be between {cls.TEMPERATURE_MIN} and {cls.TEMPERATURE_MAX} °C"),
+            (cls.OXYGEN_SAT_ERROR, 'oxygen_saturation',
+             f"Oxygen saturation must be between {cls.OXYGEN_SAT_MIN} and {cls.OXYGEN_SAT_MAX}%"),
+            (cls.CHOLESTEROL_ERROR, 'cholesterol', f"Cholesterol must be one of {cls.VALID_CHOLESTEROL}"),
+            (cls.GLUCOSE_ERROR, 'glucose', f"Glucose must be one of {cls.VALID_GLUCOSE}")
+        ]
+        
+        errors = []
+        for pos in np.flatnonzero(~(patient_valid & health_valid)):
+            row_label = f"Row {df.index[pos]}"
+            for codes, checks in ((patient_codes, patient_checks), (health_codes, health_checks)):
+                for bit, column, message in checks:
+                    if codes[pos] & bit:
+                        errors.append(f"{row_label}: {message}, got {df[column].iloc[pos]}")
+        
+        return patient_valid & health_valid, errors
+    
     @classmethod
     def validate_dataframe(
         cls,
@@ -3,7 +3,10 @@ Database module for MediAnalyze Pro
 Handles database connections, schema, and CRUD operations
 """
 
-from .connection import DatabaseConnection, get_db_connection, get_session
+from .connection import (
+    DatabaseConnection, get_db_connection, get_session,
+    get_scoped_session, remove_scoped_session
+)
 from .models import (
     Base, Patient, HealthMetric, MedicalImage,
     BiomedicalSignal, CorrelationResult, SpectrumAnalysis
@@ -15,6 +18,8 @@ __all__ = [
     'DatabaseConnection',
     'get_db_connection',
     'get_session',
+    'get_scoped_session',
+    'remove_scoped_session',
     'Base',
     'Patient',
     'HealthMetric',
@@ -4,14 +4,22 @@ Handles database connections and session management
 """
 
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from typing import FrozenSet, Optional
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from .models import Base
 
 # Default database path
 DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'medanalyze.db')
 
+# Environment variable overriding the default database URL (e.g. 'sqlite:///:memory:')
+DATABASE_URL_ENV = 'MEDIANALYZE_DATABASE_URL'
+
+# Rows per multi-row INSERT statement; matches the importer's default batch size
+# so each imported batch is sent as a single statement
+INSERT_PAGE_SIZE = 1000
+
 
 class DatabaseConnection:
     """Manages database connections and sessions"""
@@ -21,9 +29,13 @@ class DatabaseConnection:
         Initialize database connection
         
         Args:
-            database_url: SQLite database URL (default: uses DEFAULT_DB_PATH)
+            database_url: SQLite database URL (default: the MEDIANALYZE_DATABASE_URL
+                         environment variable, else DEFAULT_DB_PATH)
                          Format: 'sqlite:///path/to/database.db'
         """
+        if database_url is None:
+            database_url = os.environ.get(DATABASE_URL_ENV)
+        
         if database_url is None:
             # Use default SQLite database
             db_path = DEFAULT_DB_PATH
@@ -37,29 +49,85 @@ class DatabaseConnection:
                 database_url,
                 connect_args={'check_same_thread': False},
                 poolclass=StaticPool,
+                insertmanyvalues_page_size=INSERT_PAGE_SIZE,
                 echo=False  # Set to True for SQL query logging
             )
+            event.listen(self.engine, 'connect', self._configure_sqlite)
         else:
             # For PostgreSQL/MySQL
-            self.engine = create_engine(database_url, echo=False)
+            self.engine = create_engine(
+                database_url,
+                insertmanyvalues_page_size=INSERT_PAGE_SIZE,
+                echo=False
+            )
         
         # Create session factory
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        
+        # Thread-local session reused across calls until remove_scoped_session();
+        # attributes stay loaded after commit so reads don't trigger a refresh SELECT
+        self.ScopedSession = scoped_session(
+            sessionmaker(autoflush=False, bind=self.engine, expire_on_commit=False)
+        )
+        
+        # Table names from the last inspection (reset when the schema changes)
+        self._tables_cache: Optional[FrozenSet[str]] = None
+    
+    @staticmethod
+    def _configure_sqlite(dbapi_connection, connection_record):
+        """
+        Tune each new SQLite connection for local ingest workloads
+        
+        WAL with synchronous=NORMAL syncs at checkpoints instead of on every
+        commit; deployments that need full durability should use FULL.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")  # 64 MB
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
     
     def create_tables(self):
         """Create all database tables"""
         Base.metadata.create_all(bind=self.engine)
+        # create_all skips tables that already exist, so add any indexes they lack
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+        self._tables_cache = None
     
     def drop_tables(self):
         """Drop all database tables (use with caution!)"""
         Base.metadata.drop_all(bind=self.engine)
+        self._tables_cache = None
+    
+    def get_table_names(self, refresh: bool = False) -> FrozenSet[str]:
+        """
+        Get the names of the tables in the database
+        
+        Args:
+            refresh: Re-inspect the database instead of using the cached names
+        
+        Returns:
+            Set of table names
+        """
+        if refresh or self._tables_cache is None:
+            self._tables_cache = frozenset(inspect(self.engine).get_table_names())
+        return self._tables_cache
     
     def get_session(self) -> Session:
         """Get a new database session"""
         return self.SessionLocal()
     
+    def get_scoped_session(self) -> Session:
+        """Get the session registered for the current thread"""
+        return self.ScopedSession()
+    
     def close(self):
         """Close the database connection"""
+        self.ScopedSession.remove()
         self.engine.dispose()
 
 
@@ -92,3 +160,23 @@ def get_session() -> Session:
     """
     db_conn = get_db_connection()
     return db_conn.get_session()
+
+
+def get_scoped_session() -> Session:
+    """
+    Get the current thread's long-lived session using the global connection
+    
+    Unlike get_session(), repeated calls return the same session until
+    remove_scoped_session() is called.
+    
+    Returns:
+        SQLAlchemy Session
+    """
+    db_conn = get_db_connection()
+    return db_conn.get_scoped_session()
+
+
+def remove_scoped_session():
+    """Close and discard the current thread's scoped session"""
+    if _db_connection is not None:
+        _db_connection.ScopedSession.remove()
@@ -5,7 +5,8 @@ Provides functions for Create, Read, Update, Delete operations
 
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, func, literal
+from sqlalchemy.dialects import postgresql, sqlite
 from datetime import datetime
 from .models import (
     Patient, HealthMetric, MedicalImage, BiomedicalSignal,
@@ -13,6 +14,26 @@ from .models import (
 )
 from .connection import get_session
 
+# Dialect INSERTs that support ON CONFLICT DO UPDATE, for single-statement upserts
+_UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def _save(session: Session, instance: Any = None, commit: bool = True) -> None:
+    """
+    Commit and refresh, or only flush when the caller manages the transaction
+    
+    Args:
+        session: Database session
+        instance: Object to refresh after committing
+        commit: Whether to commit the transaction
+    """
+    if commit:
+        session.commit()
+        if instance is not None:
+            session.refresh(instance)
+    else:
+        session.flush()
+
 
 # ==================== PATIENT CRUD OPERATIONS ====================
 
@@ -22,7 +43,8 @@ def insert_patient_data(
     gender: int,
     height: float,
     weight: float,
-    name: Optional[str] = None
+    name: Optional[str] = None,
+    commit: bool = True
 ) -> Patient:
     """
     Insert a new patient record
@@ -34,6 +56,7 @@ def insert_patient_data(
         height: Height in cm
         weight: Weight in kg
         name: Optional patient name
+        commit: Commit the change (False only flushes, leaving the commit to the caller)
     
     Returns:
         Created Patient object
@@ -46,8 +69,7 @@ def insert_patient_data(
         weight=weight
     )
     session.add(patient)
-    session.commit()
-    session.refresh(patient)
+    _save(session, patient, commit)
     return patient
 
 
@@ -91,6 +113,7 @@ def retrieve_patient_data(
 def update_patient_data(
     session: Session,
     patient_id: int,
+    commit: bool = True,
     **kwargs
 ) -> Optional[Patient]:
     """
@@ -99,6 +122,7 @@ def update_patient_data(
     Args:
         session: Database session
         patient_id: Patient ID to update
+        commit: Commit the change (False only flushes, leaving the commit to the caller)
         **kwargs: Fields to update (name, age, gender, height, weight)
     
     Returns:
@@ -114,18 +138,18 @@ def update_patient_data(
             setattr(patient, field, value)
     
     patient.updated_at = datetime.utcnow()
-    session.commit()
-    session.refresh(patient)
+    _save(session, patient, commit)
     return patient
 
 
-def delete_patient_data(session: Session, patient_id: int) -> bool:
+def delete_patient_data(session: Session, patient_id: int, commit: bool = True) -> bool:
     """
     Delete a patient record (cascades to related records)
     
     Args:
         session: Database session
         patient_id: Patient ID to delete
+        commit: Commit the change (False only flushes, leaving the commit to the caller)
     
     Returns:
         True if deleted, False if not found
@@ -135,7 +159,7 @@ def delete_patient_data(session: Session, patient_id: int) -> bool:
         return False
     
     session.delete(patient)
-    session.commit()
+    _save(session, commit=commit)
     return True
 
 
@@ -155,7 +179,8 @@ def insert_health_metrics(
     alcohol_intake: Optional[bool] = None,
     physical_activity: Optional[bool] = None,
     cardiovascular_disease: Optional[bool] = None,
-    timestamp: Optional[datetime] = None
+    timestamp: Optional[datetime] = None,
+    commit: bool = True
 ) -> HealthMetric:
     """
     Insert a new health metric record
@@ -175,6 +200,7 @@ def insert_health_metrics(
         physical_activity: Physical activity status
         cardiovascular_disease: Cardiovascular disease indicator
         timestamp: Measurement timestamp (default: now)
+        commit: Commit the change (False only flushes, leaving the commit to the caller)
     
     Returns:
         Created HealthMetric object
@@ -195,8 +221,7 @@ def insert_health_metrics(
         timestamp=timestamp or datetime.utcnow()
     )
     session.add(health_metric)
-    session.commit()
-    session.refresh(health_metric)
+    _save(session, health_metric, commit)
     return health_metric
 
 
@@ -237,6 +262,52 @@ def retrieve_health_metrics(
     return query.all()
 
 
+def patient_has_metrics(session: Session, patient_id: int) -> bool:
+    """
+    Check whether a patient has any health metrics without loading them
+    
+    Args:
+        session: Database session
+        patient_id: Patient ID
+    
+    Returns:
+        True if at least one health metric exists for the patient
+    """
+    return session.query(literal(1)).filter(
+        HealthMetric.patient_id == patient_id
+    ).first() is not None
+
+
+def count_health_metrics(
+    session: Session,
+    patient_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> int:
+    """
+    Count health metrics with the same filters as retrieve_health_metrics
+    
+    Args:
+        session: Database session
+        patient_id: Filter by patient ID
+        start_date: Filter by start date
+        end_date: Filter by end date
+    
+    Returns:
+        Number of matching health metrics
+    """
+    query = session.query(func.count(HealthMetric.metric_id))
+    
+    if patient_id:
+        query = query.filter(HealthMetric.patient_id == patient_id)
+    if start_date:
+        query = query.filter(HealthMetric.timestamp >= start_date)
+    if end_date:
+        query = query.filter(HealthMetric.timestamp <= end_date)
+    
+    return query.scalar()
+
+
 # ==================== MEDICAL IMAGES CRUD OPERATIONS ====================
 
 def insert_image_metadata(
@@ -249,7 +320,8 @@ def insert_image_metadata(
     file_size: Optional[int] = None,
     width: Optional[int] = None,
     height: Optional[int] = None,
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    commit: bool = True
 ) -> MedicalImage:
     """
     Insert medical image metadata
@@ -265,6 +337,7 @@ def insert_image_metadata(
         width: Image width in pixels
         height: Image height in pixels
         notes: Additional notes
+        commit: Commit the change (False only flushes, leaving the commit to the caller)
     
     Returns:
         Created MedicalImage object
@@ -282,8 +355,7 @@ def insert_image_metadata(
         notes=notes
     )
     session.add(medical_image)
-    session.commit()
-    session.refresh(medical_image)
+    _save(session, medical_image, commit)
     return medical_image
 
 
@@ -338,7 +410,8 @@ def insert_biomedical_signal(
     sampling_rate: Optional[float] = None,
     duration: Optional[float] = None,
     number_of_channels: Optional[int] = None,
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    commit: bool = True
 ) -> BiomedicalSignal:
     """
     Insert biomedical signal metadata
@@ -352,6 +425,7 @@ def insert_biomedical_signal(
         duration: Signal duration in seconds
         number_of_channels: Number of channels
         notes: Additional notes
+        commit: Commit the change (False only flushes, leaving the commit to the caller)
     
     Returns:
         Created BiomedicalSignal object
@@ -366,8 +440,7 @@ def insert_biomedical_signal(
         notes=notes
     )
     session.add(signal)
-    session.commit()
-    session.refresh(signal)
+    _save(session, signal, commit)
     return signal
 
 
@@ -418,10 +491,11 @@ def insert_correlation_result(
     correlation_type: str = 'pearson',
     sample_size: Optional[int] = None,
     p_value: Optional[float] = None,
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    commit: bool = True
 ) -> CorrelationResult:
     """
-    Insert correlation analysis result
+    Insert correlation analysis result, or update the stored result for the same pair
     
     Args:
         session: Database session
@@ -432,22 +506,43 @@ def insert_correlation_result(
         sample_size: Number of data points
         p_value: Statistical significance
         notes: Additional notes
+        commit: Commit the change (False only flushes, leaving the commit to the caller)
     
     Returns:
-        Created CorrelationResult object
-    """
-    result = CorrelationResult(
-        metric1=metric1,
-        metric2=metric2,
-        correlation_value=correlation_value,
-        correlation_type=correlation_type,
-        sample_size=sample_size,
-        p_value=p_value,
-        notes=notes
-    )
-    session.add(result)
-    session.commit()
-    session.refresh(result)
+        Created or updated CorrelationResult object
+    """
+    # The pair is unordered: it is stored sorted, so uq_correlation_pair sees (a, b) and (b, a) as one row
+    a, b = sorted((metric1, metric2))
+    values = {
+        'correlation_value': correlation_value,
+        'sample_size': sample_size,
+        'p_value': p_value,
+        'notes': notes,
+        'timestamp': datetime.utcnow()
+    }
+    
+    dialect_insert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if dialect_insert is not None:
+        # One atomic statement, so concurrent writers cannot both insert the pair
+        stmt = dialect_insert(CorrelationResult).values(
+            metric1=a, metric2=b, correlation_type=correlation_type, **values
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['metric1', 'metric2', 'correlation_type'],
+            set_={column: stmt.excluded[column] for column in values}
+        ).returning(CorrelationResult)
+        result = session.scalars(stmt, execution_options={'populate_existing': True}).one()
+    else:
+        result = session.query(CorrelationResult).filter_by(
+            metric1=a, metric2=b, correlation_type=correlation_type
+        ).first()
+        if result is None:
+            result = CorrelationResult(metric1=a, metric2=b, correlation_type=correlation_type)
+            session.add(result)
+        for column, value in values.items():
+            setattr(result, column, value)
+    
+    _save(session, result, commit)
     return result
 
 
@@ -464,8 +559,8 @@ def retrieve_correlation_results(
     Args:
         session: Database session
         correlation_id: Filter by correlation ID
-        metric1: Filter by first metric
-        metric2: Filter by second metric
+        metric1: Filter by a metric in the pair (stored pairs are sorted, so either position matches)
+        metric2: Filter by the other metric in the pair
         limit: Maximum number of results
     
     Returns:
@@ -475,10 +570,12 @@ def retrieve_correlation_results(
     
     if correlation_id:
         query = query.filter(CorrelationResult.correlation_id == correlation_id)
-    if metric1:
-        query = query.filter(CorrelationResult.metric1 == metric1)
-    if metric2:
-        query = query.filter(CorrelationResult.metric2 == metric2)
+    for metric in (metric1, metric2):
+        if metric:
+            query = query.filter(or_(
+                CorrelationResult.metric1 == metric,
+                CorrelationResult.metric2 == metric
+            ))
     
     query = query.order_by(desc(CorrelationResult.timestamp))
     
@@ -498,7 +595,8 @@ def insert_spectrum_analysis(
     frequency_resolution: Optional[float] = None,
     dominant_frequency: Optional[float] = None,
     power_spectrum_path: Optional[str] = None,
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    commit: bool = True
 ) -> SpectrumAnalysis:
     """
     Insert spectrum analysis result
@@ -512,6 +610,7 @@ def insert_spectrum_analysis(
         dominant_frequency: Dominant frequency component
         power_spectrum_path: Path to power spectrum data
         notes: Additional notes
+        commit: Commit the change (False only flushes, leaving the commit to the caller)
     
     Returns:
         Created SpectrumAnalysis object
@@ -526,8 +625,7 @@ def insert_spectrum_analysis(
         notes=notes
     )
     session.add(analysis)
-    session.commit()
-    session.refresh(analysis)
+    _save(session, analysis, commit)
     return analysis
 
 
@@ -5,6 +5,8 @@ Creates database tables and optionally seeds with sample data
 
 import sys
 import os
+import threading
+import weakref
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -12,6 +14,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from src.database.connection import DatabaseConnection, get_db_connection
 from src.database.models import Base
 
+# Connections whose tables have already been created by this process; keyed on the
+# connection rather than its URL so a replacement engine for the same URL is initialized
+_initialized_connections = weakref.WeakSet()
+_init_lock = threading.Lock()
+
 
 def init_database(database_url: str = None, drop_existing: bool = False):
     """
@@ -20,32 +27,40 @@ def init_database(database_url: str = None, drop_existing: bool = False):
     Args:
         database_url: Optional database URL (default: uses default SQLite path)
         drop_existing: If True, drop existing tables before creating (WARNING: deletes all data!)
-    """
-    print("Initializing MediAnalyze Pro database...")
     
+    Repeated calls for an already initialized engine return the connection
+    without re-issuing CREATE TABLE statements.
+    """
     # Get database connection
     db_conn = get_db_connection(database_url)
     
-    if drop_existing:
-        print("WARNING: Dropping existing tables...")
-        db_conn.drop_tables()
-        print("Existing tables dropped.")
-    
-    # Create all tables
-    print("Creating database tables...")
-    db_conn.create_tables()
-    print("Database tables created successfully!")
-    
-    # Verify tables were created
-    from sqlalchemy import inspect
-    inspector = inspect(db_conn.engine)
-    tables = inspector.get_table_names()
-    
-    print(f"\nCreated {len(tables)} tables:")
-    for table in sorted(tables):
-        print(f"  - {table}")
+    with _init_lock:
+        # Tables only need creating once per engine unless they are being reset
+        if db_conn in _initialized_connections and not drop_existing:
+            return db_conn
+        
+        print("Initializing MediAnalyze Pro database...")
+        
+        if drop_existing:
+            print("WARNING: Dropping existing tables...")
+            db_conn.drop_tables()
+            print("Existing tables dropped.")
+        
+        # Create all tables
+        print("Creating database tables...")
+        db_conn.create_tables()
+        print("Database tables created successfully!")
+        
+        # Verify tables were created
+        tables = db_conn.get_table_names()
+        
+        print(f"\nCreated {len(tables)} tables:")
+        for table in sorted(tables):
+            print(f"  - {table}")
+        
+        _initialized_connections.add(db_conn)
+        print("\nDatabase initialization complete!")
     
-    print("\nDatabase initialization complete!")
     return db_conn
 
 
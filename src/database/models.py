@@ -3,7 +3,7 @@ Database models/schema for MediAnalyze Pro
 Defines all database tables and their relationships
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -14,6 +14,8 @@ Base = declarative_base()
 class Patient(Base):
     """Patients table - stores basic patient information"""
     __tablename__ = 'patients'
+    # Leading gender column also serves gender-only filters
+    __table_args__ = (Index('ix_patient_gender_age', 'gender', 'age'),)
     
     patient_id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=True)  # Optional name field
@@ -33,6 +35,7 @@ class Patient(Base):
 class HealthMetric(Base):
     """Health metrics table - stores patient health measurements over time"""
     __tablename__ = 'health_metrics'
+    __table_args__ = (Index('ix_hm_patient', 'patient_id'),)
     
     metric_id = Column(Integer, primary_key=True, autoincrement=True)
     patient_id = Column(Integer, ForeignKey('patients.patient_id'), nullable=False)
@@ -64,6 +67,7 @@ class HealthMetric(Base):
 class MedicalImage(Base):
     """Medical images table - stores metadata for medical images"""
     __tablename__ = 'medical_images'
+    __table_args__ = (Index('ix_image_patient', 'patient_id'),)
     
     image_id = Column(Integer, primary_key=True, autoincrement=True)
     patient_id = Column(Integer, ForeignKey('patients.patient_id'), nullable=True)  # Optional - can be standalone
@@ -85,6 +89,7 @@ class MedicalImage(Base):
 class BiomedicalSignal(Base):
     """Biomedical signals table - stores metadata for ECG/EEG signals"""
     __tablename__ = 'biomedical_signals'
+    __table_args__ = (Index('ix_signal_patient', 'patient_id'),)
     
     signal_id = Column(Integer, primary_key=True, autoincrement=True)
     patient_id = Column(Integer, ForeignKey('patients.patient_id'), nullable=True)  # Optional
@@ -104,6 +109,10 @@ class BiomedicalSignal(Base):
 class CorrelationResult(Base):
     """Correlation results table - stores computed correlation coefficients"""
     __tablename__ = 'correlation_results'
+    __table_args__ = (
+        Index('ix_correlation_metrics', 'metric1', 'metric2'),
+        UniqueConstraint('metric1', 'metric2', 'correlation_type', name='uq_correlation_pair')
+    )
     
     correlation_id = Column(Integer, primary_key=True, autoincrement=True)
     metric1 = Column(String(100), nullable=False)  # First metric name (e.g., 'systolic_bp')
@@ -119,6 +128,7 @@ class CorrelationResult(Base):
 class SpectrumAnalysis(Base):
     """Spectrum analysis table - stores FFT analysis results"""
     __tablename__ = 'spectrum_analysis'
+    __table_args__ = (Index('ix_spectrum_signal', 'signal_id'),)
     
     analysis_id = Column(Integer, primary_key=True, autoincrement=True)
     signal_id = Column(Integer, ForeignKey('biomedical_signals.signal_id'), nullable=False)
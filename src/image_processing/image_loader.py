@@ -21,6 +21,13 @@ class ImageLoader:
     
     SUPPORTED_FORMATS = ['.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif']
     DICOM_FORMATS = ['.dcm', '.dicom']
+    JPEG_FORMATS = ['.jpg', '.jpeg']
+    
+    # libjpeg can decode at 1/2, 1/4 or 1/8 scale, keyed by grayscale then scale factor
+    REDUCED_READ_FLAGS = {
+        False: {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8},
+        True: {2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+    }
     
     def __init__(self):
         """Initialize image loader"""
@@ -55,13 +62,10 @@ class ImageLoader:
                 return self._load_dicom(file_path, grayscale, target_size)
             
             # Load using OpenCV (supports most formats)
-            if grayscale:
-                image = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
-            else:
-                image = cv2.imread(file_path, cv2.IMREAD_COLOR)
-                # Convert BGR to RGB (OpenCV uses BGR by default)
-                if image is not None and len(image.shape) == 3:
-                    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            image = cv2.imread(file_path, self._read_flag(file_path, file_ext, grayscale, target_size))
+            # Convert BGR to RGB (OpenCV uses BGR by default)
+            if not grayscale and image is not None and len(image.shape) == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             
             if image is None:
                 raise ValueError(f"Could not load image from {file_path}")
@@ -84,6 +88,44 @@ class ImageLoader:
             logger.error(f"Error loading image {file_path}: {e}")
             raise
     
+    def _read_flag(
+        self,
+        file_path: str,
+        file_ext: str,
+        grayscale: bool,
+        target_size: Optional[Tuple[int, int]]
+    ) -> int:
+        """
+        Choose the cv2.imread flag, decoding JPEGs at reduced scale when the target is small enough
+        
+        Args:
+            file_path: Path to image file
+            file_ext: Lower-case file extension
+            grayscale: Whether to read as grayscale
+            target_size: Optional target size (width, height)
+        
+        Returns:
+            Flag for cv2.imread; the decoded image is never smaller than target_size
+        """
+        full_flag = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        if not target_size or file_ext not in self.JPEG_FORMATS:
+            return full_flag
+        
+        try:
+            # Only the header is read here
+            with Image.open(file_path) as header:
+                width, height = header.size
+                # cv2.imread applies the EXIF orientation, and orientations 5-8 swap the axes
+                if header.getexif().get(0x0112, 1) > 4:
+                    width, height = height, width
+        except OSError:
+            return full_flag
+        
+        for factor in (8, 4, 2):
+            if width // factor >= target_size[0] and height // factor >= target_size[1]:
+                return self.REDUCED_READ_FLAGS[grayscale][factor]
+        return full_flag
+    
     def _load_dicom(
         self,
         file_path: str,
@@ -262,7 +304,7 @@ class ImageLoader:
             
             logger.info(f"Saved image to {output_path}")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error saving image: {e}")
             return False
@@ -5,6 +5,7 @@ Manages image metadata and processing history
 
 import logging
 import os
+from functools import lru_cache
 from typing import Dict, List, Optional
 import numpy as np
 from datetime import datetime
@@ -76,9 +77,11 @@ class ImageMetadataHandler:
         
         return metadata
     
-    def _detect_image_type(self, file_path: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _detect_image_type(file_path: str) -> str:
         """
-        Detect image type from file path/name
+        Detect image type from file path/name, cached since the same files are reprocessed
         
         Args:
             file_path: Path to image file
@@ -4,6 +4,7 @@ Provides various image processing operations for medical images
 """
 
 import logging
+from functools import lru_cache
 from typing import Optional, Tuple, Union
 import numpy as np
 import cv2
@@ -18,6 +19,22 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _structuring_element(kernel_size: int) -> np.ndarray:
+    """
+    Get a cached elliptical structuring element for morphological operations
+    
+    Args:
+        kernel_size: Width and height of the element
+    
+    Returns:
+        Read-only kernel shared between calls
+    """
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+    kernel.setflags(write=False)
+    return kernel
+
+
 class ImageProcessor:
     """
     Provides image processing operations for medical images
@@ -387,8 +404,7 @@ class ImageProcessor:
         if image.dtype != np.uint8:
             image = (image * 255 / image.max()).astype(np.uint8)
         
-        # Create kernel
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+        kernel = _structuring_element(kernel_size)
         
         if operation == 'opening':
             result = cv2.morphologyEx(image, cv2.MORPH_OPEN, kernel, iterations=iterations)
@@ -423,7 +439,8 @@ class ImageProcessor:
         Returns:
             Processed image
         """
-        processed = image.copy()
+        # Every operation returns a new array, so the input is only copied if nothing replaced it
+        processed = image
         
         for i, op_config in enumerate(operations):
             operation = op_config.pop('operation', None)
@@ -460,4 +477,7 @@ class ImageProcessor:
             
             logger.debug(f"Applied operation {i+1}/{len(operations)}: {operation}")
         
+        if np.may_share_memory(processed, image):
+            processed = processed.copy()
+        
         return processed
@@ -4,14 +4,50 @@ Provides noise reduction and signal normalization
 """
 
 import logging
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Optional, Tuple, Union
 import numpy as np
+from scipy import ndimage
 from scipy import signal as scipy_signal
-from scipy.signal import butter, filtfilt, medfilt
+from scipy.signal import butter, sosfiltfilt
 
 logger = logging.getLogger(__name__)
 
 
+def _median_of_three(signal: np.ndarray) -> np.ndarray:
+    """Kernel-3 median of a zero-padded 1D float signal via a min/max network"""
+    padded = np.zeros(len(signal) + 2)
+    padded[1:-1] = signal
+    left, centre, right = padded[:-2], padded[1:-1], padded[2:]
+    low = np.minimum(left, centre)
+    high = np.maximum(left, centre)
+    np.minimum(high, right, out=high)
+    return np.maximum(low, high, out=low)
+
+
+@lru_cache(maxsize=32)
+def _butter_sos(
+    order: int,
+    critical: Union[float, Tuple[float, float]],
+    btype: str
+) -> np.ndarray:
+    """
+    Design a Butterworth filter as second-order sections, cached between calls
+    
+    Args:
+        order: Filter order
+        critical: Normalized cutoff, or (low, high) for a bandpass
+        btype: Filter type ('low', 'high', 'band')
+    
+    Returns:
+        Read-only SOS array, which unlike (b, a) coefficients stays stable at high
+        orders and low normalized cutoffs; sosfiltfilt needs a writable copy
+    """
+    sos = butter(order, critical, btype=btype, output='sos')
+    sos.setflags(write=False)
+    return sos
+
+
 class SignalPreprocessor:
     """
     Preprocesses biomedical signals for analysis
@@ -44,13 +80,16 @@ class SignalPreprocessor:
         if len(signal) == 0:
             return signal
         
+        # signal is a private copy, so the scaling below works in place without temporaries
         if method == 'zscore':
-            mean = np.mean(signal)
-            std = np.std(signal)
+            signal -= np.mean(signal)
+            # Standard deviation from the already-centred values
+            std = np.sqrt(np.dot(signal, signal) / len(signal))
             if std == 0:
                 logger.warning("Standard deviation is 0, returning zero signal")
                 return np.zeros_like(signal)
-            return (signal - mean) / std
+            signal /= std
+            return signal
         
         elif method == 'minmax':
             min_val = np.min(signal)
@@ -58,14 +97,20 @@ class SignalPreprocessor:
             if max_val == min_val:
                 logger.warning("Signal has constant value, returning zero signal")
                 return np.zeros_like(signal)
-            return (signal - min_val) / (max_val - min_val) * (range_max - range_min) + range_min
+            signal -= min_val
+            signal /= max_val - min_val
+            signal *= range_max - range_min
+            signal += range_min
+            return signal
         
         elif method == 'unit':
             min_val = np.min(signal)
             max_val = np.max(signal)
             if max_val == min_val:
                 return np.zeros_like(signal)
-            return (signal - min_val) / (max_val - min_val)
+            signal -= min_val
+            signal /= max_val - min_val
+            return signal
         
         else:
             raise ValueError(f"Unknown normalization method: {method}")
@@ -115,10 +160,10 @@ class SignalPreprocessor:
         low = lowcut / nyquist
         high = highcut / nyquist
         
-        b, a = butter(order, [low, high], btype='band')
+        sos = _butter_sos(order, (low, high), 'band')
         
         # Apply filter (zero-phase filtering)
-        filtered = filtfilt(b, a, signal)
+        filtered = sosfiltfilt(sos.copy(), signal)
         
         return filtered
     
@@ -147,8 +192,8 @@ class SignalPreprocessor:
         nyquist = sampling_rate / 2.0
         normal_cutoff = cutoff / nyquist
         
-        b, a = butter(order, normal_cutoff, btype='low')
-        filtered = filtfilt(b, a, signal)
+        sos = _butter_sos(order, normal_cutoff, 'low')
+        filtered = sosfiltfilt(sos.copy(), signal)
         
         return filtered
     
@@ -177,8 +222,8 @@ class SignalPreprocessor:
         nyquist = sampling_rate / 2.0
         normal_cutoff = cutoff / nyquist
         
-        b, a = butter(order, normal_cutoff, btype='high')
-        filtered = filtfilt(b, a, signal)
+        sos = _butter_sos(order, normal_cutoff, 'high')
+        filtered = sosfiltfilt(sos.copy(), signal)
         
         return filtered
     
@@ -201,7 +246,11 @@ class SignalPreprocessor:
             kernel_size += 1
             logger.warning(f"Kernel size must be odd, using {kernel_size}")
         
-        filtered = medfilt(signal, kernel_size)
+        signal = np.asarray(signal)
+        # Same zero-padded edges as scipy.signal.medfilt, without its per-call validation
+        if kernel_size == 3 and signal.ndim == 1 and signal.dtype == np.float64 and not np.isnan(signal).any():
+            return _median_of_three(signal)
+        filtered = ndimage.median_filter(signal, size=kernel_size, mode='constant')
         return filtered
     
     @staticmethod
@@ -288,16 +337,23 @@ class SignalPreprocessor:
         Returns:
             Preprocessed signal
         """
-        processed = signal.copy()
+        if not steps:
+            return signal.copy()
+        
+        # Every step returns a new array, so the input itself is never modified
+        processed = signal
         
         for i, step in enumerate(steps):
             method = step.pop('method', None)
+            next_step = steps[i + 1] if i + 1 < len(steps) else {}
             
             if method == 'normalize':
                 method_type = step.pop('method_type', 'zscore')
                 processed = SignalPreprocessor.normalize(processed, method=method_type, **step)
             elif method == 'remove_dc_offset':
-                processed = SignalPreprocessor.remove_dc_offset(processed)
+                # Z-score normalization centres the signal itself, so skip the extra pass before it
+                if next_step.get('method') != 'normalize' or next_step.get('method_type', 'zscore') != 'zscore':
+                    processed = SignalPreprocessor.remove_dc_offset(processed)
             elif method == 'reduce_noise':
                 noise_method = step.pop('noise_method', 'bandpass')
                 processed = SignalPreprocessor.reduce_noise(
@@ -46,30 +46,25 @@ class SignalGenerator:
         # Generate ECG waveform using simplified model
         signal = np.zeros(n_samples)
         
-        for i in range(n_samples):
-            # Position within current heart cycle
-            cycle_pos = (t[i] % heart_period) / heart_period
-            
-            # P wave (atrial depolarization)
-            if 0.0 <= cycle_pos < 0.15:
-                signal[i] += 0.1 * np.sin(np.pi * cycle_pos / 0.15)
-            
-            # QRS complex (ventricular depolarization)
-            elif 0.15 <= cycle_pos < 0.25:
-                # Q
-                if cycle_pos < 0.17:
-                    signal[i] -= 0.2 * np.exp(-((cycle_pos - 0.16) / 0.01) ** 2)
-                # R
-                elif cycle_pos < 0.20:
-                    signal[i] += 1.0 * np.exp(-((cycle_pos - 0.18) / 0.01) ** 2)
-                # S
-                else:
-                    signal[i] -= 0.3 * np.exp(-((cycle_pos - 0.22) / 0.01) ** 2)
-            
-            # T wave (ventricular repolarization)
-            elif 0.25 <= cycle_pos < 0.55:
-                signal[i] += 0.3 * np.sin(np.pi * (cycle_pos - 0.25) / 0.3) * \
-                            np.exp(-((cycle_pos - 0.4) / 0.15) ** 2)
+        # Position of every sample within its heart cycle
+        cycle_pos = (t % heart_period) / heart_period
+        
+        # P wave (atrial depolarization)
+        p_wave = cycle_pos < 0.15
+        signal[p_wave] = 0.1 * np.sin(np.pi * cycle_pos[p_wave] / 0.15)
+        
+        # QRS complex (ventricular depolarization): Q, R and S
+        q_wave = (cycle_pos >= 0.15) & (cycle_pos < 0.17)
+        signal[q_wave] = -0.2 * np.exp(-((cycle_pos[q_wave] - 0.16) / 0.01) ** 2)
+        r_wave = (cycle_pos >= 0.17) & (cycle_pos < 0.20)
+        signal[r_wave] = 1.0 * np.exp(-((cycle_pos[r_wave] - 0.18) / 0.01) ** 2)
+        s_wave = (cycle_pos >= 0.20) & (cycle_pos < 0.25)
+        signal[s_wave] = -0.3 * np.exp(-((cycle_pos[s_wave] - 0.22) / 0.01) ** 2)
+        
+        # T wave (ventricular repolarization)
+        t_wave = (cycle_pos >= 0.25) & (cycle_pos < 0.55)
+        signal[t_wave] = 0.3 * np.sin(np.pi * (cycle_pos[t_wave] - 0.25) / 0.3) * \
+                         np.exp(-((cycle_pos[t_wave] - 0.4) / 0.15) ** 2)
         
         # Add baseline wander (low frequency component)
         if add_baseline_wander:
@@ -219,7 +214,11 @@ class SignalGenerator:
             Tuple of (signal, sampling_rate, metadata)
         """
         t = np.arange(0, duration, 1/sampling_rate)
-        signal = amplitude * np.sin(2 * np.pi * frequency * t + phase)
+        # Evaluate the phase, sine and scaling in one buffer
+        signal = t * (2 * np.pi * frequency)
+        signal += phase
+        np.sin(signal, out=signal)
+        signal *= amplitude
         
         if add_noise:
             noise = noise_level * np.random.randn(len(signal))
@@ -263,10 +262,11 @@ class SignalGenerator:
             raise ValueError("frequencies and amplitudes must have same length")
         
         t = np.arange(0, duration, 1/sampling_rate)
-        signal = np.zeros(len(t))
         
-        for freq, amp in zip(frequencies, amplitudes):
-            signal += amp * np.sin(2 * np.pi * freq * t)
+        # One sine call over a (tones, samples) phase matrix, summed by a matrix-vector product
+        tones = np.multiply.outer(2 * np.pi * np.asarray(frequencies, dtype=float), t)
+        np.sin(tones, out=tones)
+        signal = np.asarray(amplitudes, dtype=float) @ tones
         
         if add_noise:
             noise = noise_level * np.random.randn(len(signal))
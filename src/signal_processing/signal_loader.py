@@ -9,6 +9,15 @@ from typing import Dict, List, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
 
+# Optional pyarrow import (multithreaded CSV parsing and writing, Parquet storage)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,8 +62,16 @@ class SignalLoader:
             raise FileNotFoundError(f"Signal file not found: {file_path}")
         
         try:
-            # Load CSV
-            df = pd.read_csv(file_path, delimiter=delimiter)
+            # Load CSV, with pyarrow's parser when available
+            df = None
+            if HAS_PYARROW:
+                try:
+                    df = pd.read_csv(file_path, delimiter=delimiter, engine='pyarrow')
+                except pd.errors.ParserError as e:
+                    # Empty or irregular files go through the C engine and its errors
+                    logger.debug(f"pyarrow could not parse {file_path} ({e}), using the C engine")
+            if df is None:
+                df = pd.read_csv(file_path, delimiter=delimiter)
             
             if df.empty:
                 raise ValueError(f"CSV file is empty: {file_path}")
@@ -189,17 +206,19 @@ class SignalLoader:
             # Create time array
             time_array = np.arange(len(signal_data)) / sampling_rate
             
-            # Create DataFrame
-            df = pd.DataFrame({
+            columns = {
                 time_column: time_array,
-                amplitude_column: signal_data
-            })
+                amplitude_column: np.asarray(signal_data)
+            }
             
             # Ensure directory exists
             os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
             
-            # Save to CSV
-            df.to_csv(output_path, index=False)
+            # Save to CSV, skipping the DataFrame when pyarrow can write the arrays directly
+            if HAS_PYARROW:
+                pa_csv.write_csv(pa.Table.from_pydict(columns), output_path)
+            else:
+                pd.DataFrame(columns).to_csv(output_path, index=False)
             
             logger.info(f"Saved signal to {output_path}")
             return True
@@ -208,6 +227,108 @@ class SignalLoader:
             logger.error(f"Error saving signal to CSV: {e}")
             return False
     
+    def save_signal_to_parquet(
+        self,
+        signal_data: np.ndarray,
+        output_path: str,
+        sampling_rate: float,
+        amplitude_column: str = 'amplitude'
+    ) -> bool:
+        """
+        Save signal samples to a Parquet file (requires pyarrow)
+        
+        Args:
+            signal_data: Signal amplitude values
+            output_path: Output file path
+            sampling_rate: Sampling rate in Hz, kept in the file's schema metadata
+            amplitude_column: Name for amplitude column
+        
+        Returns:
+            True if successful
+        """
+        if not HAS_PYARROW:
+            raise ImportError(
+                "pyarrow is required for Parquet support. Install with: pip install pyarrow"
+            )
+        
+        try:
+            table = pa.table({amplitude_column: np.asarray(signal_data, dtype=float)})
+            table = table.replace_schema_metadata({'sampling_rate': str(float(sampling_rate))})
+            
+            # Ensure directory exists
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            
+            pq.write_table(table, output_path, compression='snappy')
+            
+            logger.info(f"Saved signal to {output_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error saving signal to Parquet: {e}")
+            return False
+    
+    def load_signal_from_parquet(
+        self,
+        file_path: str,
+        amplitude_column: str = 'amplitude',
+        sampling_rate: Optional[float] = None
+    ) -> Tuple[np.ndarray, float, Dict[str, any]]:
+        """
+        Load signal samples from a Parquet file (requires pyarrow)
+        
+        Args:
+            file_path: Path to Parquet file
+            amplitude_column: Name of amplitude column
+            sampling_rate: Sampling rate in Hz (if None, uses the stored rate or default)
+        
+        Returns:
+            Tuple of (signal_data, sampling_rate, metadata); signal_data is a read-only
+            view of the Arrow buffer rather than a copy
+        """
+        if not HAS_PYARROW:
+            raise ImportError(
+                "pyarrow is required for Parquet support. Install with: pip install pyarrow"
+            )
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Signal file not found: {file_path}")
+        
+        try:
+            # Only the amplitude column is read, straight into NumPy without a DataFrame
+            table = pq.read_table(file_path, columns=[amplitude_column])
+            signal_data = table.column(amplitude_column).to_numpy()
+            
+            if len(signal_data) == 0:
+                raise ValueError(f"Parquet file is empty: {file_path}")
+            
+            if sampling_rate is None:
+                stored = (table.schema.metadata or {}).get(b'sampling_rate')
+                sampling_rate = float(stored) if stored else self.default_sampling_rate
+            
+            metadata = {
+                'file_path': file_path,
+                'signal_length': len(signal_data),
+                'duration': len(signal_data) / sampling_rate,
+                'sampling_rate': sampling_rate,
+                'amplitude_column': amplitude_column,
+                'time_column': None,
+                'mean': float(np.mean(signal_data)),
+                'std': float(np.std(signal_data)),
+                'min': float(np.min(signal_data)),
+                'max': float(np.max(signal_data))
+            }
+            
+            logger.info(
+                f"Loaded signal: {len(signal_data)} samples, "
+                f"sampling rate: {sampling_rate:.2f} Hz, "
+                f"duration: {metadata['duration']:.2f} s"
+            )
+            
+            return signal_data, sampling_rate, metadata
+            
+        except Exception as e:
+            logger.error(f"Error loading signal from Parquet: {e}")
+            raise
+    
     @staticmethod
     def detect_signal_type(signal_data: np.ndarray, sampling_rate: float) -> str:
         """
@@ -5,9 +5,11 @@ Performs FFT analysis and frequency domain processing
 
 import logging
 import os
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
+from scipy import fft as scipy_fft
 from scipy import signal as scipy_signal
 from sqlalchemy.orm import Session
 
@@ -15,6 +17,37 @@ from ..database import get_session, crud
 
 logger = logging.getLogger(__name__)
 
+# Directory where stored analyses write their frequency data (data/processed/spectrum)
+SPECTRUM_OUTPUT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'data',
+    'processed',
+    'spectrum'
+)
+
+_WINDOW_FUNCTIONS = {
+    'hann': np.hanning,
+    'hamming': np.hamming,
+    'blackman': np.blackman
+}
+
+
+@lru_cache(maxsize=32)
+def _window(name: str, length: int) -> np.ndarray:
+    """
+    Get a cached window function
+    
+    Args:
+        name: Window name ('hann', 'hamming', 'blackman')
+        length: Window length in samples
+    
+    Returns:
+        Read-only window array shared between calls
+    """
+    window = _WINDOW_FUNCTIONS[name](length)
+    window.setflags(write=False)
+    return window
+
 
 class SpectrumAnalyzer:
     """
@@ -49,22 +82,16 @@ class SpectrumAnalyzer:
         Returns:
             Tuple of (frequencies, fft_values)
         """
-        signal = np.array(signal, dtype=float)
+        signal = np.asarray(signal, dtype=float)
         
         if len(signal) == 0:
             raise ValueError("Signal is empty")
         
         # Apply window if specified
         if window:
-            if window == 'hann':
-                window_func = np.hanning(len(signal))
-            elif window == 'hamming':
-                window_func = np.hamming(len(signal))
-            elif window == 'blackman':
-                window_func = np.blackman(len(signal))
-            else:
+            if window not in _WINDOW_FUNCTIONS:
                 raise ValueError(f"Unknown window function: {window}")
-            signal = signal * window_func
+            signal = signal * _window(window, len(signal))
         
         # Determine FFT size
         if nfft is None:
@@ -72,14 +99,56 @@ class SpectrumAnalyzer:
         elif nfft < len(signal):
             logger.warning(f"FFT size ({nfft}) is less than signal length ({len(signal)})")
         
-        # Compute FFT
-        fft_values = np.fft.fft(signal, n=nfft)
-        frequencies = np.fft.fftfreq(nfft, 1/sampling_rate)
+        # The input is real, so the real FFT gives the non-negative half directly;
+        # like fftfreq, the Nyquist bin of an even-length transform counts as negative
+        n_positive = (nfft + 1) // 2
+        fft_values = scipy_fft.rfft(signal, n=nfft)[:n_positive]
+        frequencies = np.fft.rfftfreq(nfft, 1/sampling_rate)[:n_positive]
         
-        # Return only positive frequencies
-        positive_freq_idx = frequencies >= 0
-        frequencies = frequencies[positive_freq_idx]
-        fft_values = fft_values[positive_freq_idx]
+        return frequencies, fft_values
+    
+    def compute_fft_batch(
+        self,
+        signals: np.ndarray,
+        sampling_rate: float,
+        window: Optional[str] = None,
+        nfft: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the FFT of equal-length signals in one transform
+        
+        Args:
+            signals: 2D array with one signal per row
+            sampling_rate: Sampling rate in Hz (shared by all signals)
+            window: Window function ('hann', 'hamming', 'blackman', None)
+            nfft: FFT size (if None, uses signal length)
+        
+        Returns:
+            Tuple of (frequencies, fft_values) with one row of fft_values per signal,
+            each row matching compute_fft on that signal
+        """
+        signals = np.asarray(signals, dtype=float)
+        
+        if signals.ndim != 2:
+            raise ValueError(f"Signals must be a 2D array, got {signals.ndim}D")
+        if signals.shape[1] == 0:
+            raise ValueError("Signals are empty")
+        
+        n_samples = signals.shape[1]
+        if window:
+            if window not in _WINDOW_FUNCTIONS:
+                raise ValueError(f"Unknown window function: {window}")
+            signals = signals * _window(window, n_samples)
+        
+        if nfft is None:
+            nfft = n_samples
+        elif nfft < n_samples:
+            logger.warning(f"FFT size ({nfft}) is less than signal length ({n_samples})")
+        
+        # One transform over the last axis instead of a Python loop of FFTs
+        n_positive = (nfft + 1) // 2
+        fft_values = scipy_fft.rfft(signals, n=nfft, axis=-1, workers=-1)[:, :n_positive]
+        frequencies = np.fft.rfftfreq(nfft, 1/sampling_rate)[:n_positive]
         
         return frequencies, fft_values
     
@@ -305,12 +374,7 @@ class SpectrumAnalyzer:
             Path to saved file
         """
         # Create output directory
-        output_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            'data',
-            'processed',
-            'spectrum'
-        )
+        output_dir = SPECTRUM_OUTPUT_DIR
         os.makedirs(output_dir, exist_ok=True)
         
         # Create DataFrame
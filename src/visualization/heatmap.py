@@ -10,6 +10,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from .utils import VisualizationUtils
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,16 +20,21 @@ class HeatmapPlotter:
     Creates heatmaps for correlation matrices and data visualization
     """
     
-    def __init__(self, figsize: Tuple[int, int] = (10, 8), dpi: int = 100):
+    def __init__(self, figsize: Tuple[int, int] = (10, 8), dpi: int = 100,
+                 reuse_figures: bool = False):
         """
         Initialize heatmap plotter
         
         Args:
             figsize: Figure size (width, height) in inches
             dpi: Resolution in dots per inch
+            reuse_figures: Reuse released figures between calls with
+                show_plot=False (returned figures are then only valid
+                until the next plot is drawn)
         """
         self.figsize = figsize
         self.dpi = dpi
+        self.reuse_figures = reuse_figures
     
     def plot_correlation_matrix(
         self,
@@ -66,7 +73,8 @@ class HeatmapPlotter:
             corr_matrix.columns = labels
             corr_matrix.index = labels
         
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         sns.heatmap(
             corr_matrix,
@@ -84,18 +92,10 @@ class HeatmapPlotter:
         
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved correlation heatmap to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'correlation heatmap',
+                                           reuse=self.reuse_figures)
     
     def plot_data_heatmap(
         self,
@@ -133,7 +133,8 @@ class HeatmapPlotter:
             if y_labels:
                 heatmap_data.index = y_labels[:data.shape[0]]
         
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         sns.heatmap(
             heatmap_data,
@@ -147,18 +148,10 @@ class HeatmapPlotter:
         
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved data heatmap to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'data heatmap',
+                                           reuse=self.reuse_figures)
     
     def plot_time_series_heatmap(
         self,
@@ -202,9 +195,9 @@ class HeatmapPlotter:
                               for i, label in enumerate(time_labels)]
             heatmap_data.columns = time_labels
         
-        fig, ax = plt.subplots(figsize=(max(12, len(heatmap_data.columns) * 0.3), 
-                                        max(6, len(metrics) * 0.5)), 
-                               dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            (max(12, len(heatmap_data.columns) * 0.3), max(6, len(metrics) * 0.5)), self.dpi,
+            reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         sns.heatmap(
             heatmap_data,
@@ -222,18 +215,10 @@ class HeatmapPlotter:
         if len(heatmap_data.columns) > 30:
             plt.setp(ax.xaxis.get_majorticklabels(), rotation=90, ha='center')
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved time-series heatmap to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'time-series heatmap',
+                                           reuse=self.reuse_figures)
     
     def plot_clustered_heatmap(
         self,
@@ -9,6 +9,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider
 
+from .utils import VisualizationUtils
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,16 +19,21 @@ class ImageViewer:
     Displays and compares medical images
     """
     
-    def __init__(self, figsize: Tuple[int, int] = (14, 6), dpi: int = 100):
+    def __init__(self, figsize: Tuple[int, int] = (14, 6), dpi: int = 100,
+                 reuse_figures: bool = False):
         """
         Initialize image viewer
         
         Args:
             figsize: Figure size (width, height) in inches
             dpi: Resolution in dots per inch
+            reuse_figures: Reuse released figures between calls with
+                show_plot=False (returned figures are then only valid
+                until the next plot is drawn)
         """
         self.figsize = figsize
         self.dpi = dpi
+        self.reuse_figures = reuse_figures
     
     def compare_images(
         self,
@@ -53,7 +60,8 @@ class ImageViewer:
         Returns:
             Matplotlib figure object
         """
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=self.figsize, dpi=self.dpi)
+        fig, (ax1, ax2) = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, 1, 2, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         # Display original
         if len(original.shape) == 2:
@@ -62,7 +70,7 @@ class ImageViewer:
             im1 = ax1.imshow(original)
         ax1.set_title(original_title, fontsize=12, fontweight='bold')
         ax1.axis('off')
-        plt.colorbar(im1, ax=ax1, fraction=0.046, pad=0.04)
+        fig.colorbar(im1, ax=ax1, fraction=0.046, pad=0.04)
         
         # Display processed
         if len(processed.shape) == 2:
@@ -71,21 +79,13 @@ class ImageViewer:
             im2 = ax2.imshow(processed)
         ax2.set_title(processed_title, fontsize=12, fontweight='bold')
         ax2.axis('off')
-        plt.colorbar(im2, ax=ax2, fraction=0.046, pad=0.04)
+        fig.colorbar(im2, ax=ax2, fraction=0.046, pad=0.04)
         
         fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved image comparison to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'image comparison',
+                                           reuse=self.reuse_figures)
     
     def display_image(
         self,
@@ -108,7 +108,8 @@ class ImageViewer:
         Returns:
             Matplotlib figure object
         """
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         if cmap is None:
             cmap = 'gray' if len(image.shape) == 2 else None
@@ -116,20 +117,12 @@ class ImageViewer:
         im = ax.imshow(image, cmap=cmap)
         ax.set_title(title, fontsize=14, fontweight='bold')
         ax.axis('off')
-        plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
-        
-        plt.tight_layout()
+        fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
         
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved image to {save_path}")
+        fig.tight_layout()
         
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
-        
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'image',
+                                           reuse=self.reuse_figures)
     
     def display_multiple_images(
         self,
@@ -157,9 +150,9 @@ class ImageViewer:
         n_images = len(images)
         nrows = (n_images + ncols - 1) // ncols
         
-        fig, axes = plt.subplots(nrows, ncols, figsize=(self.figsize[0] * ncols / 2, 
-                                                         self.figsize[1] * nrows / 2), 
-                                 dpi=self.dpi)
+        fig, axes = VisualizationUtils.acquire_figure(
+            (self.figsize[0] * ncols / 2, self.figsize[1] * nrows / 2), self.dpi, nrows, ncols,
+            reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         if nrows == 1:
             axes = axes.reshape(1, -1) if n_images > 1 else [axes]
@@ -183,18 +176,10 @@ class ImageViewer:
             axes[idx].axis('off')
         
         fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved multiple images to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'multiple images',
+                                           reuse=self.reuse_figures)
     
     def before_after_slider(
         self,
@@ -247,14 +232,4 @@ class ImageViewer:
         
         plt.tight_layout()
         
-        if save_path:
-            # Save at default blend (0.5)
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved before/after comparison to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
-        
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'before/after comparison')
@@ -10,6 +10,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from scipy import stats
 
+from .utils import VisualizationUtils
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,16 +20,21 @@ class ScatterPlotter:
     Creates scatter plots for correlation analysis
     """
     
-    def __init__(self, figsize: Tuple[int, int] = (10, 8), dpi: int = 100):
+    def __init__(self, figsize: Tuple[int, int] = (10, 8), dpi: int = 100,
+                 reuse_figures: bool = False):
         """
         Initialize scatter plotter
         
         Args:
             figsize: Figure size (width, height) in inches
             dpi: Resolution in dots per inch
+            reuse_figures: Reuse released figures between calls with
+                show_plot=False (returned figures are then only valid
+                until the next plot is drawn)
         """
         self.figsize = figsize
         self.dpi = dpi
+        self.reuse_figures = reuse_figures
     
     def plot_correlation(
         self,
@@ -60,7 +67,8 @@ class ScatterPlotter:
         Returns:
             Matplotlib figure object
         """
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         # Calculate correlation
         correlation = np.corrcoef(x_data, y_data)[0, 1]
@@ -69,7 +77,7 @@ class ScatterPlotter:
         if color_by is not None:
             scatter = ax.scatter(x_data, y_data, c=color_by, cmap='viridis', 
                                 alpha=0.6, s=50, edgecolors='black', linewidth=0.5)
-            plt.colorbar(scatter, ax=ax, label='Color Scale')
+            fig.colorbar(scatter, ax=ax, label='Color Scale')
         else:
             ax.scatter(x_data, y_data, alpha=0.6, s=50, edgecolors='black', linewidth=0.5)
         
@@ -92,18 +100,10 @@ class ScatterPlotter:
         ax.set_title(title or f"{x_label} vs {y_label}", fontsize=14, fontweight='bold')
         ax.grid(True, alpha=0.3, linestyle='--')
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved scatter plot to {save_path}")
+        fig.tight_layout()
         
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
-        
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'scatter plot',
+                                           reuse=self.reuse_figures)
     
     def plot_from_dataframe(
         self,
@@ -178,9 +178,9 @@ class ScatterPlotter:
         cols = 2
         rows = (n_plots + 1) // 2
         
-        fig, axes = plt.subplots(rows, cols, figsize=(self.figsize[0] * cols / 2, 
-                                                      self.figsize[1] * rows / 2), 
-                                dpi=self.dpi)
+        fig, axes = VisualizationUtils.acquire_figure(
+            (self.figsize[0] * cols / 2, self.figsize[1] * rows / 2), self.dpi, rows, cols,
+            reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         if n_plots == 1:
             axes = [axes]
@@ -215,18 +215,10 @@ class ScatterPlotter:
             axes[idx].axis('off')
         
         fig.suptitle(title, fontsize=16, fontweight='bold', y=1.02)
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved multiple scatter plots to {save_path}")
+        fig.tight_layout()
         
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
-        
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'multiple scatter plots',
+                                           reuse=self.reuse_figures)
     
     def plot_with_regression(
         self,
@@ -255,7 +247,8 @@ class ScatterPlotter:
         Returns:
             Matplotlib figure object
         """
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         ax.scatter(x_data, y_data, alpha=0.6, s=50, edgecolors='black', linewidth=0.5)
         
@@ -285,15 +278,7 @@ class ScatterPlotter:
         ax.legend(loc='best', framealpha=0.9)
         ax.grid(True, alpha=0.3, linestyle='--')
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved regression plot to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'regression plot',
+                                           reuse=self.reuse_figures)
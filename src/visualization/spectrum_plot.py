@@ -4,29 +4,53 @@ Creates frequency domain visualizations for biomedical signals
 """
 
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import signal
 
+from .utils import VisualizationUtils
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _hann_window(nperseg: int) -> np.ndarray:
+    """
+    Get a cached periodic Hann window (scipy's default Welch window)
+    
+    Args:
+        nperseg: Segment length in samples
+    
+    Returns:
+        Read-only window array shared between calls
+    """
+    window = signal.windows.hann(nperseg, sym=False)
+    window.setflags(write=False)
+    return window
+
+
 class SpectrumPlotter:
     """
     Creates FFT spectrum plots for biomedical signals
     """
     
-    def __init__(self, figsize: Tuple[int, int] = (12, 8), dpi: int = 100):
+    def __init__(self, figsize: Tuple[int, int] = (12, 8), dpi: int = 100,
+                 reuse_figures: bool = False):
         """
         Initialize spectrum plotter
         
         Args:
             figsize: Figure size (width, height) in inches
             dpi: Resolution in dots per inch
+            reuse_figures: Reuse released figures between calls with
+                show_plot=False (returned figures are then only valid
+                until the next plot is drawn)
         """
         self.figsize = figsize
         self.dpi = dpi
+        self.reuse_figures = reuse_figures
     
     def plot_fft_spectrum(
         self,
@@ -64,7 +88,8 @@ class SpectrumPlotter:
         frequencies = frequencies[positive_freq_idx]
         fft_magnitude = fft_magnitude[positive_freq_idx]
         
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         ax.plot(frequencies, fft_magnitude, linewidth=2, alpha=0.8)
         
@@ -83,18 +108,10 @@ class SpectrumPlotter:
         if xlim:
             ax.set_xlim(xlim)
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved FFT spectrum to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'FFT spectrum',
+                                           reuse=self.reuse_figures)
     
     def plot_power_spectrum(
         self,
@@ -122,11 +139,14 @@ class SpectrumPlotter:
             Matplotlib figure object
         """
         if method == 'welch':
-            frequencies, psd = signal.welch(signal_data, sample_rate, nperseg=min(256, len(signal_data)//4))
+            nperseg = min(256, len(signal_data)//4)
+            frequencies, psd = signal.welch(signal_data, sample_rate, window=_hann_window(nperseg),
+                                            nperseg=nperseg)
         else:  # periodogram
             frequencies, psd = signal.periodogram(signal_data, sample_rate)
         
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         ax.semilogy(frequencies, psd, linewidth=2, alpha=0.8)
         
@@ -138,18 +158,10 @@ class SpectrumPlotter:
         if xlim:
             ax.set_xlim(xlim)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved power spectrum to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
-        
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'power spectrum',
+                                           reuse=self.reuse_figures)
     
     def plot_time_frequency(
         self,
@@ -172,8 +184,9 @@ class SpectrumPlotter:
         Returns:
             Matplotlib figure object
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(self.figsize[0], self.figsize[1] * 1.5), 
-                                       dpi=self.dpi)
+        fig, (ax1, ax2) = VisualizationUtils.acquire_figure(
+            (self.figsize[0], self.figsize[1] * 1.5), self.dpi, 2, 1,
+            reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         # Time domain
         time = np.arange(len(signal_data)) / sample_rate
@@ -200,18 +213,10 @@ class SpectrumPlotter:
         ax2.grid(True, alpha=0.3, linestyle='--')
         
         fig.suptitle(title, fontsize=16, fontweight='bold', y=0.98)
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved time-frequency plot to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'time-frequency plot',
+                                           reuse=self.reuse_figures)
     
     def plot_multiple_signals(
         self,
@@ -234,7 +239,8 @@ class SpectrumPlotter:
         Returns:
             Matplotlib figure object
         """
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         colors = plt.cm.tab10(np.linspace(0, 1, len(signals)))
         
@@ -260,18 +266,10 @@ class SpectrumPlotter:
         if xlim:
             ax.set_xlim(xlim)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved multiple signal spectra to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
-        
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'multiple signal spectra',
+                                           reuse=self.reuse_figures)
     
     def plot_phase_spectrum(
         self,
@@ -305,7 +303,8 @@ class SpectrumPlotter:
         frequencies = frequencies[positive_freq_idx]
         phase = phase[positive_freq_idx]
         
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         ax.plot(frequencies, phase, linewidth=2, alpha=0.8)
         
@@ -317,15 +316,7 @@ class SpectrumPlotter:
         if xlim:
             ax.set_xlim(xlim)
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved phase spectrum to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'phase spectrum',
+                                           reuse=self.reuse_figures)
@@ -11,6 +11,8 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime
 
+from .utils import VisualizationUtils
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,16 +21,21 @@ class TimeSeriesPlotter:
     Creates time-series plots for health metrics and temporal data
     """
     
-    def __init__(self, figsize: Tuple[int, int] = (12, 6), dpi: int = 100):
+    def __init__(self, figsize: Tuple[int, int] = (12, 6), dpi: int = 100,
+                 reuse_figures: bool = False):
         """
         Initialize time-series plotter
         
         Args:
             figsize: Figure size (width, height) in inches
             dpi: Resolution in dots per inch
+            reuse_figures: Reuse released figures between calls with
+                show_plot=False (returned figures are then only valid
+                until the next plot is drawn)
         """
         self.figsize = figsize
         self.dpi = dpi
+        self.reuse_figures = reuse_figures
     
     def plot_health_metrics(
         self,
@@ -53,7 +60,8 @@ class TimeSeriesPlotter:
         Returns:
             Matplotlib figure object
         """
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         time_data = None  # Initialize to avoid UnboundLocalError
         
@@ -123,18 +131,10 @@ class TimeSeriesPlotter:
             ax.xaxis.set_major_locator(mdates.AutoDateLocator())
             plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved time-series plot to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'time-series plot',
+                                           reuse=self.reuse_figures)
     
     def plot_single_metric(
         self,
@@ -161,7 +161,8 @@ class TimeSeriesPlotter:
         Returns:
             Matplotlib figure object
         """
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         # Convert time data
         if isinstance(time_data, (list, np.ndarray)):
@@ -184,18 +185,10 @@ class TimeSeriesPlotter:
             ax.xaxis.set_major_locator(mdates.AutoDateLocator())
             plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved single metric plot to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'single metric plot',
+                                           reuse=self.reuse_figures)
     
     def plot_multiple_patients(
         self,
@@ -220,7 +213,8 @@ class TimeSeriesPlotter:
         Returns:
             Matplotlib figure object
         """
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         colors = plt.cm.tab10(np.linspace(0, 1, len(data)))
         
@@ -242,18 +236,10 @@ class TimeSeriesPlotter:
         ax.xaxis.set_major_locator(mdates.AutoDateLocator())
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
         
-        plt.tight_layout()
+        fig.tight_layout()
         
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved multi-patient plot to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
-        
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'multi-patient plot',
+                                           reuse=self.reuse_figures)
     
     def plot_with_statistics(
         self,
@@ -280,7 +266,8 @@ class TimeSeriesPlotter:
         Returns:
             Matplotlib figure object
         """
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        fig, ax = VisualizationUtils.acquire_figure(
+            self.figsize, self.dpi, reuse=self.reuse_figures and not show_plot, managed=show_plot)
         
         mean_val = np.mean(metric_data)
         std_val = np.std(metric_data)
@@ -304,15 +291,7 @@ class TimeSeriesPlotter:
         ax.legend(loc='best', framealpha=0.9)
         ax.grid(True, alpha=0.3, linestyle='--')
         
-        plt.tight_layout()
-        
-        if save_path:
-            fig.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
-            logger.info(f"Saved statistics plot to {save_path}")
-        
-        if show_plot:
-            plt.show()
-        else:
-            plt.close(fig)
+        fig.tight_layout()
         
-        return fig
+        return VisualizationUtils.finalize(fig, save_path, show_plot, self.dpi, 'statistics plot',
+                                           reuse=self.reuse_figures)
@@ -4,9 +4,11 @@ Common helper functions for visualization modules
 """
 
 import logging
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,76 @@ class VisualizationUtils:
     Utility functions for visualization
     """
     
+    # Released figures kept for reuse, keyed by (figsize, dpi)
+    _fig_pool: Dict[tuple, plt.Figure] = {}
+    
+    @classmethod
+    def acquire_figure(cls, figsize: Tuple[float, float], dpi: int = 100,
+                       nrows: int = 1, ncols: int = 1, reuse: bool = False,
+                       managed: bool = True):
+        """
+        Get a figure and axes, reusing a pooled figure when possible
+        
+        Args:
+            figsize: Figure size (width, height) in inches
+            dpi: Resolution in dots per inch
+            nrows: Number of subplot rows
+            ncols: Number of subplot columns
+            reuse: Whether to take a matching figure from the pool
+            managed: Whether pyplot should track the figure (only needed to show it)
+        
+        Returns:
+            Tuple of (figure, axes) as returned by plt.subplots
+        """
+        key = (tuple(figsize), dpi)
+        if reuse and key in cls._fig_pool:
+            fig = cls._fig_pool.pop(key)
+            fig.clear()
+            return fig, fig.subplots(nrows, ncols)
+        
+        if managed:
+            return plt.subplots(nrows, ncols, figsize=figsize, dpi=dpi)
+        
+        # A bare Agg canvas skips pyplot's global registry and, under Qt, a figure window
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        return fig, fig.subplots(nrows, ncols)
+    
+    @classmethod
+    def finalize(cls, fig: plt.Figure, save_path: Optional[str], show_plot: bool,
+                 dpi: int = 100, description: str = 'figure',
+                 reuse: bool = False) -> plt.Figure:
+        """
+        Save, show or close a finished plot
+        
+        Shared tail of every plotter method. The backend is left to
+        src.visualization and the GUI; plots not shown are just closed.
+        
+        Args:
+            fig: Matplotlib figure object
+            save_path: Path to save figure (if None, doesn't save)
+            show_plot: Whether to display the plot
+            dpi: Resolution used when saving
+            description: Plot description used in log messages
+            reuse: Return the closed figure to the pool for acquire_figure()
+        
+        Returns:
+            The same figure object
+        """
+        if save_path:
+            fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+            logger.info(f"Saved {description} to {save_path}")
+        
+        if show_plot:
+            plt.show()
+            return fig
+        
+        plt.close(fig)
+        if reuse:
+            cls._fig_pool[(tuple(fig.get_size_inches()), dpi)] = fig
+        
+        return fig
+    
     @staticmethod
     def save_figure(fig: plt.Figure, filepath: str, dpi: int = 100, 
                    formats: Optional[list] = None) -> bool:
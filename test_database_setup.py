@@ -1,112 +1,102 @@
 #!/usr/bin/env python3
 """
 Quick test script to verify database setup and functionality
-Run this after installing dependencies to test the database module
+Run this after installing dependencies to test the database module:
+
+    pytest test_database_setup.py
 """
 
 import sys
 import os
+import pytest
+
+# Import through the src package like the application does, so there is a
+# single copy of src.database and its connection global
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def db_connection(tmp_path_factory):
+    """Initialize a throwaway database once for all tests in this module"""
+    from src.database import DatabaseConnection, connection, init_database
+    db_path = tmp_path_factory.mktemp('setup') / 'medanalyze.db'
+    db_conn = DatabaseConnection(f"sqlite:///{db_path}")
+    
+    # Install it as the global connection so data/medanalyze.db is never touched
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(connection, '_db_connection', db_conn)
+        yield init_database()
+        db_conn.close()
+
+
+@pytest.fixture(scope='module')
+def session(db_connection):
+    """Share one scoped session across the tests in this module"""
+    from src.database import get_scoped_session, remove_scoped_session
+    yield get_scoped_session()
+    remove_scoped_session()
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 def test_imports():
     """Test if all required modules can be imported"""
-    print("=" * 60)
-    print("TEST 1: Testing Imports")
-    print("=" * 60)
-    
-    try:
-        from database import (
-            DatabaseConnection, get_db_connection, get_session,
-            Patient, HealthMetric, MedicalImage,
-            BiomedicalSignal, CorrelationResult, SpectrumAnalysis,
-            crud, init_database
-        )
-        print("✅ All imports successful!")
-        return True
-    except ImportError as e:
-        print(f"❌ Import error: {e}")
-        return False
+    from src.database import (
+        DatabaseConnection, get_db_connection, get_session,
+        Patient, HealthMetric, MedicalImage,
+        BiomedicalSignal, CorrelationResult, SpectrumAnalysis,
+        crud, init_database
+    )
 
 
-def test_database_initialization():
+def test_database_initialization(db_connection):
     """Test database initialization"""
-    print("\n" + "=" * 60)
-    print("TEST 2: Database Initialization")
-    print("=" * 60)
+    # Verify tables were created
+    tables = db_connection.get_table_names()
     
-    try:
-        from database import init_database, get_db_connection
-        
-        # Initialize database
-        print("Initializing database...")
-        init_database()
-        print("✅ Database initialized successfully!")
-        
-        # Verify tables were created
-        db_conn = get_db_connection()
-        from sqlalchemy import inspect
-        inspector = inspect(db_conn.engine)
-        tables = inspector.get_table_names()
-        
-        expected_tables = ['patients', 'health_metrics', 'medical_images', 
-                          'biomedical_signals', 'correlation_results', 'spectrum_analysis']
-        
-        print(f"\nCreated tables: {len(tables)}")
-        for table in sorted(tables):
-            status = "✅" if table in expected_tables else "⚠️"
-            print(f"  {status} {table}")
-        
-        missing = set(expected_tables) - set(tables)
-        if missing:
-            print(f"\n❌ Missing tables: {missing}")
-            return False
-        
-        print("\n✅ All expected tables created!")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    expected_tables = ['patients', 'health_metrics', 'medical_images',
+                      'biomedical_signals', 'correlation_results', 'spectrum_analysis']
+    
+    missing = set(expected_tables) - set(tables)
+    assert not missing, f"Missing tables: {missing}"
+    
+    # Verify lookup indexes were created
+    from sqlalchemy import inspect
+    inspector = inspect(db_connection.engine)
+    expected_indexes = {
+        'patients': 'ix_patient_gender_age',
+        'health_metrics': 'ix_hm_patient',
+        'medical_images': 'ix_image_patient',
+        'biomedical_signals': 'ix_signal_patient',
+        'correlation_results': 'ix_correlation_metrics',
+        'spectrum_analysis': 'ix_spectrum_signal'
+    }
+    for table, index_name in expected_indexes.items():
+        index_names = {index['name'] for index in inspector.get_indexes(table)}
+        assert index_name in index_names, f"Missing index {index_name} on {table}"
 
 
-def test_crud_operations():
+def test_crud_operations(session):
     """Test basic CRUD operations"""
-    print("\n" + "=" * 60)
-    print("TEST 3: CRUD Operations")
-    print("=" * 60)
+    from src.database import crud
     
-    try:
-        from database import get_session, crud
-        
-        session = get_session()
-        
-        # Test 1: Insert Patient
-        print("\n1. Testing patient insertion...")
+    # One transaction for all inserts and updates; the helpers only flush
+    with session.begin():
+        # 1. Insert Patient
         patient = crud.insert_patient_data(
             session=session,
             age=18393,  # ~50 years in days
             gender=2,  # Male
             height=175.0,
             weight=75.0,
-            name="Test Patient"
+            name="Test Patient",
+            commit=False
         )
-        print(f"   ✅ Patient created with ID: {patient.patient_id}")
+        assert patient.patient_id is not None
         
-        # Test 2: Retrieve Patient
-        print("\n2. Testing patient retrieval...")
+        # 2. Retrieve Patient
         patients = crud.retrieve_patient_data(session, patient_id=patient.patient_id)
-        if patients and patients[0].patient_id == patient.patient_id:
-            print(f"   ✅ Patient retrieved: {patients[0].name}")
-        else:
-            print("   ❌ Failed to retrieve patient")
-            return False
+        assert patients and patients[0].patient_id == patient.patient_id
         
-        # Test 3: Insert Health Metrics
-        print("\n3. Testing health metrics insertion...")
+        # 3. Insert Health Metrics
         metric = crud.insert_health_metrics(
             session=session,
             patient_id=patient.patient_id,
@@ -115,134 +105,70 @@ def test_crud_operations():
             heart_rate=72,
             body_temperature=36.5,
             cholesterol=1,
-            glucose=1
+            glucose=1,
+            commit=False
         )
-        print(f"   ✅ Health metric created with ID: {metric.metric_id}")
+        assert metric.metric_id is not None
         
-        # Test 4: Retrieve Health Metrics
-        print("\n4. Testing health metrics retrieval...")
-        metrics = crud.retrieve_health_metrics(session, patient_id=patient.patient_id)
-        if metrics and len(metrics) > 0:
-            print(f"   ✅ Retrieved {len(metrics)} health metric(s)")
-        else:
-            print("   ❌ Failed to retrieve health metrics")
-            return False
+        # 4. Retrieve Health Metrics
+        assert crud.patient_has_metrics(session, patient.patient_id)
         
-        # Test 5: Update Patient
-        print("\n5. Testing patient update...")
+        # 5. Update Patient
         updated = crud.update_patient_data(
             session=session,
             patient_id=patient.patient_id,
-            weight=78.0
+            weight=78.0,
+            commit=False
         )
-        if updated and updated.weight == 78.0:
-            print(f"   ✅ Patient updated: weight = {updated.weight} kg")
-        else:
-            print("   ❌ Failed to update patient")
-            return False
+        assert updated and updated.weight == 78.0
         
-        # Test 6: Insert Correlation Result
-        print("\n6. Testing correlation result insertion...")
+        # 6. Insert Correlation Result
         correlation = crud.insert_correlation_result(
             session=session,
             metric1="systolic_bp",
             metric2="cholesterol",
             correlation_value=0.65,
-            correlation_type="pearson"
+            correlation_type="pearson",
+            commit=False
         )
-        print(f"   ✅ Correlation result created with ID: {correlation.correlation_id}")
+        assert correlation.correlation_id is not None
         
-        # Test 7: Insert Medical Image Metadata
-        print("\n7. Testing medical image metadata insertion...")
+        # 7. Insert Medical Image Metadata
         image = crud.insert_image_metadata(
             session=session,
             filename="test_xray.jpg",
             image_path="/data/images/test_xray.jpg",
             image_type="X-ray",
-            patient_id=patient.patient_id
+            patient_id=patient.patient_id,
+            commit=False
         )
-        print(f"   ✅ Medical image metadata created with ID: {image.image_id}")
+        assert image.image_id is not None
         
-        # Test 8: Insert Biomedical Signal
-        print("\n8. Testing biomedical signal insertion...")
+        # 8. Insert Biomedical Signal
         signal = crud.insert_biomedical_signal(
             session=session,
             signal_type="ECG",
             signal_data_path="/data/signals/ecg.csv",
             patient_id=patient.patient_id,
-            sampling_rate=250.0
+            sampling_rate=250.0,
+            commit=False
         )
-        print(f"   ✅ Biomedical signal created with ID: {signal.signal_id}")
+        assert signal.signal_id is not None
         
-        # Test 9: Insert Spectrum Analysis
-        print("\n9. Testing spectrum analysis insertion...")
+        # 9. Insert Spectrum Analysis
         analysis = crud.insert_spectrum_analysis(
             session=session,
             signal_id=signal.signal_id,
             frequency_data_path="/data/spectrum/freq.csv",
-            dominant_frequency=60.0
+            dominant_frequency=60.0,
+            commit=False
         )
-        print(f"   ✅ Spectrum analysis created with ID: {analysis.analysis_id}")
-        
-        # Test 10: Delete Patient (cascade test)
-        print("\n10. Testing patient deletion (cascade)...")
-        deleted = crud.delete_patient_data(session, patient.patient_id)
-        if deleted:
-            print("   ✅ Patient deleted successfully")
-            # Verify cascade delete
-            remaining_metrics = crud.retrieve_health_metrics(session, patient_id=patient.patient_id)
-            if len(remaining_metrics) == 0:
-                print("   ✅ Cascade delete working: health metrics also deleted")
-            else:
-                print("   ⚠️ Cascade delete may not be working")
-        else:
-            print("   ❌ Failed to delete patient")
-            return False
-        
-        session.close()
-        print("\n✅ All CRUD operations successful!")
-        return True
-        
-    except Exception as e:
-        print(f"\n❌ Error during CRUD operations: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def main():
-    """Run all tests"""
-    print("\n" + "=" * 60)
-    print("MediAnalyze Pro - Database Module Test Suite")
-    print("=" * 60)
-    
-    results = []
-    
-    # Run tests
-    results.append(("Imports", test_imports()))
-    results.append(("Database Initialization", test_database_initialization()))
-    results.append(("CRUD Operations", test_crud_operations()))
-    
-    # Summary
-    print("\n" + "=" * 60)
-    print("TEST SUMMARY")
-    print("=" * 60)
-    
-    for test_name, passed in results:
-        status = "✅ PASSED" if passed else "❌ FAILED"
-        print(f"{test_name}: {status}")
-    
-    all_passed = all(result[1] for result in results)
-    
-    print("\n" + "=" * 60)
-    if all_passed:
-        print("🎉 ALL TESTS PASSED! Database module is working correctly.")
-    else:
-        print("⚠️ SOME TESTS FAILED. Please check the errors above.")
-    print("=" * 60 + "\n")
+        assert analysis.analysis_id is not None
     
-    return 0 if all_passed else 1
+    # 10. Delete Patient (cascade test)
+    assert crud.delete_patient_data(session, patient.patient_id)
+    assert not crud.patient_has_metrics(session, patient.patient_id)
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,176 @@
+"""
+Shared pytest fixtures and helpers for MediAnalyze Pro tests
+"""
+
+import os
+import sys
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from PyQt5.QtCore import QEvent, Qt
+from PyQt5.QtWidgets import QApplication, QComboBox, QWidget
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+# Make the src package importable however the tests are invoked; pytest's
+# rootdir handling usually has the project root on sys.path already
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src.database.connection import DatabaseConnection, DATABASE_URL_ENV
+from src.database.models import Patient, HealthMetric
+
+
+# QApplication created in pytest_configure, kept referenced for the whole run
+_qapp: Optional[QApplication] = None
+
+
+def pytest_configure(config):
+    """Register markers and create the QApplication once per process, before collection"""
+    global _qapp
+    config.addinivalue_line(
+        'markers', 'mutating: changes widget state; deselect with -m "not mutating" for a read-only run'
+    )
+    # Tests never need a display server; an explicit QT_QPA_PLATFORM still wins
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    # Widgets that use the global connection get a private in-memory database, not data/medanalyze.db
+    os.environ.setdefault(DATABASE_URL_ENV, 'sqlite:///:memory:')
+    # Keep widgets in-process: no native sibling windows and no platform dialogs
+    QApplication.setAttribute(Qt.AA_DontCreateNativeWidgetSiblings, True)
+    QApplication.setAttribute(Qt.AA_DontUseNativeDialogs, True)
+    _qapp = QApplication.instance() or QApplication(sys.argv)
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """The QApplication shared by every GUI test in this process"""
+    return QApplication.instance()
+
+
+@pytest.fixture(scope='module')
+def unrendered_figures():
+    """Skip figure layout and Qt canvas drawing for a module's figures; axes and artists are still created"""
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+    from matplotlib.figure import Figure
+    with patch.object(FigureCanvasQTAgg, 'draw', lambda self: None), \
+            patch.object(FigureCanvasQTAgg, 'draw_idle', lambda self, *args, **kwargs: None), \
+            patch.object(Figure, 'tight_layout', lambda self, *args, **kwargs: None):
+        yield
+
+
+@pytest.fixture(scope='session')
+def db_connection():
+    """Create one in-memory database, with its schema, for the whole test session"""
+    db_conn = DatabaseConnection('sqlite:///:memory:')
+    
+    # pysqlite defers BEGIN and breaks SAVEPOINTs; let SQLAlchemy emit it instead
+    @event.listens_for(db_conn.engine, 'connect')
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(db_conn.engine, 'begin')
+    def _emit_begin(conn):
+        conn.exec_driver_sql('BEGIN')
+    
+    db_conn.create_tables()
+    
+    yield db_conn
+    
+    db_conn.close()
+
+
+@pytest.fixture
+def session(db_connection):
+    """Create a session whose commits only release SAVEPOINTs of a rolled-back transaction"""
+    connection = db_connection.engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode='create_savepoint')
+    
+    yield session
+    
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def ro_session(session):
+    """The test session with autoflush off, for tests whose seed data is committed before reading"""
+    session.autoflush = False
+    return session
+
+
+def bulk_insert_patients(session: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert patient rows with one multi-row INSERT and commit
+    
+    Args:
+        session: Database session
+        rows: Patient column values, one dictionary per patient
+    
+    Returns:
+        New patient IDs in row order
+    """
+    patient_ids = session.execute(
+        insert(Patient).returning(Patient.patient_id, sort_by_parameter_order=True),
+        rows
+    ).scalars().all()
+    session.commit()
+    return patient_ids
+
+
+def bulk_insert_health_metrics(session: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert health metric rows with one multi-row INSERT and commit
+    
+    Args:
+        session: Database session
+        rows: Health metric column values, each including patient_id
+    """
+    session.execute(insert(HealthMetric), rows)
+    session.commit()
+
+
+def combo_items(combo: QComboBox) -> List[str]:
+    """
+    Read every item label of a combo box
+    
+    Args:
+        combo: Combo box to read
+    
+    Returns:
+        Item labels in display order
+    """
+    count = combo.count()
+    return [combo.itemText(i) for i in range(count)]
+
+
+def dispose_tab(qapp: QApplication, tab: QWidget, *figures: Figure) -> None:
+    """
+    Release a tab's figures and destroy its widgets now instead of at garbage collection
+    
+    Args:
+        qapp: The shared QApplication
+        tab: Tab widget to destroy
+        *figures: Figures owned by the tab, cleared before it is deleted
+    """
+    for fig in figures:
+        fig.clear()
+    tab.close()
+    tab.deleteLater()
+    qapp.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def read_only(*arrays: np.ndarray) -> None:
+    """
+    Mark module-level test data read-only so no test can alter another's input
+    
+    Args:
+        *arrays: Arrays shared between tests
+    """
+    for array in arrays:
+        array.setflags(write=False)
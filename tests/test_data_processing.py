@@ -3,114 +3,90 @@ Unit tests for data processing modules
 Tests CSV loading, validation, import, retrieval, and export
 """
 
+import io
 import pytest
 import os
-import tempfile
 import pandas as pd
 from datetime import datetime
+from sqlalchemy import event
 
 from src.data_processing.validator import DataValidator, ValidationError
 from src.data_processing.csv_loader import CSVLoader
 from src.data_processing.importer import DataImporter
 from src.data_processing.retriever import DataRetriever
 from src.data_processing.exporter import DataExporter
-from src.database.connection import DatabaseConnection
 from src.database import crud
+from .conftest import bulk_insert_patients, bulk_insert_health_metrics
 
 
-@pytest.fixture
-def db_connection():
-    """Create a temporary database for testing"""
-    fd, db_path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
-    
-    db_url = f'sqlite:///{db_path}'
-    db_conn = DatabaseConnection(db_url)
-    db_conn.create_tables()
-    
-    yield db_conn
-    
-    db_conn.close()
-    if os.path.exists(db_path):
-        os.remove(db_path)
+# Three rows in the cardio dataset format (semicolon-delimited, CSV column names)
+_SAMPLE_CSV = (
+    "id;age;gender;height;weight;ap_hi;ap_lo;cholesterol;gluc;smoke;alco;active;cardio\n"
+    "0;18393;2;168;62.0;110;80;1;1;0;0;1;0\n"
+    "1;20228;1;156;85.0;140;90;3;1;0;0;1;1\n"
+    "2;18857;1;165;64.0;130;70;3;1;0;0;0;1\n"
+)
+
+# One row with out-of-range age, gender, height and weight
+_INVALID_CSV = (
+    "id;age;gender;height;weight;ap_hi;ap_lo\n"
+    "0;100000;5;500;500;110;80\n"
+)
+
+
+@pytest.fixture(scope='session')
+def sample_csv_bytes():
+    """Sample CSV content for tests that read from a buffer"""
+    return _SAMPLE_CSV.encode()
+
+
+@pytest.fixture(scope='session')
+def sample_csv_file(tmp_path_factory):
+    """Create a sample CSV file once for all tests (tests must not modify it)"""
+    csv_path = tmp_path_factory.mktemp('data') / 'sample.csv'
+    csv_path.write_text(_SAMPLE_CSV)
+    return str(csv_path)
 
 
 @pytest.fixture
-def sample_csv_file():
-    """Create a sample CSV file for testing"""
-    data = {
-        'id': [0, 1, 2],
-        'age': [18393, 20228, 18857],
-        'gender': [2, 1, 1],
-        'height': [168, 156, 165],
-        'weight': [62.0, 85.0, 64.0],
-        'ap_hi': [110, 140, 130],
-        'ap_lo': [80, 90, 70],
-        'cholesterol': [1, 3, 3],
-        'gluc': [1, 1, 1],
-        'smoke': [0, 0, 0],
-        'alco': [0, 0, 0],
-        'active': [1, 1, 0],
-        'cardio': [0, 1, 1]
-    }
-    
-    df = pd.DataFrame(data)
-    
-    fd, csv_path = tempfile.mkstemp(suffix='.csv')
-    os.close(fd)
-    
-    df.to_csv(csv_path, sep=';', index=False)
-    
-    yield csv_path
-    
-    if os.path.exists(csv_path):
-        os.remove(csv_path)
+def retriever(ro_session):
+    """Create a retriever bound to the read-only test session"""
+    return DataRetriever(session=ro_session)
 
 
 class TestDataValidator:
     """Test data validation"""
     
-    def test_validate_patient_data_valid(self):
-        """Test validation of valid patient data"""
-        is_valid, errors = DataValidator.validate_patient_data(
-            age=18393,
-            gender=2,
-            height=175.0,
-            weight=75.0
+    @pytest.mark.parametrize('validate,kwargs,valid,errsub', [
+        (
+            DataValidator.validate_patient_data,
+            {'age': 18393, 'gender': 2, 'height': 175.0, 'weight': 75.0},
+            True, None
+        ),
+        (DataValidator.validate_patient_data, {'age': 100000}, False, None),
+        (DataValidator.validate_patient_data, {'gender': 5}, False, None),
+        (
+            DataValidator.validate_health_metrics,
+            {'systolic_bp': 120, 'diastolic_bp': 80, 'heart_rate': 72},
+            True, None
+        ),
+        # Invalid: systolic < diastolic
+        (
+            DataValidator.validate_health_metrics,
+            {'systolic_bp': 80, 'diastolic_bp': 120},
+            False, 'Systolic BP'
         )
-        assert is_valid
-        assert len(errors) == 0
-    
-    def test_validate_patient_data_invalid_age(self):
-        """Test validation with invalid age"""
-        is_valid, errors = DataValidator.validate_patient_data(age=100000)
-        assert not is_valid
-        assert len(errors) > 0
-    
-    def test_validate_patient_data_invalid_gender(self):
-        """Test validation with invalid gender"""
-        is_valid, errors = DataValidator.validate_patient_data(gender=5)
-        assert not is_valid
-        assert len(errors) > 0
-    
-    def test_validate_health_metrics_valid(self):
-        """Test validation of valid health metrics"""
-        is_valid, errors = DataValidator.validate_health_metrics(
-            systolic_bp=120,
-            diastolic_bp=80,
-            heart_rate=72
-        )
-        assert is_valid
-        assert len(errors) == 0
-    
-    def test_validate_health_metrics_invalid_bp(self):
-        """Test validation with invalid BP relationship"""
-        is_valid, errors = DataValidator.validate_health_metrics(
-            systolic_bp=80,
-            diastolic_bp=120  # Invalid: systolic < diastolic
-        )
-        assert not is_valid
-        assert any('Systolic BP' in err for err in errors)
+    ], ids=[
+        'patient_valid', 'patient_invalid_age', 'patient_invalid_gender',
+        'health_valid', 'health_invalid_bp'
+    ])
+    def test_validate_record(self, validate, kwargs, valid, errsub):
+        """Test validation of single patient and health metric records"""
+        is_valid, errors = validate(**kwargs)
+        assert is_valid is valid
+        assert (len(errors) == 0) is valid
+        if errsub:
+            assert any(errsub in err for err in errors)
     
     def test_validate_dataframe(self):
         """Test DataFrame validation"""
@@ -124,6 +100,33 @@ class TestDataValidator:
         is_valid, errors = DataValidator.validate_dataframe(df)
         assert not is_valid
         assert 'empty' in errors[0].lower()
+    
+    def test_validate_patient_frame(self):
+        """Test vectorized patient validation flags failing columns"""
+        df = pd.DataFrame({
+            'age': [18393, 100000, None],
+            'gender': [2, 5, 1],
+            'height': [175.0, 175.0, 500.0],
+            'weight': [75.0, 75.0, 75.0]
+        })
+        mask, codes = DataValidator.validate_patient_frame(df)
+        
+        assert mask.tolist() == [True, False, False]
+        assert codes[1] == DataValidator.AGE_ERROR | DataValidator.GENDER_ERROR
+        assert codes[2] == DataValidator.HEIGHT_ERROR
+    
+    def test_validate_frame_errors(self):
+        """Test frame validation only reports failing rows"""
+        df = pd.DataFrame({
+            'systolic_bp': [120, 80],
+            'diastolic_bp': [80, 120],
+            'glucose': [1, 4]
+        })
+        mask, errors = DataValidator.validate_frame(df)
+        
+        assert mask.tolist() == [True, False]
+        assert len(errors) == 2
+        assert all(err.startswith('Row 1:') for err in errors)
 
 
 class TestCSVLoader:
@@ -139,24 +142,42 @@ class TestCSVLoader:
         assert 'age' in df.columns
         assert 'gender' in df.columns
     
-    def test_load_csv_column_mapping(self, sample_csv_file):
+    def test_load_csv_column_mapping(self, sample_csv_bytes):
         """Test column mapping"""
         loader = CSVLoader()
-        df = loader.load_csv(sample_csv_file)
+        df = loader.load_csv(io.BytesIO(sample_csv_bytes))
         
         # Check that ap_hi is mapped to systolic_bp
         assert 'systolic_bp' in df.columns or 'ap_hi' in df.columns
     
+    def test_load_csv_compact_dtypes(self, sample_csv_bytes):
+        """Test cardio columns are loaded with compact integer dtypes"""
+        loader = CSVLoader()
+        df = loader.load_csv(io.BytesIO(sample_csv_bytes))
+        
+        assert df['gender'].dtype == 'Int8'
+        assert df['systolic_bp'].dtype == 'Int16'
+    
+    def test_load_csv_schema_fallback(self):
+        """Test values that don't fit the compact schema are still loaded"""
+        buffer = io.StringIO('age;gender;height;weight\n18393.5;2;168;62.0\n;1;156;85.0\n')
+        
+        loader = CSVLoader()
+        df = loader.load_csv(buffer)
+        
+        assert df['age'].iloc[0] == 18393.5
+        assert pd.isna(df['age'].iloc[1])
+    
     def test_load_csv_file_not_found(self):
         """Test loading non-existent file"""
         loader = CSVLoader()
         with pytest.raises(FileNotFoundError):
             loader.load_csv('nonexistent.csv')
     
-    def test_load_and_validate(self, sample_csv_file):
+    def test_load_and_validate(self, sample_csv_bytes):
         """Test loading and validating CSV"""
         loader = CSVLoader()
-        df, errors = loader.load_and_validate(sample_csv_file)
+        df, errors = loader.load_and_validate(io.BytesIO(sample_csv_bytes))
         
         assert not df.empty
         # Should have minimal errors for valid data
@@ -166,93 +187,101 @@ class TestCSVLoader:
 class TestDataImporter:
     """Test data import"""
     
-    def test_import_from_csv(self, db_connection, sample_csv_file):
-        """Test importing CSV data"""
-        session = db_connection.get_session()
+    @pytest.mark.parametrize("csv_bytes, expect_created, expect_skipped", [
+        (_SAMPLE_CSV.encode(), 3, 0),
+        (_INVALID_CSV.encode(), 0, 1),  # Invalid rows are skipped, not raised
+    ])
+    def test_import_from_csv(self, session, csv_bytes, expect_created, expect_skipped):
+        """Test importing valid and invalid CSV data"""
         importer = DataImporter(session=session, batch_size=10)
         
         stats = importer.import_from_csv(
-            sample_csv_file,
+            io.BytesIO(csv_bytes),
             create_patients=True,
             create_health_metrics=True
         )
         
-        assert stats['total_rows'] == 3
-        assert stats['patients_created'] > 0
-        assert stats['health_metrics_created'] > 0
+        assert stats['total_rows'] == expect_created + expect_skipped
+        assert stats['patients_created'] == expect_created
+        assert stats['patients_skipped'] == expect_skipped
+        assert stats['health_metrics_created'] == expect_created
+    
+    def test_import_links_metrics_across_batches(self, session, sample_csv_file):
+        """Test bulk-inserted metrics reference the patients of their rows"""
+        importer = DataImporter(session=session, batch_size=2)
+        
+        progress = []
+        stats = importer.import_from_csv(
+            sample_csv_file,
+            progress_callback=lambda processed, total, message: progress.append((processed, total))
+        )
         
-        session.close()
+        assert progress == [(2, 3), (3, 3)]  # Once per committed batch
+        assert stats['patients_created'] == 3
+        assert stats['health_metrics_created'] == 3
+        for patient in crud.retrieve_patient_data(session):
+            metrics = crud.retrieve_health_metrics(session, patient_id=patient.patient_id)
+            assert len(metrics) == 1
+    
+    def test_import_skips_rows_missing_patient_fields(self, session):
+        """Test a row without a required patient field doesn't fail its batch"""
+        df = pd.DataFrame({
+            'age': [18393, None],
+            'gender': [2, 1],
+            'height': [168, 156.5],
+            'weight': [62.0, 85.0],
+            'ap_hi': [110, 140],
+            'ap_lo': [80, 90],
+            'smoke': [1, 0]
+        })
+        importer = DataImporter(session=session)
+        
+        stats = importer.import_from_dataframe(df)
+        
+        assert stats['patients_created'] == 1
+        assert stats['patients_skipped'] == 1
+        assert stats['errors'] == []
+        metric = crud.retrieve_health_metrics(session)[0]
+        assert metric.systolic_bp == 110
+        assert metric.smoking is True
     
-    def test_import_handles_invalid_data(self, db_connection):
-        """Test import handles invalid data gracefully"""
-        # Create CSV with invalid data
-        invalid_data = {
-            'age': [100000],  # Invalid age
-            'gender': [5],  # Invalid gender
-            'height': [500],  # Invalid height
-            'weight': [500],  # Invalid weight
-            'ap_hi': [110],
-            'ap_lo': [80]
-        }
-        
-        df = pd.DataFrame(invalid_data)
-        fd, csv_path = tempfile.mkstemp(suffix='.csv')
-        os.close(fd)
-        df.to_csv(csv_path, sep=';', index=False)
+    def test_copy_buffer_writes_nulls_as_empty_fields(self):
+        """Test rows are serialized in COPY column order with None as NULL"""
+        rows = [{'patient_id': 1, 'systolic_bp': 120, 'smoking': False, 'glucose': None}]
         
-        try:
-            session = db_connection.get_session()
-            importer = DataImporter(session=session)
-            
-            stats = importer.import_from_csv(csv_path)
-            
-            # Should handle errors gracefully
-            assert stats['total_rows'] == 1
-            # Invalid rows should be skipped
-            assert stats['patients_skipped'] >= 0
-            
-            session.close()
-        finally:
-            if os.path.exists(csv_path):
-                os.remove(csv_path)
+        buffer = DataImporter._copy_buffer(rows, ('patient_id', 'glucose', 'systolic_bp', 'smoking'))
+        
+        assert buffer.read() == "1,,120,False\n"
 
 
 class TestDataRetriever:
     """Test data retrieval"""
     
-    def test_get_patients(self, db_connection):
+    def test_get_patients(self, ro_session, retriever):
         """Test retrieving patients"""
-        session = db_connection.get_session()
-        
         # Create test patient
         patient = crud.insert_patient_data(
-            session=session,
+            session=ro_session,
             age=18393,
             gender=2,
             height=175.0,
             weight=75.0
         )
-        session.commit()
+        ro_session.commit()
         
         # Retrieve patients
-        retriever = DataRetriever(session=session)
         patients = retriever.get_patients()
         
         assert len(patients) > 0
         assert any(p.patient_id == patient.patient_id for p in patients)
-        
-        session.close()
     
-    def test_get_patients_with_filters(self, db_connection):
+    def test_get_patients_with_filters(self, ro_session, retriever):
         """Test retrieving patients with filters"""
-        session = db_connection.get_session()
-        
         # Create test patients
-        crud.insert_patient_data(session=session, age=18393, gender=2, height=175.0, weight=75.0)
-        crud.insert_patient_data(session=session, age=20000, gender=1, height=160.0, weight=60.0)
-        session.commit()
-        
-        retriever = DataRetriever(session=session)
+        bulk_insert_patients(ro_session, [
+            {'age': 18393, 'gender': 2, 'height': 175.0, 'weight': 75.0},
+            {'age': 20000, 'gender': 1, 'height': 160.0, 'weight': 60.0}
+        ])
         
         # Filter by gender
         male_patients = retriever.get_patients(gender=2)
@@ -261,108 +290,104 @@ class TestDataRetriever:
         # Filter by age range
         young_patients = retriever.get_patients(min_age=18000, max_age=19000)
         assert all(18000 <= p.age <= 19000 for p in young_patients)
-        
-        session.close()
     
-    def test_get_patients_as_dataframe(self, db_connection):
+    def test_get_patients_as_dataframe(self, ro_session, retriever):
         """Test retrieving patients as DataFrame"""
-        session = db_connection.get_session()
+        crud.insert_patient_data(session=ro_session, age=18393, gender=2, height=175.0, weight=75.0)
+        ro_session.commit()
         
-        crud.insert_patient_data(session=session, age=18393, gender=2, height=175.0, weight=75.0)
-        session.commit()
-        
-        retriever = DataRetriever(session=session)
         df = retriever.get_patients(as_dataframe=True)
         
         assert isinstance(df, pd.DataFrame)
         assert not df.empty
         assert 'patient_id' in df.columns
+    
+    def test_get_patients_as_dataframe_bmi_filter(self, ro_session, retriever):
+        """Test BMI filter is applied by the query for DataFrame results"""
+        crud.insert_patient_data(session=ro_session, age=18393, gender=2, height=200.0, weight=60.0)
+        crud.insert_patient_data(session=ro_session, age=18393, gender=2, height=170.0, weight=90.0)
         
-        session.close()
+        df = retriever.get_patients(min_bmi=25.0, as_dataframe=True)
+        patients = retriever.get_patients(min_bmi=25.0)
+        
+        assert df['weight'].tolist() == [90.0]
+        assert [p.weight for p in patients] == [90.0]
     
-    def test_get_health_metrics(self, db_connection):
-        """Test retrieving health metrics"""
-        session = db_connection.get_session()
+    def test_get_patients_include_metrics(self, db_connection, ro_session, retriever):
+        """Test eager-loaded metrics are fetched in one extra query"""
+        patient_ids = bulk_insert_patients(ro_session, [
+            {'age': age, 'gender': 2, 'height': 175.0, 'weight': 75.0}
+            for age in (18000, 19000, 20000)
+        ])
+        bulk_insert_health_metrics(ro_session, [
+            {'patient_id': patient_id, 'systolic_bp': 120} for patient_id in patient_ids
+        ])
+        
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db_connection.engine, 'before_cursor_execute', listener)
+        try:
+            patients = retriever.get_patients(include_metrics=True)
+            assert [len(p.health_metrics) for p in patients] == [1, 1, 1]
+        finally:
+            event.remove(db_connection.engine, 'before_cursor_execute', listener)
         
+        assert len([sql for sql in statements if sql.startswith('SELECT')]) == 2
+    
+    def test_get_health_metrics(self, ro_session, retriever):
+        """Test retrieving health metrics"""
         # Create patient and metrics
-        patient = crud.insert_patient_data(
-            session=session,
-            age=18393,
-            gender=2,
-            height=175.0,
-            weight=75.0
-        )
+        patient_ids = bulk_insert_patients(ro_session, [
+            {'age': 18393, 'gender': 2, 'height': 175.0, 'weight': 75.0}
+        ])
+        bulk_insert_health_metrics(ro_session, [
+            {'patient_id': patient_ids[0], 'systolic_bp': 120, 'diastolic_bp': 80}
+        ])
         
-        crud.insert_health_metrics(
-            session=session,
-            patient_id=patient.patient_id,
-            systolic_bp=120,
-            diastolic_bp=80
-        )
-        session.commit()
-        
-        retriever = DataRetriever(session=session)
-        metrics = retriever.get_health_metrics(patient_ids=[patient.patient_id])
+        metrics = retriever.get_health_metrics(patient_ids=patient_ids)
         
         assert len(metrics) > 0
         assert metrics[0].systolic_bp == 120
-        
-        session.close()
     
-    def test_get_statistics(self, db_connection):
+    def test_get_statistics(self, ro_session, retriever):
         """Test getting statistics"""
-        session = db_connection.get_session()
-        
         # Create test data
-        crud.insert_patient_data(session=session, age=18393, gender=2, height=175.0, weight=75.0)
-        session.commit()
+        crud.insert_patient_data(session=ro_session, age=18393, gender=2, height=175.0, weight=75.0)
+        ro_session.commit()
         
-        retriever = DataRetriever(session=session)
         stats = retriever.get_statistics()
         
         assert 'total_patients' in stats
         assert stats['total_patients'] > 0
-        
-        session.close()
 
 
 class TestDataExporter:
     """Test data export"""
     
-    def test_export_patients_to_csv(self, db_connection):
+    def test_export_patients_to_csv(self, ro_session, retriever, tmp_path):
         """Test exporting patients to CSV"""
-        session = db_connection.get_session()
-        
         # Create test patient
         crud.insert_patient_data(
-            session=session,
+            session=ro_session,
             age=18393,
             gender=2,
             height=175.0,
             weight=75.0
         )
-        session.commit()
+        ro_session.commit()
         
         # Export
-        fd, output_path = tempfile.mkstemp(suffix='.csv')
-        os.close(fd)
+        output_path = str(tmp_path / 'patients.csv')
+        exporter = DataExporter(retriever=retriever)
         
-        try:
-            retriever = DataRetriever(session=session)
-            exporter = DataExporter(retriever=retriever)
-            
-            success = exporter.export_patients_to_csv(output_path)
-            
-            assert success
-            assert os.path.exists(output_path)
-            
-            # Verify CSV content
-            df = pd.read_csv(output_path)
-            assert not df.empty
-            assert 'patient_id' in df.columns
-            
-        finally:
-            if os.path.exists(output_path):
-                os.remove(output_path)
+        success = exporter.export_patients_to_csv(output_path)
+        
+        assert success
+        assert os.path.exists(output_path)
         
-        session.close()
+        # Verify CSV content
+        with open(output_path) as f:
+            header = f.readline().rstrip('\n')
+            first_row = f.readline()
+        assert 'patient_id' in header.split(',')
+        assert first_row  # At least one data row below the header
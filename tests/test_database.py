@@ -4,45 +4,46 @@ Tests CRUD operations for all database tables
 """
 
 import pytest
-import os
-import tempfile
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import event, insert
 
-from src.database.connection import DatabaseConnection
+from src.database.connection import DatabaseConnection, DATABASE_URL_ENV, INSERT_PAGE_SIZE
 from src.database.models import (
-    Patient, HealthMetric, MedicalImage, BiomedicalSignal,
+    Base, Patient, HealthMetric, MedicalImage, BiomedicalSignal,
     CorrelationResult, SpectrumAnalysis
 )
 from src.database import crud
+from .conftest import bulk_insert_patients, bulk_insert_health_metrics
 
 
 @pytest.fixture
-def db_connection():
-    """Create a temporary database for testing"""
-    # Create a temporary database file
-    fd, db_path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
+def clean_db_connection(db_connection):
+    """Share the session database with a test that commits outside the session fixture"""
+    yield db_connection
+    
+    # Empty the tables in one transaction instead of recreating the schema
+    db_connection.ScopedSession.remove()
+    with db_connection.engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def file_db_connection(tmp_path):
+    """Create a file-backed database for tests that change the schema"""
+    db_conn = DatabaseConnection(f"sqlite:///{tmp_path / 'test.db'}")
+    
+    # Throwaway database: skip the journal file and fsyncs (runs after the WAL setup)
+    @event.listens_for(db_conn.engine, 'connect')
+    def _fast_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.executescript(
+            "PRAGMA journal_mode=MEMORY; PRAGMA synchronous=OFF; PRAGMA temp_store=MEMORY;"
+        )
     
-    # Create database connection
-    db_url = f'sqlite:///{db_path}'
-    db_conn = DatabaseConnection(db_url)
     db_conn.create_tables()
     
     yield db_conn
     
-    # Cleanup
     db_conn.close()
-    if os.path.exists(db_path):
-        os.remove(db_path)
-
-
-@pytest.fixture
-def session(db_connection):
-    """Create a database session for testing"""
-    session = db_connection.get_session()
-    yield session
-    session.close()
 
 
 class TestPatientCRUD:
@@ -68,30 +69,23 @@ class TestPatientCRUD:
     
     def test_retrieve_patient_by_id(self, session):
         """Test retrieving patient by ID"""
-        # Insert a patient
-        patient = crud.insert_patient_data(
-            session=session,
-            age=20000,
-            gender=1,
-            height=160.0,
-            weight=60.0
-        )
+        # Insert patients
+        patient_ids = bulk_insert_patients(session, [
+            {'age': 20000, 'gender': 1, 'height': 160.0, 'weight': 60.0},
+            {'age': 18000, 'gender': 2, 'height': 175.0, 'weight': 75.0}
+        ])
         
         # Retrieve by ID
-        patients = crud.retrieve_patient_data(session, patient_id=patient.patient_id)
+        patients = crud.retrieve_patient_data(session, patient_id=patient_ids[0])
         assert len(patients) == 1
-        assert patients[0].patient_id == patient.patient_id
+        assert patients[0].patient_id == patient_ids[0]
     
     def test_retrieve_patient_by_name(self, session):
         """Test retrieving patient by name"""
-        crud.insert_patient_data(
-            session=session,
-            age=18000,
-            gender=1,
-            height=165.0,
-            weight=65.0,
-            name="John Doe"
-        )
+        bulk_insert_patients(session, [
+            {'age': 18000, 'gender': 1, 'height': 165.0, 'weight': 65.0, 'name': "John Doe"},
+            {'age': 19000, 'gender': 2, 'height': 180.0, 'weight': 80.0, 'name': "Jane Roe"}
+        ])
         
         patients = crud.retrieve_patient_data(session, name="John")
         assert len(patients) >= 1
@@ -99,17 +93,13 @@ class TestPatientCRUD:
     
     def test_update_patient(self, session):
         """Test updating patient data"""
-        patient = crud.insert_patient_data(
-            session=session,
-            age=18000,
-            gender=1,
-            height=165.0,
-            weight=65.0
-        )
+        patient_ids = bulk_insert_patients(session, [
+            {'age': 18000, 'gender': 1, 'height': 165.0, 'weight': 65.0}
+        ])
         
         updated = crud.update_patient_data(
             session=session,
-            patient_id=patient.patient_id,
+            patient_id=patient_ids[0],
             weight=70.0,
             name="Updated Name"
         )
@@ -117,21 +107,32 @@ class TestPatientCRUD:
         assert updated.weight == 70.0
         assert updated.name == "Updated Name"
     
-    def test_delete_patient(self, session):
-        """Test deleting a patient"""
+    def test_insert_patient_without_commit(self, session):
+        """Test commit=False leaves the transaction to the caller"""
         patient = crud.insert_patient_data(
             session=session,
-            age=18000,
-            gender=1,
-            height=165.0,
-            weight=65.0
+            age=18393,
+            gender=2,
+            height=175.0,
+            weight=75.0,
+            commit=False
         )
+        assert patient.patient_id is not None  # Assigned by flush
+        
+        session.rollback()
+        assert crud.retrieve_patient_data(session, patient_id=patient.patient_id) == []
+    
+    def test_delete_patient(self, session):
+        """Test deleting a patient"""
+        patient_ids = bulk_insert_patients(session, [
+            {'age': 18000, 'gender': 1, 'height': 165.0, 'weight': 65.0}
+        ])
         
-        result = crud.delete_patient_data(session, patient.patient_id)
+        result = crud.delete_patient_data(session, patient_ids[0])
         assert result is True
         
         # Verify deletion
-        patients = crud.retrieve_patient_data(session, patient_id=patient.patient_id)
+        patients = crud.retrieve_patient_data(session, patient_id=patient_ids[0])
         assert len(patients) == 0
 
 
@@ -141,18 +142,14 @@ class TestHealthMetricsCRUD:
     def test_insert_health_metrics(self, session):
         """Test inserting health metrics"""
         # First create a patient
-        patient = crud.insert_patient_data(
-            session=session,
-            age=18000,
-            gender=1,
-            height=165.0,
-            weight=65.0
-        )
+        patient_ids = bulk_insert_patients(session, [
+            {'age': 18000, 'gender': 1, 'height': 165.0, 'weight': 65.0}
+        ])
         
         # Insert health metrics
         metric = crud.insert_health_metrics(
             session=session,
-            patient_id=patient.patient_id,
+            patient_id=patient_ids[0],
             systolic_bp=120,
             diastolic_bp=80,
             heart_rate=72,
@@ -164,7 +161,7 @@ class TestHealthMetricsCRUD:
         )
         
         assert metric.metric_id is not None
-        assert metric.patient_id == patient.patient_id
+        assert metric.patient_id == patient_ids[0]
         assert metric.systolic_bp == 120
         assert metric.diastolic_bp == 80
         assert metric.heart_rate == 72
@@ -172,25 +169,23 @@ class TestHealthMetricsCRUD:
     def test_retrieve_health_metrics(self, session):
         """Test retrieving health metrics"""
         # Create patient and metrics
-        patient = crud.insert_patient_data(
-            session=session,
-            age=18000,
-            gender=1,
-            height=165.0,
-            weight=65.0
-        )
+        patient_ids = bulk_insert_patients(session, [
+            {'age': 18000, 'gender': 1, 'height': 165.0, 'weight': 65.0}
+        ])
         
         crud.insert_health_metrics(
             session=session,
-            patient_id=patient.patient_id,
+            patient_id=patient_ids[0],
             systolic_bp=120,
             diastolic_bp=80
         )
         
         # Retrieve metrics
-        metrics = crud.retrieve_health_metrics(session, patient_id=patient.patient_id)
+        metrics = crud.retrieve_health_metrics(session, patient_id=patient_ids[0])
         assert len(metrics) >= 1
         assert metrics[0].systolic_bp == 120
+        assert crud.patient_has_metrics(session, patient_ids[0])
+        assert crud.count_health_metrics(session, patient_id=patient_ids[0]) == len(metrics)
 
 
 class TestMedicalImageCRUD:
@@ -215,12 +210,12 @@ class TestMedicalImageCRUD:
     
     def test_retrieve_image_metadata(self, session):
         """Test retrieving image metadata"""
-        crud.insert_image_metadata(
-            session=session,
+        # Seed with a Core INSERT; the ORM insert path is covered above
+        session.execute(insert(MedicalImage).values(
             filename="test_mri.jpg",
             image_path="/path/to/test_mri.jpg",
             image_type="MRI"
-        )
+        ))
         
         images = crud.retrieve_image_metadata(session, image_type="MRI")
         assert len(images) >= 1
@@ -247,11 +242,11 @@ class TestBiomedicalSignalCRUD:
     
     def test_retrieve_biomedical_signals(self, session):
         """Test retrieving biomedical signals"""
-        crud.insert_biomedical_signal(
-            session=session,
+        # Seed with a Core INSERT; the ORM insert path is covered above
+        session.execute(insert(BiomedicalSignal).values(
             signal_type="EEG",
             signal_data_path="/path/to/eeg_data.csv"
-        )
+        ))
         
         signals = crud.retrieve_biomedical_signals(session, signal_type="EEG")
         assert len(signals) >= 1
@@ -274,8 +269,9 @@ class TestCorrelationResultCRUD:
         )
         
         assert result.correlation_id is not None
-        assert result.metric1 == "systolic_bp"
-        assert result.metric2 == "cholesterol"
+        # The unordered pair is stored sorted
+        assert result.metric1 == "cholesterol"
+        assert result.metric2 == "systolic_bp"
         assert result.correlation_value == 0.65
     
     def test_retrieve_correlation_results(self, session):
@@ -289,7 +285,40 @@ class TestCorrelationResultCRUD:
         
         results = crud.retrieve_correlation_results(session, metric1="heart_rate")
         assert len(results) >= 1
-        assert results[0].metric1 == "heart_rate"
+        assert "heart_rate" in (results[0].metric1, results[0].metric2)
+    
+    @pytest.mark.parametrize("upsert", [True, False], ids=['on_conflict', 'select_then_insert'])
+    def test_insert_correlation_result_updates_pair(self, session, upsert, monkeypatch):
+        """Test recomputing a pair, in either order, updates its stored result instead of adding rows"""
+        if not upsert:
+            monkeypatch.setattr(crud, '_UPSERT_INSERTS', {})
+        first = crud.insert_correlation_result(
+            session=session,
+            metric1="systolic_bp",
+            metric2="cholesterol",
+            correlation_value=0.65
+        )
+        second = crud.insert_correlation_result(
+            session=session,
+            metric1="cholesterol",
+            metric2="systolic_bp",
+            correlation_value=0.7,
+            sample_size=500
+        )
+        
+        assert second.correlation_id == first.correlation_id
+        assert second.correlation_value == 0.7
+        assert second.sample_size == 500
+        assert len(crud.retrieve_correlation_results(session)) == 1
+        
+        spearman = crud.insert_correlation_result(
+            session=session,
+            metric1="systolic_bp",
+            metric2="cholesterol",
+            correlation_value=0.6,
+            correlation_type="spearman"
+        )
+        assert spearman.correlation_id != first.correlation_id
 
 
 class TestSpectrumAnalysisCRUD:
@@ -342,45 +371,119 @@ class TestDatabaseRelationships:
     
     def test_patient_health_metrics_relationship(self, session):
         """Test relationship between patient and health metrics"""
-        patient = crud.insert_patient_data(
-            session=session,
-            age=18000,
-            gender=1,
-            height=165.0,
-            weight=65.0
-        )
-        
-        crud.insert_health_metrics(
-            session=session,
-            patient_id=patient.patient_id,
-            systolic_bp=120,
-            diastolic_bp=80
-        )
+        patient_ids = bulk_insert_patients(session, [
+            {'age': 18000, 'gender': 1, 'height': 165.0, 'weight': 65.0}
+        ])
+        bulk_insert_health_metrics(session, [
+            {'patient_id': patient_ids[0], 'systolic_bp': 120, 'diastolic_bp': 80},
+            {'patient_id': patient_ids[0], 'systolic_bp': 125, 'diastolic_bp': 85}
+        ])
         
-        # Refresh patient to get relationships
-        session.refresh(patient)
-        assert len(patient.health_metrics) >= 1
+        # Load patient to get relationships
+        patient = session.get(Patient, patient_ids[0])
+        assert len(patient.health_metrics) == 2
     
     def test_cascade_delete(self, session):
         """Test that deleting a patient cascades to health metrics"""
-        patient = crud.insert_patient_data(
-            session=session,
-            age=18000,
-            gender=1,
-            height=165.0,
-            weight=65.0
-        )
-        
-        metric = crud.insert_health_metrics(
-            session=session,
-            patient_id=patient.patient_id,
-            systolic_bp=120,
-            diastolic_bp=80
-        )
+        patient_ids = bulk_insert_patients(session, [
+            {'age': 18000, 'gender': 1, 'height': 165.0, 'weight': 65.0}
+        ])
+        bulk_insert_health_metrics(session, [
+            {'patient_id': patient_ids[0], 'systolic_bp': 120, 'diastolic_bp': 80}
+        ])
         
         # Delete patient
-        crud.delete_patient_data(session, patient.patient_id)
+        crud.delete_patient_data(session, patient_ids[0])
         
         # Verify health metric is also deleted (cascade)
-        metrics = crud.retrieve_health_metrics(session, patient_id=patient.patient_id)
-        assert len(metrics) == 0
+        assert not crud.patient_has_metrics(session, patient_ids[0])
+        assert crud.count_health_metrics(session, patient_id=patient_ids[0]) == 0
+
+
+class TestInitDatabase:
+    """Test database initialization"""
+    
+    def test_init_database_creates_tables_once(self, file_db_connection, monkeypatch):
+        """Test repeated initialization skips CREATE TABLE for the same engine"""
+        from src.database import connection
+        from src.database.init_db import init_database
+        monkeypatch.setattr(connection, '_db_connection', file_db_connection)
+        
+        calls = []
+        original_create_tables = file_db_connection.create_tables
+        monkeypatch.setattr(
+            file_db_connection, 'create_tables',
+            lambda: calls.append(1) or original_create_tables()
+        )
+        
+        assert init_database() is file_db_connection
+        assert init_database() is file_db_connection
+        assert len(calls) == 1
+        
+        init_database(drop_existing=True)
+        assert len(calls) == 2
+    
+    def test_init_database_new_engine_same_url(self, monkeypatch):
+        """Test a replacement connection for an already initialized URL still gets its tables"""
+        from src.database import connection
+        from src.database.init_db import init_database
+        
+        for _ in range(2):
+            db_conn = DatabaseConnection('sqlite:///:memory:')
+            monkeypatch.setattr(connection, '_db_connection', db_conn)
+            try:
+                assert init_database() is db_conn
+                assert 'patients' in db_conn.get_table_names()
+            finally:
+                db_conn.close()
+    
+    def test_get_table_names_cached(self, file_db_connection):
+        """Test table names are cached until the schema changes"""
+        tables = file_db_connection.get_table_names()
+        assert 'patients' in tables
+        assert file_db_connection.get_table_names() is tables
+        
+        file_db_connection.drop_tables()
+        assert 'patients' not in file_db_connection.get_table_names()
+    
+    def test_sqlite_pragmas(self, tmp_path):
+        """Test SQLite connections are opened in WAL mode with foreign keys on"""
+        db_conn = DatabaseConnection(f"sqlite:///{tmp_path / 'pragmas.db'}")
+        try:
+            with db_conn.engine.connect() as conn:
+                assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+                assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+        finally:
+            db_conn.close()
+    
+    def test_database_url_from_environment(self, monkeypatch, tmp_path):
+        """Test the environment variable replaces the default database path"""
+        url = f"sqlite:///{tmp_path / 'from_env.db'}"
+        monkeypatch.setenv(DATABASE_URL_ENV, url)
+        db_conn = DatabaseConnection()
+        try:
+            assert str(db_conn.engine.url) == url
+        finally:
+            db_conn.close()
+    
+    def test_insert_page_size(self, db_connection):
+        """Test bulk inserts are paged at the importer's batch size"""
+        assert db_connection.engine.dialect.insertmanyvalues_page_size == INSERT_PAGE_SIZE
+
+
+class TestScopedSession:
+    """Test the thread-scoped session registry"""
+    
+    def test_scoped_session_reused_until_removed(self, clean_db_connection):
+        """Test the scoped session is shared per thread and keeps attributes after commit"""
+        session = clean_db_connection.get_scoped_session()
+        assert clean_db_connection.get_scoped_session() is session
+        
+        patient = crud.insert_patient_data(
+            session=session, age=18000, gender=1, height=165.0, weight=65.0, commit=False
+        )
+        session.commit()
+        assert 'weight' in patient.__dict__  # Not expired by the commit
+        
+        clean_db_connection.ScopedSession.remove()
+        assert clean_db_connection.get_scoped_session() is not session
@@ -2,32 +2,16 @@
 Unit tests for Health Analysis Tab GUI
 """
 
-import sys
-import os
 import pytest
-from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
 
-# Add project root to path
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, project_root)
+from .conftest import combo_items
 
-from src.gui.tabs.health_analysis_tab import HealthAnalysisTab
 
-
-# Create QApplication instance for tests
-@pytest.fixture(scope="session")
-def qapp():
-    """Create QApplication instance for testing"""
-    app = QApplication.instance()
-    if app is None:
-        app = QApplication(sys.argv)
-    return app
-
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def health_tab(qapp):
-    """Create health analysis tab instance for testing"""
+    """Create one health analysis tab shared by the module's tests"""
+    from src.gui.tabs.health_analysis_tab import HealthAnalysisTab
     tab = HealthAnalysisTab()
     yield tab
     tab.close()
@@ -39,36 +23,29 @@ class TestHealthAnalysisTab:
     def test_tab_initialization(self, health_tab):
         """Test that tab initializes correctly"""
         assert health_tab is not None
-        assert hasattr(health_tab, 'load_data_btn')
-        assert hasattr(health_tab, 'patient_combo')
-        assert hasattr(health_tab, 'metric_combo')
-        assert hasattr(health_tab, 'filter_type_combo')
-        assert hasattr(health_tab, 'results_tabs')
-    
-    def test_data_selection_widgets_exist(self, health_tab):
-        """Test that data selection widgets exist"""
-        assert health_tab.load_data_btn is not None
-        assert health_tab.patient_combo is not None
-        assert health_tab.metric_combo is not None
-    
-    def test_filtering_widgets_exist(self, health_tab):
-        """Test that filtering widgets exist"""
-        assert health_tab.filter_type_combo is not None
-        assert health_tab.apply_filter_btn is not None
-        assert health_tab.filter_params_widget is not None
+        required = {
+            'load_data_btn', 'patient_combo', 'metric_combo', 'filter_type_combo',
+            'results_tabs'
+        }
+        missing = required - set(vars(health_tab))
+        assert not missing, f"missing attributes: {missing}"
     
-    def test_correlation_widgets_exist(self, health_tab):
-        """Test that correlation widgets exist"""
-        assert health_tab.corr_metric1_combo is not None
-        assert health_tab.corr_metric2_combo is not None
-        assert health_tab.corr_method_combo is not None
-        assert health_tab.compute_corr_btn is not None
-        assert health_tab.corr_results_text is not None
-    
-    def test_timeseries_widgets_exist(self, health_tab):
-        """Test that time-series widgets exist"""
-        assert health_tab.timeseries_viz_combo is not None
-        assert health_tab.generate_viz_btn is not None
+    @pytest.mark.parametrize("attr", [
+        # Data selection
+        'load_data_btn', 'patient_combo', 'metric_combo',
+        # Filtering
+        'filter_type_combo', 'apply_filter_btn', 'filter_params_widget',
+        # Correlation
+        'corr_metric1_combo', 'corr_metric2_combo', 'corr_method_combo',
+        'compute_corr_btn', 'corr_results_text',
+        # Time series
+        'timeseries_viz_combo', 'generate_viz_btn',
+        # Reset and status
+        'reset_btn', 'status_label'
+    ])
+    def test_widget_exists(self, health_tab, attr):
+        """Test that each widget of the tab exists"""
+        assert getattr(health_tab, attr) is not None
     
     def test_results_tabs_exist(self, health_tab):
         """Test that results tabs exist"""
@@ -84,57 +61,33 @@ class TestHealthAnalysisTab:
         assert not health_tab.compute_corr_btn.isEnabled()
         assert not health_tab.generate_viz_btn.isEnabled()
     
-    def test_filter_type_combo_options(self, health_tab):
-        """Test filter type combo box options"""
-        options = [health_tab.filter_type_combo.itemText(i) 
-                  for i in range(health_tab.filter_type_combo.count())]
-        expected = ["None", "Moving Average", "Threshold", "Remove Outliers"]
-        assert options == expected
-    
-    def test_correlation_method_options(self, health_tab):
-        """Test correlation method combo box options"""
-        options = [health_tab.corr_method_combo.itemText(i) 
-                  for i in range(health_tab.corr_method_combo.count())]
-        expected = ["Pearson", "Spearman"]
-        assert options == expected
-    
-    def test_timeseries_viz_options(self, health_tab):
-        """Test time-series visualization options"""
-        options = [health_tab.timeseries_viz_combo.itemText(i) 
-                  for i in range(health_tab.timeseries_viz_combo.count())]
-        expected = ["Time Series Plot", "Trend Analysis", "Anomaly Detection"]
-        assert options == expected
-    
-    def test_reset_button_exists(self, health_tab):
-        """Test that reset button exists"""
-        assert hasattr(health_tab, 'reset_btn')
-        assert health_tab.reset_btn is not None
-    
-    def test_status_label_exists(self, health_tab):
-        """Test that status label exists"""
-        assert hasattr(health_tab, 'status_label')
-        assert health_tab.status_label is not None
+    @pytest.mark.parametrize("combo_attr, expected", [
+        ('filter_type_combo', ["None", "Moving Average", "Threshold", "Remove Outliers"]),
+        ('corr_method_combo', ["Pearson", "Spearman"]),
+        ('timeseries_viz_combo', ["Time Series Plot", "Trend Analysis", "Anomaly Detection"])
+    ])
+    def test_combo_options(self, health_tab, combo_attr, expected):
+        """Test the options offered by each combo box"""
+        combo = getattr(health_tab, combo_attr)
+        assert combo_items(combo) == expected
     
-    def test_update_status_method(self, health_tab):
-        """Test status update method"""
-        # Should not raise exception
-        health_tab._update_status("Test message", "info")
-        health_tab._update_status("Success message", "success")
-        health_tab._update_status("Error message", "error")
-        health_tab._update_status("Warning message", "warning")
+    @pytest.mark.mutating
+    @pytest.mark.parametrize("level", ["info", "success", "error", "warning"])
+    def test_update_status(self, health_tab, level):
+        """Test status update method for each status level"""
+        health_tab._update_status(f"{level} message", level)
+        assert health_tab.status_label.text() == f"{level} message"
     
-    def test_interpret_correlation_method(self, health_tab):
-        """Test correlation interpretation method"""
-        # Test various correlation values
-        result1 = health_tab._interpret_correlation(0.95)
-        assert "very strong" in result1.lower()
-        
-        result2 = health_tab._interpret_correlation(0.6)
-        assert "moderate" in result2.lower()
-        
-        result3 = health_tab._interpret_correlation(-0.2)
-        assert "very weak" in result3.lower()
-        assert "negative" in result3.lower()
+    @pytest.mark.parametrize("value, expected", [
+        (0.95, "Very strong positive correlation"),
+        (-0.75, "Strong negative correlation"),
+        (0.6, "Moderate positive correlation"),
+        (0.4, "Weak positive correlation"),
+        (-0.2, "Very weak negative correlation")
+    ])
+    def test_interpret_correlation_method(self, health_tab, value, expected):
+        """Test correlation interpretation for each strength band"""
+        assert health_tab._interpret_correlation(value) == expected
 
 
 if __name__ == "__main__":
@@ -3,48 +3,61 @@ Unit tests for Image Processing Tab
 Tests image loading, processing operations, and visualization
 """
 
-import sys
-import os
-import unittest
+import pytest
 from unittest.mock import Mock, patch, MagicMock
 import numpy as np
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
 from PyQt5.QtTest import QTest
 
-from src.gui.tabs.image_processing_tab import ImageProcessingTab
+from .conftest import combo_items, dispose_tab
+
+
+# Smallest images the tab accepts; tests only need something to be loaded
+_TINY_RGB = np.zeros((2, 2, 3), dtype=np.uint8)
+_TINY_GRAY = np.zeros((2, 2), dtype=np.uint8)
+
+
+@pytest.fixture(scope="module")
+def image_tab(qapp):
+    """Create one image processing tab shared by the module's read-only tests"""
+    from src.gui.tabs.image_processing_tab import ImageProcessingTab
+    tab = ImageProcessingTab()
+    yield tab
+    dispose_tab(qapp, tab, tab.comparison_fig)
+
+
+@pytest.fixture
+def fresh_image_tab(qapp):
+    """Create a new image processing tab for tests that set images or reset state"""
+    from src.gui.tabs.image_processing_tab import ImageProcessingTab
+    tab = ImageProcessingTab()
+    yield tab
+    dispose_tab(qapp, tab, tab.comparison_fig)
 
 
-class TestImageProcessingTab(unittest.TestCase):
+@pytest.fixture
+def unrendered_image_tab(fresh_image_tab):
+    """Fresh tab that lays out its comparison axes without rasterizing them"""
+    with patch.object(fresh_image_tab.comparison_fig, 'tight_layout'), \
+            patch.object(fresh_image_tab.comparison_canvas, 'draw'):
+        yield fresh_image_tab
+
+
+class TestImageProcessingTab:
     """Test cases for Image Processing Tab"""
     
-    @classmethod
-    def setUpClass(cls):
-        """Set up test application"""
-        if not QApplication.instance():
-            cls.app = QApplication(sys.argv)
-        else:
-            cls.app = QApplication.instance()
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.tab = ImageProcessingTab()
-    
-    def test_tab_initialization(self):
+    def test_tab_initialization(self, image_tab):
         """Test that tab initializes correctly"""
-        self.assertIsNotNone(self.tab)
-        self.assertIsNone(self.tab.original_image)
-        self.assertIsNone(self.tab.processed_image)
-        self.assertIsNone(self.tab.original_metadata)
+        assert image_tab is not None
+        assert image_tab.original_image is None
+        assert image_tab.processed_image is None
+        assert image_tab.original_metadata is None
     
-    def test_operation_combo(self):
+    def test_operation_combo(self, image_tab):
         """Test operation combo box"""
-        self.assertEqual(self.tab.operation_combo.count(), 7)
-        operations = [
+        combo = image_tab.operation_combo
+        assert combo_items(combo) == [
             "Grayscale Conversion",
             "Gaussian Blur",
             "Median Blur",
@@ -53,122 +66,101 @@ class TestImageProcessingTab(unittest.TestCase):
             "Adaptive Threshold",
             "Contrast Enhancement (CLAHE)"
         ]
-        for i, op in enumerate(operations):
-            self.assertEqual(self.tab.operation_combo.itemText(i), op)
     
-    def test_process_button_disabled_initially(self):
+    def test_process_button_disabled_initially(self, image_tab):
         """Test that process button is disabled initially"""
-        self.assertFalse(self.tab.process_btn.isEnabled())
-        self.assertFalse(self.tab.save_btn.isEnabled())
-    
-    def test_operation_changed_updates_parameters(self):
-        """Test that changing operation updates parameter controls"""
-        # Test Grayscale (no parameters)
-        self.tab.operation_combo.setCurrentText("Grayscale Conversion")
-        self.tab._on_operation_changed("Grayscale Conversion")
-        self.assertEqual(self.tab.params_layout.count(), 0)
+        assert not image_tab.process_btn.isEnabled()
+        assert not image_tab.save_btn.isEnabled()
+    
+    @pytest.mark.mutating
+    @pytest.mark.parametrize("operation, expected_values", [
+        ("Grayscale Conversion", {}),
+        ("Gaussian Blur", {'gaussian_kernel_spin': 5}),
+        ("Canny Edge Detection", {'canny_thresh1_spin': 100.0, 'canny_thresh2_spin': 200.0}),
+        ("Threshold", {'thresh_value_spin': 127.0}),
+        ("Adaptive Threshold", {'adaptive_block_spin': 11, 'adaptive_c_spin': 2.0})
+    ])
+    def test_operation_changed_updates_parameters(self, image_tab, operation, expected_values):
+        """Test that changing operation shows its parameter controls with their defaults"""
+        image_tab.operation_combo.setCurrentText(operation)
+        image_tab._on_operation_changed(operation)
         
-        # Test Gaussian Blur (has kernel size)
-        self.tab.operation_combo.setCurrentText("Gaussian Blur")
-        self.tab._on_operation_changed("Gaussian Blur")
-        self.assertGreater(self.tab.params_layout.count(), 0)
-        self.assertTrue(hasattr(self.tab, 'gaussian_kernel_spin'))
-        self.assertEqual(self.tab.gaussian_kernel_spin.value(), 5)
-    
-    def test_canny_edge_parameters(self):
-        """Test Canny edge detection parameters"""
-        self.tab.operation_combo.setCurrentText("Canny Edge Detection")
-        self.tab._on_operation_changed("Canny Edge Detection")
-        
-        self.assertTrue(hasattr(self.tab, 'canny_thresh1_spin'))
-        self.assertTrue(hasattr(self.tab, 'canny_thresh2_spin'))
-        self.assertEqual(self.tab.canny_thresh1_spin.value(), 100.0)
-        self.assertEqual(self.tab.canny_thresh2_spin.value(), 200.0)
-    
-    def test_threshold_parameters(self):
-        """Test threshold parameters"""
-        self.tab.operation_combo.setCurrentText("Threshold")
-        self.tab._on_operation_changed("Threshold")
-        
-        self.assertTrue(hasattr(self.tab, 'thresh_value_spin'))
-        self.assertTrue(hasattr(self.tab, 'thresh_type_combo'))
-        self.assertEqual(self.tab.thresh_value_spin.value(), 127.0)
-        self.assertEqual(self.tab.thresh_type_combo.count(), 5)
-    
-    def test_adaptive_threshold_parameters(self):
-        """Test adaptive threshold parameters"""
-        self.tab.operation_combo.setCurrentText("Adaptive Threshold")
-        self.tab._on_operation_changed("Adaptive Threshold")
-        
-        self.assertTrue(hasattr(self.tab, 'adaptive_block_spin'))
-        self.assertTrue(hasattr(self.tab, 'adaptive_c_spin'))
-        self.assertEqual(self.tab.adaptive_block_spin.value(), 11)
-        self.assertEqual(self.tab.adaptive_c_spin.value(), 2.0)
-    
-    def test_reset_all(self):
+        if expected_values:
+            assert image_tab.params_layout.count() > 0
+        else:
+            assert image_tab.params_layout.count() == 0
+        for attr, value in expected_values.items():
+            assert getattr(image_tab, attr).value() == value
+    
+    @pytest.mark.mutating
+    def test_threshold_type_options(self, image_tab):
+        """Test threshold type combo box options"""
+        image_tab._on_operation_changed("Threshold")
+        assert image_tab.thresh_type_combo.count() == 5
+    
+    @pytest.mark.mutating
+    def test_reset_all(self, fresh_image_tab):
         """Test reset functionality"""
         # Set some values
-        self.tab.original_image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
-        self.tab.processed_image = np.random.randint(0, 255, (100, 100), dtype=np.uint8)
-        self.tab.process_btn.setEnabled(True)
-        self.tab.save_btn.setEnabled(True)
+        fresh_image_tab.original_image = _TINY_RGB
+        fresh_image_tab.processed_image = _TINY_GRAY
+        fresh_image_tab.process_btn.setEnabled(True)
+        fresh_image_tab.save_btn.setEnabled(True)
         
         # Reset
-        self.tab._reset_all()
+        fresh_image_tab._reset_all()
         
         # Check that everything is reset
-        self.assertIsNone(self.tab.original_image)
-        self.assertIsNone(self.tab.processed_image)
-        self.assertFalse(self.tab.process_btn.isEnabled())
-        self.assertFalse(self.tab.save_btn.isEnabled())
-        self.assertEqual(self.tab.operation_combo.currentIndex(), 0)
-    
-    def test_update_status(self):
-        """Test status update functionality"""
-        self.tab._update_status("Test message", "info")
-        self.assertEqual(self.tab.status_label.text(), "Test message")
-        
-        self.tab._update_status("Success message", "success")
-        self.assertEqual(self.tab.status_label.text(), "Success message")
-    
-    def test_apply_processing_no_image(self):
+        assert fresh_image_tab.original_image is None
+        assert fresh_image_tab.processed_image is None
+        assert not fresh_image_tab.process_btn.isEnabled()
+        assert not fresh_image_tab.save_btn.isEnabled()
+        assert fresh_image_tab.operation_combo.currentIndex() == 0
+    
+    @pytest.mark.mutating
+    @pytest.mark.parametrize("level", ["info", "success", "error", "warning"])
+    def test_update_status(self, image_tab, level):
+        """Test status update method for each status level"""
+        image_tab._update_status(f"{level} message", level)
+        assert image_tab.status_label.text() == f"{level} message"
+    
+    @pytest.mark.mutating
+    def test_apply_processing_no_image(self, fresh_image_tab):
         """Test that processing fails gracefully when no image is loaded"""
         with patch('PyQt5.QtWidgets.QMessageBox.warning') as mock_warning:
-            self.tab._apply_processing()
+            fresh_image_tab._apply_processing()
             mock_warning.assert_called_once()
     
-    def test_display_images_no_image(self):
+    @pytest.mark.mutating
+    def test_display_images_no_image(self, unrendered_image_tab):
         """Test display images with no image loaded"""
-        self.tab._display_images()
+        unrendered_image_tab._display_images()
         # Should show placeholder
-        self.assertEqual(len(self.tab.comparison_fig.axes), 1)
+        assert len(unrendered_image_tab.comparison_fig.axes) == 1
     
-    def test_display_images_with_original(self):
+    @pytest.mark.mutating
+    def test_display_images_with_original(self, unrendered_image_tab):
         """Test display images with original image only"""
-        # Create test image
-        test_image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
-        self.tab.original_image = test_image
+        unrendered_image_tab.original_image = _TINY_RGB
         
-        self.tab._display_images()
+        unrendered_image_tab._display_images()
         
         # Should show original image
-        self.assertEqual(len(self.tab.comparison_fig.axes), 1)
+        assert len(unrendered_image_tab.comparison_fig.axes) == 1
     
-    def test_display_images_with_both(self):
+    @pytest.mark.mutating
+    def test_display_images_with_both(self, unrendered_image_tab):
         """Test display images with both original and processed"""
-        # Create test images
-        original = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
-        processed = np.random.randint(0, 255, (100, 100), dtype=np.uint8)
-        
-        self.tab.original_image = original
-        self.tab.processed_image = processed
+        unrendered_image_tab.original_image = _TINY_RGB
+        unrendered_image_tab.processed_image = _TINY_GRAY
         
-        self.tab._display_images()
+        unrendered_image_tab._display_images()
         
         # Should show side-by-side comparison
-        self.assertEqual(len(self.tab.comparison_fig.axes), 2)
+        assert len(unrendered_image_tab.comparison_fig.axes) == 2
     
-    def test_update_metadata_display(self):
+    @pytest.mark.mutating
+    def test_update_metadata_display(self, image_tab):
         """Test metadata display update"""
         metadata = {
             'filename': 'test.png',
@@ -185,14 +177,14 @@ class TestImageProcessingTab(unittest.TestCase):
             'file_size_mb': 0.1
         }
         
-        self.tab._update_metadata_display(metadata)
+        image_tab._update_metadata_display(metadata)
         
-        text = self.tab.metadata_text.toPlainText()
-        self.assertIn("Original Image Metadata", text)
-        self.assertIn("test.png", text)
-        self.assertIn("100 × 100", text)
-        self.assertIn("X-ray", text)
+        text = image_tab.metadata_text.toPlainText()
+        assert "Original Image Metadata" in text
+        assert "test.png" in text
+        assert "100 × 100" in text
+        assert "X-ray" in text
 
 
-if __name__ == '__main__':
-    unittest.main()
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
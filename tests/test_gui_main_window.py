@@ -2,36 +2,29 @@
 Unit tests for GUI main window components
 """
 
-import sys
-import os
+from unittest.mock import patch
+
 import pytest
-from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
-
-# Add project root to path
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, project_root)
-
-from src.gui.main_window import MainWindow
-from src.gui import styles
+from PyQt5.QtWidgets import QMessageBox
 
 
-# Create QApplication instance for tests (required for PyQt5 widgets)
-@pytest.fixture(scope="session")
-def qapp():
-    """Create QApplication instance for testing"""
-    app = QApplication.instance()
-    if app is None:
-        app = QApplication(sys.argv)
-    return app
-
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def main_window(qapp):
-    """Create main window instance for testing"""
+    """Create one main window shared by the module's tests"""
+    from src.gui.main_window import MainWindow
     window = MainWindow()
     yield window
-    window.close()
+    # Decline the exit confirmation instead of blocking on the modal dialog
+    with patch.object(QMessageBox, 'question', return_value=QMessageBox.No):
+        window.close()
+
+
+@pytest.fixture(scope="module")
+def styles():
+    """Import the styles module, which loads the whole GUI package"""
+    from src.gui import styles
+    return styles
 
 
 class TestMainWindow:
@@ -44,18 +37,18 @@ class TestMainWindow:
         assert main_window.minimumSize().width() == 1200
         assert main_window.minimumSize().height() == 700
     
-    def test_sidebar_exists(self, main_window):
-        """Test that sidebar navigation exists"""
-        assert hasattr(main_window, 'sidebar')
-        assert main_window.sidebar is not None
+    @pytest.mark.parametrize("attr", ['sidebar', 'tab_widget', 'db_status_label'])
+    def test_widget_exists(self, main_window, attr):
+        """Test that each top-level widget exists"""
+        assert getattr(main_window, attr) is not None
+    
+    def test_sidebar_item_count(self, main_window):
+        """Test that sidebar has one navigation item per tab"""
         assert main_window.sidebar.count() == 5  # 5 navigation items
     
     def test_sidebar_navigation_items(self, main_window):
         """Test sidebar navigation items"""
-        items = []
-        for i in range(main_window.sidebar.count()):
-            item = main_window.sidebar.item(i)
-            items.append(item.text())
+        items = [main_window.sidebar.item(i).text() for i in range(main_window.sidebar.count())]
         
         expected_items = [
             "📊 Patient Data Management",
@@ -65,14 +58,10 @@ class TestMainWindow:
             "📉 Data Visualization"
         ]
         
-        assert len(items) == len(expected_items)
-        for expected in expected_items:
-            assert any(expected in item for item in items)
+        assert items == expected_items
     
-    def test_tab_widget_exists(self, main_window):
-        """Test that tab widget exists"""
-        assert hasattr(main_window, 'tab_widget')
-        assert main_window.tab_widget is not None
+    def test_tab_count(self, main_window):
+        """Test that tab widget has all tabs"""
         assert main_window.tab_widget.count() == 5  # 5 tabs
     
     def test_tab_names(self, main_window):
@@ -85,23 +74,17 @@ class TestMainWindow:
             "Visualization"
         ]
         
-        for i, expected in enumerate(expected_tabs):
-            assert main_window.tab_widget.tabText(i) == expected
+        tab_names = [main_window.tab_widget.tabText(i) for i in range(main_window.tab_widget.count())]
+        assert tab_names == expected_tabs
     
-    def test_navigation_syncs_with_tabs(self, main_window):
-        """Test that sidebar navigation syncs with tabs"""
-        # Select first navigation item
-        main_window.sidebar.setCurrentRow(0)
-        assert main_window.tab_widget.currentIndex() == 0
-        
-        # Select second navigation item
-        main_window.sidebar.setCurrentRow(1)
-        assert main_window.tab_widget.currentIndex() == 1
-        
-        # Select last navigation item
-        main_window.sidebar.setCurrentRow(4)
-        assert main_window.tab_widget.currentIndex() == 4
+    @pytest.mark.mutating
+    @pytest.mark.parametrize("row", [0, 1, 2, 3, 4])
+    def test_navigation_syncs_with_tabs(self, main_window, row):
+        """Test that selecting a sidebar item shows its tab"""
+        main_window.sidebar.setCurrentRow(row)
+        assert main_window.tab_widget.currentIndex() == row
     
+    @pytest.mark.mutating
     def test_tab_change_updates_status(self, main_window):
         """Test that tab changes update status bar"""
         initial_message = main_window.statusBar().currentMessage()
@@ -119,10 +102,8 @@ class TestMainWindow:
         assert menubar is not None
         
         # Check for expected menus
-        actions = [action.text() for action in menubar.actions()]
-        assert any("File" in action or "&File" in action for action in actions)
-        assert any("View" in action or "&View" in action for action in actions)
-        assert any("Help" in action or "&Help" in action for action in actions)
+        menu_names = {action.text().replace('&', '') for action in menubar.actions()}
+        assert {'File', 'View', 'Help'} <= menu_names
     
     def test_status_bar_exists(self, main_window):
         """Test that status bar exists"""
@@ -130,20 +111,19 @@ class TestMainWindow:
         assert status_bar is not None
         assert status_bar.isVisible()
     
-    def test_database_status_indicator(self, main_window):
-        """Test database status indicator"""
-        assert hasattr(main_window, 'db_status_label')
-        assert main_window.db_status_label is not None
-    
-    def test_error_dialog_methods(self, main_window):
-        """Test error dialog helper methods"""
-        # These should not raise exceptions
-        try:
-            main_window.show_error("Test Error", "This is a test error message")
-            main_window.show_info("Test Info", "This is a test info message")
-            main_window.show_warning("Test Warning", "This is a test warning message")
-        except Exception as e:
-            pytest.fail(f"Error dialog methods raised exception: {e}")
+    @pytest.mark.mutating
+    @pytest.mark.parametrize("method, box, status", [
+        ('show_error', 'critical', "Error: Test Title"),
+        ('show_info', 'information', "Test message"),
+        ('show_warning', 'warning', "Warning: Test Title")
+    ])
+    def test_error_dialog_methods(self, main_window, method, box, status):
+        """Test dialog helpers show their message box and update the status bar"""
+        with patch.object(QMessageBox, box) as mock_box:
+            getattr(main_window, method)("Test Title", "Test message")
+        
+        mock_box.assert_called_once_with(main_window, "Test Title", "Test message")
+        assert main_window.statusBar().currentMessage() == status
     
     def test_window_styling(self, main_window):
         """Test that window has styling applied"""
@@ -155,14 +135,14 @@ class TestMainWindow:
 class TestStyles:
     """Test cases for styles module"""
     
-    def test_get_stylesheet(self):
+    def test_get_stylesheet(self, styles):
         """Test that stylesheet is generated"""
         stylesheet = styles.get_stylesheet()
         assert stylesheet is not None
         assert isinstance(stylesheet, str)
         assert len(stylesheet) > 0
     
-    def test_colors_defined(self):
+    def test_colors_defined(self, styles):
         """Test that color constants are defined"""
         assert hasattr(styles, 'COLORS')
         assert isinstance(styles.COLORS, dict)
@@ -170,7 +150,7 @@ class TestStyles:
         assert 'secondary' in styles.COLORS
         assert 'background' in styles.COLORS
     
-    def test_fonts_defined(self):
+    def test_fonts_defined(self, styles):
         """Test that font constants are defined"""
         assert hasattr(styles, 'FONTS')
         assert isinstance(styles.FONTS, dict)
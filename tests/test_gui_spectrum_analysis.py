@@ -3,190 +3,201 @@ Unit tests for Spectrum Analysis Tab
 Tests signal loading, FFT analysis, and visualization functionality
 """
 
-import sys
-import os
-import unittest
-from unittest.mock import Mock, patch, MagicMock
+import pytest
+from unittest.mock import patch
 import numpy as np
-import pandas as pd
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from .conftest import combo_items, dispose_tab, read_only
 
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from PyQt5.QtTest import QTest
+# The tests only inspect the figures' axes, never their pixels
+pytestmark = pytest.mark.usefixtures('unrendered_figures')
 
-from src.gui.tabs.spectrum_analysis_tab import SpectrumAnalysisTab
 
+# Deterministic single-precision signals shared by every test
+_RNG = np.random.default_rng(0)
+_SIG_1024 = _RNG.standard_normal(1024, dtype=np.float32)
+_SIG_2500 = _RNG.standard_normal(2500, dtype=np.float32)
+_SIG_2560 = _RNG.standard_normal(2560, dtype=np.float32)
 
-class TestSpectrumAnalysisTab(unittest.TestCase):
-    """Test cases for Spectrum Analysis Tab"""
+# Real half-spectrum of the 1024-sample signal at 250 Hz (513 bins from 0 to 125 Hz), in single precision
+_FREQS_513 = np.fft.rfftfreq(_SIG_1024.size, 1 / 250.0).astype(np.float32)
+_FFT_513 = np.fft.rfft(_SIG_1024).astype(np.complex64, copy=False)
+_POWER_513 = _FFT_513.real ** 2 + _FFT_513.imag ** 2
+read_only(_SIG_1024, _SIG_2500, _SIG_2560, _FREQS_513, _FFT_513, _POWER_513)
+
+_META = {'duration': 10.0, 'mean': 0.0, 'std': 1.0}
+
+
+class _FakeSignalGenerator:
+    """Stand-in for SignalGenerator that returns the cached signals instead of synthesizing them"""
     
-    @classmethod
-    def setUpClass(cls):
-        """Set up test application"""
-        if not QApplication.instance():
-            cls.app = QApplication(sys.argv)
-        else:
-            cls.app = QApplication.instance()
+    def generate_ecg(self, *args, **kwargs):
+        return _SIG_2500, 250.0, _META
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.tab = SpectrumAnalysisTab()
+    def generate_eeg(self, *args, **kwargs):
+        return _SIG_2560, 256.0, _META
+
+
+@pytest.fixture(scope="module")
+def spectrum_tab(qapp):
+    """Create one spectrum analysis tab shared by the module's read-only tests"""
+    from src.gui.tabs.spectrum_analysis_tab import SpectrumAnalysisTab
+    tab = SpectrumAnalysisTab()
+    yield tab
+    dispose_tab(qapp, tab, tab.time_fig, tab.freq_fig, tab.power_fig, tab.tf_fig)
+
+
+@pytest.fixture
+def fresh_spectrum_tab(qapp):
+    """Create a new spectrum analysis tab for tests that load signals or change state"""
+    from src.gui.tabs.spectrum_analysis_tab import SpectrumAnalysisTab
+    tab = SpectrumAnalysisTab()
+    yield tab
+    dispose_tab(qapp, tab, tab.time_fig, tab.freq_fig, tab.power_fig, tab.tf_fig)
+
+
+class TestSpectrumAnalysisTab:
+    """Test cases for Spectrum Analysis Tab"""
     
-    def test_tab_initialization(self):
+    def test_tab_initialization(self, spectrum_tab):
         """Test that tab initializes correctly"""
-        self.assertIsNotNone(self.tab)
-        self.assertIsNone(self.tab.current_signal)
-        self.assertIsNone(self.tab.current_sampling_rate)
-        self.assertIsNone(self.tab.spectrum_data)
+        assert spectrum_tab is not None
+        assert spectrum_tab.current_signal is None
+        assert spectrum_tab.current_sampling_rate is None
+        assert spectrum_tab.spectrum_data is None
     
-    def test_signal_type_combo(self):
+    def test_signal_type_combo(self, spectrum_tab):
         """Test signal type combo box"""
-        self.assertEqual(self.tab.signal_type_combo.count(), 3)
-        self.assertEqual(self.tab.signal_type_combo.itemText(0), "ECG")
-        self.assertEqual(self.tab.signal_type_combo.itemText(1), "EEG")
-        self.assertEqual(self.tab.signal_type_combo.itemText(2), "Custom")
+        combo = spectrum_tab.signal_type_combo
+        assert combo_items(combo) == ["ECG", "EEG", "Custom"]
     
-    def test_window_function_combo(self):
+    def test_window_function_combo(self, spectrum_tab):
         """Test window function combo box"""
-        self.assertEqual(self.tab.window_combo.count(), 4)
-        self.assertEqual(self.tab.window_combo.currentText(), "Hann")
+        assert spectrum_tab.window_combo.count() == 4
+        assert spectrum_tab.window_combo.currentText() == "Hann"
     
-    def test_analysis_type_combo(self):
+    def test_analysis_type_combo(self, spectrum_tab):
         """Test analysis type combo box"""
-        self.assertEqual(self.tab.analysis_type_combo.count(), 4)
-        self.assertIn("Full Analysis", [self.tab.analysis_type_combo.itemText(i) 
-                                        for i in range(self.tab.analysis_type_combo.count())])
-    
-    def test_generate_synthetic_ecg(self):
-        """Test generating synthetic ECG signal"""
-        with patch('src.gui.tabs.spectrum_analysis_tab.SignalGenerator') as mock_gen:
-            mock_generator = Mock()
-            mock_generator.generate_ecg.return_value = (
-                np.random.randn(2500),  # signal
-                250.0,  # sampling rate
-                {'duration': 10.0, 'mean': 0.0, 'std': 1.0}  # metadata
-            )
-            mock_gen.return_value = mock_generator
-            
+        combo = spectrum_tab.analysis_type_combo
+        assert combo.count() == 4
+        assert "Full Analysis" in combo_items(combo)
+    
+    @pytest.mark.mutating
+    @pytest.mark.parametrize("signal_type, sampling_rate", [
+        ('ECG', 250.0),
+        ('EEG', 256.0)
+    ])
+    def test_generate_synthetic_signal(self, fresh_spectrum_tab, signal_type, sampling_rate):
+        """Test generating synthetic ECG and EEG signals"""
+        from src.gui.tabs import spectrum_analysis_tab
+        with patch.object(spectrum_analysis_tab, 'SignalGenerator', _FakeSignalGenerator):
             # Trigger button click
-            self.tab._generate_synthetic_signal('ECG')
-            
-            # Check that signal was loaded
-            self.assertIsNotNone(self.tab.current_signal)
-            self.assertEqual(self.tab.current_sampling_rate, 250.0)
-            self.assertIsNotNone(self.tab.current_metadata)
-    
-    def test_generate_synthetic_eeg(self):
-        """Test generating synthetic EEG signal"""
-        with patch('src.gui.tabs.spectrum_analysis_tab.SignalGenerator') as mock_gen:
-            mock_generator = Mock()
-            mock_generator.generate_eeg.return_value = (
-                np.random.randn(2560),  # signal
-                256.0,  # sampling rate
-                {'duration': 10.0, 'mean': 0.0, 'std': 1.0}  # metadata
-            )
-            mock_gen.return_value = mock_generator
-            
-            # Trigger button click
-            self.tab._generate_synthetic_signal('EEG')
-            
-            # Check that signal was loaded
-            self.assertIsNotNone(self.tab.current_signal)
-            self.assertEqual(self.tab.current_sampling_rate, 256.0)
-    
-    def test_reset_all(self):
+            fresh_spectrum_tab._generate_synthetic_signal(signal_type)
+        
+        # Check that signal was loaded
+        assert fresh_spectrum_tab.current_signal is not None
+        assert fresh_spectrum_tab.current_signal.dtype == np.float32  # kept in the generator's precision
+        assert fresh_spectrum_tab.current_sampling_rate == sampling_rate
+        assert fresh_spectrum_tab.current_metadata is not None
+    
+    @pytest.mark.mutating
+    def test_reset_all(self, fresh_spectrum_tab):
         """Test reset functionality"""
+        tab = fresh_spectrum_tab
+        
         # Set some values
-        self.tab.current_signal = np.random.randn(1000)
-        self.tab.current_sampling_rate = 250.0
-        self.tab.spectrum_data = {'frequencies': [1, 2, 3]}
+        tab.current_signal = _SIG_1024
+        tab.current_sampling_rate = 250.0
+        tab.spectrum_data = {'frequencies': [1, 2, 3]}
         
         # Reset
-        self.tab._reset_all()
+        tab._reset_all()
         
         # Check that everything is reset
-        self.assertIsNone(self.tab.current_signal)
-        self.assertIsNone(self.tab.current_sampling_rate)
-        self.assertIsNone(self.tab.spectrum_data)
-        self.assertEqual(self.tab.window_combo.currentText(), "Hann")
-        self.assertEqual(self.tab.nfft_spin.value(), 0)
-    
-    def test_plot_time_domain(self):
+        assert tab.current_signal is None
+        assert tab.current_sampling_rate is None
+        assert tab.spectrum_data is None
+        assert tab.window_combo.currentText() == "Hann"
+        assert tab.nfft_spin.value() == 0
+    
+    @pytest.mark.mutating
+    def test_plot_time_domain(self, fresh_spectrum_tab):
         """Test time domain plotting"""
         # Set up signal
-        self.tab.current_signal = np.random.randn(1000)
-        self.tab.current_sampling_rate = 250.0
+        fresh_spectrum_tab.current_signal = _SIG_1024
+        fresh_spectrum_tab.current_sampling_rate = 250.0
         
         # Plot
-        self.tab._plot_time_domain()
+        fresh_spectrum_tab._plot_time_domain()
         
         # Check that plot was created
-        self.assertEqual(len(self.tab.time_fig.axes), 1)
-    
-    def test_update_status(self):
+        assert len(fresh_spectrum_tab.time_fig.axes) == 1
+    
+    @pytest.mark.mutating
+    @pytest.mark.parametrize("message, level", [
+        ("Test message", "info"),
+        ("Success message", "success")
+    ])
+    def test_update_status(self, spectrum_tab, message, level):
         """Test status update functionality"""
-        self.tab._update_status("Test message", "info")
-        self.assertEqual(self.tab.status_label.text(), "Test message")
-        
-        self.tab._update_status("Success message", "success")
-        self.assertEqual(self.tab.status_label.text(), "Success message")
+        spectrum_tab._update_status(message, level)
+        assert spectrum_tab.status_label.text() == message
     
-    def test_analyze_spectrum_no_signal(self):
+    def test_analyze_spectrum_no_signal(self, spectrum_tab):
         """Test that analysis fails gracefully when no signal is loaded"""
         with patch('PyQt5.QtWidgets.QMessageBox.warning') as mock_warning:
-            self.tab._analyze_spectrum()
+            spectrum_tab._analyze_spectrum()
             mock_warning.assert_called_once()
     
-    def test_frequency_range_controls(self):
+    def test_frequency_range_controls(self, spectrum_tab):
         """Test frequency range spin boxes"""
-        self.assertEqual(self.tab.freq_min_spin.value(), 0.0)
-        self.assertEqual(self.tab.freq_max_spin.value(), 100.0)
-        self.assertEqual(self.tab.freq_min_spin.minimum(), 0.0)
-        self.assertEqual(self.tab.freq_max_spin.maximum(), 1000.0)
+        assert spectrum_tab.freq_min_spin.value() == 0.0
+        assert spectrum_tab.freq_max_spin.value() == 100.0
+        assert spectrum_tab.freq_min_spin.minimum() == 0.0
+        assert spectrum_tab.freq_max_spin.maximum() == 1000.0
     
-    def test_fft_size_control(self):
+    def test_fft_size_control(self, spectrum_tab):
         """Test FFT size control"""
-        self.assertEqual(self.tab.nfft_spin.value(), 0)  # Auto
-        self.assertEqual(self.tab.nfft_spin.minimum(), 0)
-        self.assertEqual(self.tab.nfft_spin.maximum(), 100000)
+        assert spectrum_tab.nfft_spin.value() == 0  # Auto
+        assert spectrum_tab.nfft_spin.minimum() == 0
+        assert spectrum_tab.nfft_spin.maximum() == 100000
     
-    def test_visualization_tabs(self):
+    def test_visualization_tabs(self, spectrum_tab):
         """Test that visualization tabs are created"""
-        self.assertEqual(self.tab.viz_tabs.count(), 4)
-        self.assertEqual(self.tab.viz_tabs.tabText(0), "Time Domain")
-        self.assertEqual(self.tab.viz_tabs.tabText(1), "Frequency Domain")
-        self.assertEqual(self.tab.viz_tabs.tabText(2), "Power Spectrum")
-        self.assertEqual(self.tab.viz_tabs.tabText(3), "Time-Frequency")
-    
-    def test_update_visualizations(self):
+        tabs = spectrum_tab.viz_tabs
+        assert [tabs.tabText(i) for i in range(tabs.count())] == [
+            "Time Domain",
+            "Frequency Domain",
+            "Power Spectrum",
+            "Time-Frequency"
+        ]
+    
+    @pytest.mark.mutating
+    def test_update_visualizations(self, fresh_spectrum_tab):
         """Test visualization update with spectrum data"""
-        # Set up signal
-        self.tab.current_signal = np.random.randn(1000)
-        self.tab.current_sampling_rate = 250.0
+        tab = fresh_spectrum_tab
         
-        # Create mock spectrum data
-        frequencies = np.linspace(0, 125, 500)
-        fft_values = np.random.randn(500) + 1j * np.random.randn(500)
-        power_spectrum = np.abs(fft_values) ** 2
+        # Set up signal
+        tab.current_signal = _SIG_1024
+        tab.current_sampling_rate = 250.0
         
+        # Mock spectrum data; the tab converts these with np.array, so arrays pass straight through
         result = {
-            'frequencies': frequencies.tolist(),
-            'fft_values': fft_values.tolist(),
-            'power_spectrum': power_spectrum.tolist()
+            'frequencies': _FREQS_513,
+            'fft_values': _FFT_513,
+            'power_spectrum': _POWER_513
         }
         
         # Update visualizations
-        self.tab._update_visualizations(result)
+        tab._update_visualizations(result)
         
         # Check that plots were updated
-        self.assertEqual(len(self.tab.freq_fig.axes), 1)
-        self.assertEqual(len(self.tab.power_fig.axes), 1)
-        self.assertEqual(len(self.tab.tf_fig.axes), 2)  # Two subplots
+        assert len(tab.freq_fig.axes) == 1
+        assert len(tab.power_fig.axes) == 1
+        assert len(tab.tf_fig.axes) == 2  # Two subplots
     
-    def test_update_results_text(self):
+    @pytest.mark.mutating
+    def test_update_results_text(self, spectrum_tab):
         """Test results text update"""
         result = {
             'dominant_frequencies': [
@@ -200,17 +211,17 @@ class TestSpectrumAnalysisTab(unittest.TestCase):
             'frequency_resolution': 0.1,
             'fft_size': 1000,
             'sampling_rate': 250.0,
-            'frequencies': np.linspace(0, 125, 500).tolist()
+            'frequencies': _FREQS_513
         }
         
-        self.tab._update_results_text(result)
+        spectrum_tab._update_results_text(result)
         
-        text = self.tab.results_text.toPlainText()
-        self.assertIn("Spectrum Analysis Results", text)
-        self.assertIn("Dominant Frequencies", text)
-        self.assertIn("10.5", text)
-        self.assertIn("Total Power", text)
+        text = spectrum_tab.results_text.toPlainText()
+        assert "Spectrum Analysis Results" in text
+        assert "Dominant Frequencies" in text
+        assert "10.5" in text
+        assert "Total Power" in text
 
 
 if __name__ == '__main__':
-    unittest.main()
+    pytest.main([__file__, '-v'])
@@ -3,119 +3,151 @@ Unit tests for Visualization Tab (Phase 13)
 Tests comprehensive visualization functionality
 """
 
-import sys
-import os
-import unittest
-from unittest.mock import Mock, patch, MagicMock
+import pytest
+from unittest.mock import DEFAULT, Mock, patch
 import numpy as np
-import pandas as pd
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from PyQt5.QtTest import QTest
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from .conftest import combo_items, dispose_tab, read_only
 
-from src.gui.tabs.visualization_tab import VisualizationTab, VisualizationWorker
+# The tests never inspect the rendered plot
+pytestmark = pytest.mark.usefixtures('unrendered_figures')
 
 
-class TestVisualizationTab(unittest.TestCase):
+# Deterministic data shared by every test
+_RNG = np.random.default_rng(0)
+_SAMPLES = _RNG.standard_normal((3, 100), dtype=np.float32)
+_SIG_1K = _RNG.standard_normal(1000, dtype=np.float32)
+_IMG_100 = _RNG.random((100, 100))
+_IMG_100_PROCESSED = _RNG.random((100, 100))
+read_only(_SAMPLES, _SIG_1K, _IMG_100, _IMG_100_PROCESSED)
+
+
+@pytest.fixture(scope="module")
+def viz_tab(qapp):
+    """Create one visualization tab shared by the module's read-only tests"""
+    from src.gui.tabs.visualization_tab import VisualizationTab
+    tab = VisualizationTab()
+    yield tab
+    dispose_tab(qapp, tab, tab.plot_fig)
+
+
+@pytest.fixture
+def reset_viz_tab(viz_tab):
+    """Lend the shared tab to a test that loads data or changes state, then restore it"""
+    yield viz_tab
+    viz_tab._reset_all()
+
+
+@pytest.fixture(scope="module")
+def xyz_frame():
+    """Three sample columns shared by the tests, none of which modify it"""
+    import pandas as pd
+    return pd.DataFrame({'x': _SAMPLES[0], 'y': _SAMPLES[1], 'z': _SAMPLES[2]})
+
+
+@pytest.fixture(scope="module")
+def timeseries_frame():
+    """Ten days of two sample metrics shared by the tests, none of which modify it"""
+    import pandas as pd
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2023-01-01', periods=10, freq='D'),
+        'metric1': _SAMPLES[0, :10],
+        'metric2': _SAMPLES[1, :10]
+    })
+
+
+@pytest.fixture(scope="module")
+def worker_cls():
+    """Import the visualization worker only when its tests run"""
+    from src.gui.tabs.visualization_tab import VisualizationWorker
+    return VisualizationWorker
+
+
+class TestVisualizationTab:
     """Test cases for VisualizationTab"""
     
-    @classmethod
-    def setUpClass(cls):
-        """Set up test class - create QApplication once"""
-        if not QApplication.instance():
-            cls.app = QApplication(sys.argv)
-        else:
-            cls.app = QApplication.instance()
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.tab = VisualizationTab()
+    @pytest.fixture(autouse=True)
+    def message_box(self):
+        """Replace the tab's message boxes for every test so none can block on a modal dialog"""
+        with patch.multiple('src.gui.tabs.visualization_tab.QMessageBox',
+                            warning=DEFAULT, information=DEFAULT, critical=DEFAULT) as boxes:
+            yield boxes
     
-    def tearDown(self):
-        """Clean up after tests"""
-        if self.tab:
-            self.tab.close()
+    @pytest.fixture(autouse=True)
+    def file_dialog(self):
+        """Replace the tab's file dialogs for every test; they report cancellation unless a test sets a path"""
+        with patch.multiple('src.gui.tabs.visualization_tab.QFileDialog',
+                            getOpenFileName=DEFAULT, getSaveFileName=DEFAULT) as dialogs:
+            dialogs['getOpenFileName'].return_value = ('', '')
+            dialogs['getSaveFileName'].return_value = ('', '')
+            yield dialogs
     
-    def test_tab_initialization(self):
+    @pytest.mark.parametrize("widget", [
+        'viz_type_combo',
+        'data_source_combo',
+        'generate_btn',
+        'export_btn',
+        'plot_canvas'
+    ])
+    def test_tab_initialization(self, viz_tab, widget):
         """Test that tab initializes correctly"""
-        self.assertIsNotNone(self.tab)
-        self.assertIsNotNone(self.tab.viz_type_combo)
-        self.assertIsNotNone(self.tab.data_source_combo)
-        self.assertIsNotNone(self.tab.generate_btn)
-        self.assertIsNotNone(self.tab.export_btn)
-        self.assertIsNotNone(self.tab.plot_canvas)
+        assert getattr(viz_tab, widget) is not None
     
-    def test_viz_type_combo_items(self):
+    def test_viz_type_combo_items(self, viz_tab):
         """Test visualization type combo box has correct items"""
-        items = [self.tab.viz_type_combo.itemText(i) 
-                for i in range(self.tab.viz_type_combo.count())]
-        expected_items = [
+        combo = viz_tab.viz_type_combo
+        assert combo_items(combo) == [
             "Time-Series Plot",
             "Scatter Plot",
             "Correlation Heatmap",
             "FFT Spectrum",
             "Image Comparison"
         ]
-        self.assertEqual(items, expected_items)
     
-    def test_data_source_combo_items(self):
+    def test_data_source_combo_items(self, viz_tab):
         """Test data source combo box has correct items"""
-        items = [self.tab.data_source_combo.itemText(i) 
-                for i in range(self.tab.data_source_combo.count())]
-        expected_items = [
+        combo = viz_tab.data_source_combo
+        assert combo_items(combo) == [
             "Load from Database",
             "Load from CSV File",
             "Load Signal File",
             "Load Image Files"
         ]
-        self.assertEqual(items, expected_items)
     
-    def test_viz_type_changed_updates_params(self):
+    @pytest.mark.mutating
+    @pytest.mark.parametrize("viz_type, controls", [
+        ("Time-Series Plot", ['timeseries_metric_combo']),
+        ("Scatter Plot", ['scatter_x_combo', 'scatter_y_combo']),
+        ("Correlation Heatmap", ['heatmap_cmap_combo']),
+        ("FFT Spectrum", ['fft_freq_min_spin', 'fft_freq_max_spin'])
+    ])
+    def test_viz_type_changed_updates_params(self, reset_viz_tab, viz_type, controls):
         """Test that changing visualization type updates parameters"""
-        # Test time-series
-        self.tab.viz_type_combo.setCurrentText("Time-Series Plot")
-        self.assertTrue(hasattr(self.tab, 'timeseries_metric_combo'))
-        
-        # Test scatter
-        self.tab.viz_type_combo.setCurrentText("Scatter Plot")
-        self.assertTrue(hasattr(self.tab, 'scatter_x_combo'))
-        self.assertTrue(hasattr(self.tab, 'scatter_y_combo'))
-        
-        # Test heatmap
-        self.tab.viz_type_combo.setCurrentText("Correlation Heatmap")
-        self.assertTrue(hasattr(self.tab, 'heatmap_cmap_combo'))
-        
-        # Test FFT
-        self.tab.viz_type_combo.setCurrentText("FFT Spectrum")
-        self.assertTrue(hasattr(self.tab, 'fft_freq_min_spin'))
-        self.assertTrue(hasattr(self.tab, 'fft_freq_max_spin'))
+        reset_viz_tab.viz_type_combo.setCurrentText(viz_type)
+        for control in controls:
+            assert hasattr(reset_viz_tab, control)
     
-    def test_load_from_csv(self):
+    @pytest.mark.mutating
+    def test_load_from_csv(self, reset_viz_tab, xyz_frame, file_dialog):
         """Test loading data from CSV file"""
-        # Create a temporary CSV file
-        test_data = pd.DataFrame({
-            'x': np.random.randn(100),
-            'y': np.random.randn(100),
-            'z': np.random.randn(100)
-        })
+        import pandas as pd
+        
+        file_dialog['getOpenFileName'].return_value = ('/tmp/test.csv', 'CSV Files (*.csv)')
         
-        with patch('src.gui.tabs.visualization_tab.QFileDialog.getOpenFileName') as mock_dialog:
-            mock_dialog.return_value = ('/tmp/test.csv', 'CSV Files (*.csv)')
+        with patch('pandas.read_csv') as mock_read:
+            mock_read.return_value = xyz_frame
             
-            with patch('pandas.read_csv') as mock_read:
-                mock_read.return_value = test_data
-                
-                self.tab._load_from_csv()
-                
-                self.assertIsNotNone(self.tab.current_data)
-                self.assertTrue(isinstance(self.tab.current_data, pd.DataFrame))
-                self.assertEqual(len(self.tab.current_data), 100)
+            reset_viz_tab._load_from_csv()
+            
+            assert reset_viz_tab.current_data is not None
+            assert isinstance(reset_viz_tab.current_data, pd.DataFrame)
+            assert len(reset_viz_tab.current_data) == 100
     
-    def test_load_from_database(self):
+    @pytest.mark.mutating
+    def test_load_from_database(self, reset_viz_tab):
         """Test loading data from database"""
+        import pandas as pd
+        
         # Create mock data
         mock_data = pd.DataFrame({
             'patient_id': [1, 2, 3],
@@ -133,196 +165,157 @@ class TestVisualizationTab(unittest.TestCase):
             with patch('src.gui.tabs.visualization_tab.DataRetriever') as mock_retriever_class:
                 mock_retriever_class.return_value = mock_retriever
                 
-                self.tab._load_from_database()
+                reset_viz_tab._load_from_database()
                 
                 # Check that data was loaded (if no error occurred)
                 # Note: This may show a message box if database is not available
                 pass
     
-    def test_update_metric_combos(self):
+    @pytest.mark.mutating
+    def test_update_metric_combos(self, reset_viz_tab):
         """Test updating metric combo boxes"""
+        tab = reset_viz_tab
         metrics = ['metric1', 'metric2', 'metric3']
         
         # Ensure scatter plot controls are created by setting visualization type
-        self.tab.viz_type_combo.setCurrentText("Scatter Plot")
+        tab.viz_type_combo.setCurrentText("Scatter Plot")
         
-        self.tab._update_metric_combos(metrics)
+        tab._update_metric_combos(metrics)
         
         # Check time-series combo (should exist from initialization)
-        if hasattr(self.tab, 'timeseries_metric_combo'):
-            self.assertEqual(self.tab.timeseries_metric_combo.count(), len(metrics) + 1)  # +1 for "All Metrics"
+        if hasattr(tab, 'timeseries_metric_combo'):
+            assert tab.timeseries_metric_combo.count() == len(metrics) + 1  # +1 for "All Metrics"
         
         # Check scatter combos (now should exist)
-        if hasattr(self.tab, 'scatter_x_combo') and hasattr(self.tab, 'scatter_y_combo'):
-            self.assertEqual(self.tab.scatter_x_combo.count(), len(metrics) + 1)  # +1 for "Select variable..."
-            self.assertEqual(self.tab.scatter_y_combo.count(), len(metrics) + 1)
-    
-    def test_generate_timeseries_no_data(self):
-        """Test generating time-series plot without data"""
-        with patch('src.gui.tabs.visualization_tab.QMessageBox.warning') as mock_warning:
-            self.tab._generate_timeseries()
-            mock_warning.assert_called_once()
+        if hasattr(tab, 'scatter_x_combo') and hasattr(tab, 'scatter_y_combo'):
+            assert tab.scatter_x_combo.count() == len(metrics) + 1  # +1 for "Select variable..."
+            assert tab.scatter_y_combo.count() == len(metrics) + 1
     
-    def test_generate_scatter_no_data(self):
-        """Test generating scatter plot without data"""
-        with patch('src.gui.tabs.visualization_tab.QMessageBox.warning') as mock_warning:
-            self.tab._generate_scatter()
-            mock_warning.assert_called_once()
+    @pytest.mark.parametrize("generator", [
+        '_generate_timeseries',
+        '_generate_scatter',
+        '_generate_heatmap',
+        '_generate_fft',
+        '_generate_image_comparison'
+    ])
+    def test_generate_no_data(self, viz_tab, generator, message_box):
+        """Test that generating a visualization without data warns the user"""
+        getattr(viz_tab, generator)()
+        message_box['warning'].assert_called_once()
     
-    def test_generate_scatter_invalid_selection(self):
+    @pytest.mark.mutating
+    def test_generate_scatter_invalid_selection(self, reset_viz_tab, xyz_frame, message_box):
         """Test generating scatter plot with invalid variable selection"""
+        tab = reset_viz_tab
+        
         # Set visualization type to Scatter Plot to create the combo boxes
-        self.tab.viz_type_combo.setCurrentText("Scatter Plot")
+        tab.viz_type_combo.setCurrentText("Scatter Plot")
         
         # Set up data
-        self.tab.current_data = pd.DataFrame({
-            'x': np.random.randn(50),
-            'y': np.random.randn(50)
-        })
-        self.tab._update_metric_combos(['x', 'y'])
+        tab.current_data = xyz_frame
+        tab._update_metric_combos(['x', 'y'])
         
         # Set invalid selection
-        if hasattr(self.tab, 'scatter_x_combo'):
-            self.tab.scatter_x_combo.setCurrentText("Select variable...")
+        if hasattr(tab, 'scatter_x_combo'):
+            tab.scatter_x_combo.setCurrentText("Select variable...")
         
-        with patch('src.gui.tabs.visualization_tab.QMessageBox.warning') as mock_warning:
-            self.tab._generate_scatter()
-            mock_warning.assert_called_once()
-    
-    def test_generate_heatmap_no_data(self):
-        """Test generating heatmap without data"""
-        with patch('src.gui.tabs.visualization_tab.QMessageBox.warning') as mock_warning:
-            self.tab._generate_heatmap()
-            mock_warning.assert_called_once()
-    
-    def test_generate_fft_no_data(self):
-        """Test generating FFT spectrum without data"""
-        with patch('src.gui.tabs.visualization_tab.QMessageBox.warning') as mock_warning:
-            self.tab._generate_fft()
-            mock_warning.assert_called_once()
+        tab._generate_scatter()
+        message_box['warning'].assert_called_once()
     
-    def test_generate_image_comparison_no_data(self):
-        """Test generating image comparison without data"""
-        with patch('src.gui.tabs.visualization_tab.QMessageBox.warning') as mock_warning:
-            self.tab._generate_image_comparison()
-            mock_warning.assert_called_once()
-    
-    def test_reset_all(self):
+    @pytest.mark.mutating
+    def test_reset_all(self, reset_viz_tab):
         """Test reset all functionality"""
+        import pandas as pd
+        
+        tab = reset_viz_tab
+        
         # Set some state
-        self.tab.current_data = pd.DataFrame({'x': [1, 2, 3]})
-        self.tab.current_figure = Mock()
+        tab.current_data = pd.DataFrame({'x': [1, 2, 3]})
+        tab.current_figure = Mock()
         
-        self.tab._reset_all()
+        tab._reset_all()
         
-        self.assertIsNone(self.tab.current_data)
-        self.assertIsNone(self.tab.current_figure)
-        self.assertEqual(self.tab.data_info_label.text(), "No data loaded")
+        assert tab.current_data is None
+        assert tab.current_figure is None
+        assert tab.data_info_label.text() == "No data loaded"
     
-    def test_update_status(self):
+    @pytest.mark.mutating
+    def test_update_status(self, reset_viz_tab):
         """Test status update functionality"""
-        self.tab._update_status("Test message", "success")
-        self.assertEqual(self.tab.status_label.text(), "Test message")
+        reset_viz_tab._update_status("Test message", "success")
+        assert reset_viz_tab.status_label.text() == "Test message"
     
-    def test_export_visualization_no_figure(self):
+    @pytest.mark.mutating
+    def test_export_visualization_no_figure(self, reset_viz_tab, message_box):
         """Test exporting visualization when no figure exists"""
-        self.tab.current_figure = None
+        reset_viz_tab.current_figure = None
         
-        with patch('src.gui.tabs.visualization_tab.QMessageBox.warning') as mock_warning:
-            self.tab._export_visualization()
-            mock_warning.assert_called_once()
+        reset_viz_tab._export_visualization()
+        message_box['warning'].assert_called_once()
     
-    def test_export_visualization_with_figure(self):
+    @pytest.mark.mutating
+    def test_export_visualization_with_figure(self, reset_viz_tab, message_box, file_dialog):
         """Test exporting visualization with a figure"""
-        # Create a mock figure
+        tab = reset_viz_tab
+        
+        # Create a mock figure; patched so the shared tab gets its real figure back
         mock_fig = Mock()
-        self.tab.current_figure = mock_fig
-        self.tab.plot_fig = Mock()
-        self.tab.plot_fig.savefig = Mock()
+        tab.current_figure = mock_fig
         
-        with patch('src.gui.tabs.visualization_tab.QFileDialog.getSaveFileName') as mock_dialog:
-            mock_dialog.return_value = ('/tmp/test.png', 'PNG Files (*.png)')
-            
-            with patch('src.gui.tabs.visualization_tab.QMessageBox.information') as mock_info:
-                self.tab._export_visualization()
-                self.tab.plot_fig.savefig.assert_called_once()
-                mock_info.assert_called_once()
+        file_dialog['getSaveFileName'].return_value = ('/tmp/test.png', 'PNG Files (*.png)')
+        
+        with patch.object(tab, 'plot_fig') as mock_plot_fig:
+            tab._export_visualization()
+            mock_plot_fig.savefig.assert_called_once()
+            message_box['information'].assert_called_once()
 
 
-class TestVisualizationWorker(unittest.TestCase):
+class TestVisualizationWorker:
     """Test cases for VisualizationWorker"""
     
-    def test_worker_initialization(self):
+    def test_worker_initialization(self, worker_cls):
         """Test worker thread initialization"""
-        worker = VisualizationWorker('time_series', data=pd.DataFrame({'x': [1, 2, 3]}))
-        self.assertEqual(worker.viz_type, 'time_series')
-        self.assertIsNotNone(worker.kwargs)
+        import pandas as pd
+        
+        worker = worker_cls('time_series', data=pd.DataFrame({'x': [1, 2, 3]}))
+        assert worker.viz_type == 'time_series'
+        assert worker.kwargs is not None
     
-    def test_worker_time_series(self):
+    def test_worker_time_series(self, worker_cls, timeseries_frame):
         """Test worker generates time-series plot"""
-        data = pd.DataFrame({
-            'timestamp': pd.date_range('2023-01-01', periods=10, freq='D'),
-            'metric1': np.random.randn(10),
-            'metric2': np.random.randn(10)
-        })
+        from src.gui.tabs import visualization_tab
+        worker = worker_cls('time_series', data=timeseries_frame, time_column='timestamp')
         
-        worker = VisualizationWorker('time_series', data=data, time_column='timestamp')
+        figures = []
+        worker.finished.connect(figures.append)
         
         # Mock the plotter to avoid actual plotting
-        with patch('src.gui.tabs.visualization_tab.TimeSeriesPlotter') as mock_plotter_class:
-            mock_plotter = Mock()
-            mock_fig = Mock()
-            mock_plotter.plot_health_metrics.return_value = mock_fig
-            mock_plotter_class.return_value = mock_plotter
-            
-            # Run worker (this will fail if not mocked properly)
-            try:
-                worker.run()
-            except Exception:
-                pass  # Expected if not fully mocked
-    
-    def test_worker_scatter(self):
-        """Test worker generates scatter plot"""
-        x_data = np.random.randn(50)
-        y_data = np.random.randn(50)
-        
-        worker = VisualizationWorker('scatter', x_data=x_data, y_data=y_data)
-        self.assertEqual(worker.viz_type, 'scatter')
-    
-    def test_worker_heatmap(self):
-        """Test worker generates heatmap"""
-        data = pd.DataFrame({
-            'x': np.random.randn(20),
-            'y': np.random.randn(20),
-            'z': np.random.randn(20)
-        })
-        
-        worker = VisualizationWorker('heatmap', data=data)
-        self.assertEqual(worker.viz_type, 'heatmap')
-    
-    def test_worker_fft_spectrum(self):
-        """Test worker generates FFT spectrum"""
-        signal_data = np.random.randn(1000)
-        sample_rate = 100.0
+        mock_plotter = Mock()
+        with patch.object(visualization_tab, 'TimeSeriesPlotter', return_value=mock_plotter):
+            worker.run()
         
-        worker = VisualizationWorker('fft_spectrum', 
-                                    signal_data=signal_data, 
-                                    sample_rate=sample_rate)
-        self.assertEqual(worker.viz_type, 'fft_spectrum')
+        mock_plotter.plot_health_metrics.assert_called_once()
+        assert mock_plotter.plot_health_metrics.call_args.kwargs['data'] is timeseries_frame
+        assert figures == [mock_plotter.plot_health_metrics.return_value]
     
-    def test_worker_image_comparison(self):
-        """Test worker generates image comparison"""
-        original = np.random.rand(100, 100)
-        processed = np.random.rand(100, 100)
+    @pytest.mark.parametrize("viz_type, kwargs", [
+        ('scatter', {'x_data': _SAMPLES[0, :50], 'y_data': _SAMPLES[1, :50]}),
+        ('heatmap', {'data': 'xyz_frame'}),
+        ('fft_spectrum', {'signal_data': _SIG_1K, 'sample_rate': 100.0}),
+        ('image_comparison', {'original': _IMG_100, 'processed': _IMG_100_PROCESSED})
+    ])
+    def test_worker_construction(self, request, worker_cls, viz_type, kwargs):
+        """Test worker stores its visualization type and inputs; string inputs name frame fixtures"""
+        kwargs = {key: request.getfixturevalue(value) if isinstance(value, str) else value
+                  for key, value in kwargs.items()}
         
-        worker = VisualizationWorker('image_comparison',
-                                    original=original,
-                                    processed=processed)
-        self.assertEqual(worker.viz_type, 'image_comparison')
+        worker = worker_cls(viz_type, **kwargs)
+        assert worker.viz_type == viz_type
+        assert all(worker.kwargs[key] is value for key, value in kwargs.items())
     
-    def test_worker_unknown_type(self):
+    def test_worker_unknown_type(self, worker_cls):
         """Test worker handles unknown visualization type"""
-        worker = VisualizationWorker('unknown_type')
+        worker = worker_cls('unknown_type')
         
         # Worker should emit error signal for unknown type (not raise exception)
         error_received = []
@@ -333,9 +326,9 @@ class TestVisualizationWorker(unittest.TestCase):
         worker.run()
         
         # Check that error was emitted
-        self.assertTrue(len(error_received) > 0)
-        self.assertIn("Unknown visualization type", error_received[0])
+        assert len(error_received) > 0
+        assert "Unknown visualization type" in error_received[0]
 
 
 if __name__ == '__main__':
-    unittest.main()
+    pytest.main([__file__, '-v'])
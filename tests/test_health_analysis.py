@@ -4,8 +4,6 @@ Tests filtering, correlation analysis, and time-series analysis
 """
 
 import pytest
-import os
-import tempfile
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -13,53 +11,35 @@ from datetime import datetime, timedelta
 from src.data_processing.filters import DataFilter
 from src.data_processing.correlation import CorrelationAnalyzer
 from src.data_processing.time_series import TimeSeriesAnalyzer
-from src.database.connection import DatabaseConnection
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_data():
-    """Create sample health data for testing"""
-    np.random.seed(42)
+    """Create sample health data shared by every test; tests that change it work on a copy"""
+    rng = np.random.default_rng(42)
     n = 100
     
     data = {
         'patient_id': np.arange(1, n + 1),
-        'systolic_bp': np.random.normal(120, 15, n),
-        'diastolic_bp': np.random.normal(80, 10, n),
-        'heart_rate': np.random.normal(72, 10, n),
-        'cholesterol': np.random.choice([1, 2, 3], n),
-        'weight': np.random.normal(70, 15, n)
+        'systolic_bp': rng.normal(120, 15, n),
+        'diastolic_bp': rng.normal(80, 10, n),
+        'heart_rate': rng.normal(72, 10, n),
+        'cholesterol': rng.choice([1, 2, 3], n),
+        'weight': rng.normal(70, 15, n)
     }
     
     return pd.DataFrame(data)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def time_series_data():
-    """Create sample time-series data"""
+    """Create sample time-series data shared by every test; tests that change it work on a copy"""
     dates = pd.date_range(start='2024-01-01', periods=50, freq='D')
-    values = 100 + np.cumsum(np.random.randn(50) * 2)
+    values = 100 + np.cumsum(np.random.default_rng(42).standard_normal(50) * 2)
     
     return pd.Series(values, index=dates, name='heart_rate')
 
 
-@pytest.fixture
-def db_connection():
-    """Create a temporary database for testing"""
-    fd, db_path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
-    
-    db_url = f'sqlite:///{db_path}'
-    db_conn = DatabaseConnection(db_url)
-    db_conn.create_tables()
-    
-    yield db_conn
-    
-    db_conn.close()
-    if os.path.exists(db_path):
-        os.remove(db_path)
-
-
 class TestDataFilter:
     """Test data filtering functionality"""
     
@@ -80,6 +60,18 @@ class TestDataFilter:
         assert len(filtered) == len(data)
         # Should handle NaN gracefully
     
+    @pytest.mark.parametrize("window_size, center", [(3, True), (4, True), (5, False), (50, True)])
+    def test_moving_average_matches_rolling_mean(self, window_size, center):
+        """Test that the moving average agrees with pandas' rolling mean, including NaN gaps and edges"""
+        data = np.random.default_rng(0).normal(120, 15, 40)
+        data[[3, 10, 11, 12, 30]] = np.nan
+        
+        filtered = DataFilter.moving_average(data, window_size=window_size, center=center)
+        
+        window = window_size + 1 if center and window_size % 2 == 0 else window_size
+        expected = pd.Series(data).rolling(window=window, center=center, min_periods=1).mean().values
+        np.testing.assert_allclose(filtered, expected)
+    
     def test_threshold_filter_min(self):
         """Test threshold filter with minimum value"""
         data = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
@@ -118,6 +110,14 @@ class TestDataFilter:
         
         assert np.sum(mask) < len(data)  # Some outliers should be removed
     
+    def test_remove_outliers_leaves_input_unchanged(self):
+        """Test that outliers are replaced in the returned array only"""
+        data = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 100], dtype=float)
+        filtered, mask = DataFilter.remove_outliers(data, method='iqr', threshold=1.5)
+        
+        assert np.isnan(filtered[~mask]).all()
+        assert data[-1] == 100
+    
     def test_savitzky_golay_filter(self):
         """Test Savitzky-Golay filter"""
         data = np.sin(np.linspace(0, 4 * np.pi, 50)) + np.random.randn(50) * 0.1
@@ -126,6 +126,16 @@ class TestDataFilter:
         assert len(filtered) == len(data)
         assert not np.any(np.isnan(filtered))
     
+    @pytest.mark.parametrize("window_length, polyorder", [(11, 3), (5, 2), (21, 4), (15, 12), (51, 6)])
+    def test_savitzky_golay_matches_scipy(self, window_length, polyorder):
+        """Test that the filter agrees with scipy's savgol_filter, edges included"""
+        from scipy.signal import savgol_filter
+        data = np.random.default_rng(0).normal(size=60)
+        
+        filtered = DataFilter.savitzky_golay_filter(data, window_length=window_length, polyorder=polyorder)
+        
+        np.testing.assert_allclose(filtered, savgol_filter(data, window_length, polyorder), atol=1e-9)
+    
     def test_apply_multiple_filters(self):
         """Test applying multiple filters in sequence"""
         data = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 100]  # 100 is an outlier
@@ -170,6 +180,65 @@ class TestCorrelationAnalyzer:
         assert 0 <= p_value <= 1
         assert sample_size > 0
     
+    @pytest.mark.parametrize("y_column", ['diastolic_bp', 'cholesterol'])
+    def test_spearman_matches_scipy(self, sample_data, y_column):
+        """Test Spearman coefficient and p-value against scipy, with and without tied ranks"""
+        from scipy.stats import spearmanr
+        analyzer = CorrelationAnalyzer()
+        
+        x = sample_data['systolic_bp']
+        y = sample_data[y_column]
+        
+        correlation, p_value, sample_size = analyzer.compute_spearman_correlation(x, y)
+        expected = spearmanr(x, y)
+        
+        assert correlation == pytest.approx(expected.statistic)
+        assert p_value == pytest.approx(expected.pvalue)
+        assert sample_size == len(sample_data)
+    
+    def test_spearman_without_pvalue(self, sample_data):
+        """Test that the p-value can be skipped for batch use"""
+        analyzer = CorrelationAnalyzer()
+        
+        x = sample_data['systolic_bp']
+        y = sample_data['diastolic_bp']
+        
+        correlation, p_value, _ = analyzer.compute_spearman_correlation(x, y, compute_pvalue=False)
+        
+        assert p_value is None
+        assert correlation == analyzer.compute_spearman_correlation(x, y)[0]
+    
+    def test_spearman_zero_variance(self):
+        """Test that a constant variable is rejected"""
+        analyzer = CorrelationAnalyzer()
+        
+        with pytest.raises(ValueError, match="zero variance"):
+            analyzer.compute_spearman_correlation([5, 5, 5, 5], [1, 2, 3, 4])
+    
+    def test_pearson_matches_scipy(self, sample_data):
+        """Test Pearson coefficient and p-value against scipy, skipping missing values"""
+        from scipy.stats import pearsonr
+        analyzer = CorrelationAnalyzer()
+        
+        x = sample_data['systolic_bp'].copy()
+        x.iloc[[4, 50]] = np.nan
+        y = sample_data['weight']
+        
+        correlation, p_value, sample_size = analyzer.compute_pearson_correlation(x, y)
+        valid = x.notna()
+        expected = pearsonr(x[valid], y[valid])
+        
+        assert correlation == pytest.approx(expected.statistic)
+        assert p_value == pytest.approx(expected.pvalue)
+        assert sample_size == len(sample_data) - 2
+    
+    def test_pearson_zero_variance(self):
+        """Test that a constant variable is rejected, even when its mean is not exact"""
+        analyzer = CorrelationAnalyzer()
+        
+        with pytest.raises(ValueError, match="zero variance"):
+            analyzer.compute_pearson_correlation([0.1] * 10, list(range(10)))
+    
     def test_correlation_matrix(self, sample_data):
         """Test correlation matrix computation"""
         analyzer = CorrelationAnalyzer()
@@ -185,6 +254,22 @@ class TestCorrelationAnalyzer:
         assert np.allclose(corr_matrix.values, corr_matrix.values.T)  # Symmetric
         assert np.all(np.diag(corr_matrix) == 1.0)  # Diagonal is 1
     
+    def test_correlation_matrix_matches_pandas(self, sample_data):
+        """Test that the correlation matrix agrees with DataFrame.corr, with and without missing values"""
+        analyzer = CorrelationAnalyzer()
+        data = sample_data.assign(constant=1.0)
+        metrics = ['systolic_bp', 'diastolic_bp', 'cholesterol', 'constant']
+        
+        with_gaps = data.copy()
+        with_gaps.loc[::7, 'heart_rate'] = np.nan
+        
+        for frame in (data, with_gaps):
+            for method in ('pearson', 'spearman'):
+                pd.testing.assert_frame_equal(
+                    analyzer.compute_correlation_matrix(frame, method=method, metrics=metrics + ['heart_rate']),
+                    frame[metrics + ['heart_rate']].corr(method=method)
+                )
+    
     def test_analyze_metric_pair(self, sample_data):
         """Test analyzing a specific metric pair"""
         analyzer = CorrelationAnalyzer()
@@ -203,9 +288,8 @@ class TestCorrelationAnalyzer:
         assert result['metric1'] == 'systolic_bp'
         assert result['metric2'] == 'diastolic_bp'
     
-    def test_analyze_metric_pair_store_in_db(self, sample_data, db_connection):
+    def test_analyze_metric_pair_store_in_db(self, sample_data, session):
         """Test analyzing and storing in database"""
-        session = db_connection.get_session()
         analyzer = CorrelationAnalyzer(session=session)
         
         result = analyzer.analyze_metric_pair(
@@ -222,8 +306,6 @@ class TestCorrelationAnalyzer:
         from src.database import crud
         stored = crud.retrieve_correlation_results(session)
         assert len(stored) > 0
-        
-        session.close()
     
     def test_analyze_multiple_pairs(self, sample_data):
         """Test analyzing multiple metric pairs"""
@@ -244,6 +326,33 @@ class TestCorrelationAnalyzer:
         assert len(results) == len(pairs)
         assert all('correlation' in r for r in results)
     
+    @pytest.mark.parametrize("method", ['pearson', 'spearman'])
+    @pytest.mark.parametrize("missing", [False, True])
+    def test_analyze_multiple_pairs_matches_single_pair(self, sample_data, method, missing):
+        """Test that batch results agree with analyzing each pair alone, including failing pairs"""
+        analyzer = CorrelationAnalyzer()
+        data = sample_data.assign(constant=1.0)
+        if missing:
+            data.loc[::9, 'heart_rate'] = np.nan
+        
+        pairs = [
+            ('systolic_bp', 'diastolic_bp'),
+            ('heart_rate', 'cholesterol'),
+            ('systolic_bp', 'constant'),
+            ('weight', 'unknown_metric')
+        ]
+        
+        results = analyzer.analyze_multiple_pairs(data, pairs, method=method)
+        
+        for (metric1, metric2), result in zip(pairs, results[:2]):
+            expected = analyzer.analyze_metric_pair(data, metric1, metric2, method=method)
+            assert result['correlation'] == pytest.approx(expected['correlation'])
+            assert result['p_value'] == pytest.approx(expected['p_value'])
+            assert result['sample_size'] == expected['sample_size']
+            assert result['method'] == method
+        assert 'zero variance' in results[2]['error']
+        assert "'unknown_metric' not found" in results[3]['error']
+    
     def test_get_correlation_summary(self, sample_data):
         """Test getting correlation summary"""
         analyzer = CorrelationAnalyzer()
@@ -259,6 +368,29 @@ class TestCorrelationAnalyzer:
         if not summary.empty:
             assert 'correlation' in summary.columns
             assert 'p_value' in summary.columns
+    
+    @pytest.mark.parametrize("method", ['pearson', 'spearman'])
+    @pytest.mark.parametrize("missing", [False, True])
+    def test_correlation_summary_matches_single_pair(self, sample_data, method, missing):
+        """Test that summary p-values and sample sizes agree with per-pair analysis"""
+        analyzer = CorrelationAnalyzer()
+        data = sample_data.copy()
+        if missing:
+            data.loc[[3, 40], 'heart_rate'] = np.nan
+        
+        summary = analyzer.get_correlation_summary(
+            data,
+            metrics=['systolic_bp', 'diastolic_bp', 'heart_rate', 'weight'],
+            method=method,
+            min_correlation=0.0
+        )
+        
+        assert len(summary) == 6
+        for row in summary.itertuples():
+            expected = analyzer.analyze_metric_pair(data, row.metric1, row.metric2, method=method)
+            assert row.correlation == pytest.approx(expected['correlation'])
+            assert row.p_value == pytest.approx(expected['p_value'])
+            assert row.sample_size == expected['sample_size']
 
 
 class TestTimeSeriesAnalyzer:
@@ -289,6 +421,16 @@ class TestTimeSeriesAnalyzer:
         assert 'r_squared' in trend
         assert 0 <= trend['r_squared'] <= 1
     
+    def test_compute_trend_linear_long_series(self):
+        """Test that a long exact line is recovered without overflow in the fit"""
+        data = pd.Series(2.0 * np.arange(200000) + 5.0)
+        
+        trend = TimeSeriesAnalyzer.compute_trend(data, method='linear')
+        
+        assert trend['slope'] == pytest.approx(2.0)
+        assert trend['intercept'] == pytest.approx(5.0)
+        assert trend['r_squared'] == pytest.approx(1.0)
+    
     def test_compute_trend_mean(self, time_series_data):
         """Test computing mean trend"""
         trend = TimeSeriesAnalyzer.compute_trend(time_series_data, method='mean')
@@ -327,6 +469,20 @@ class TestTimeSeriesAnalyzer:
         assert isinstance(mask, pd.Series)
         assert isinstance(anomalies, pd.Series)
     
+    @pytest.mark.parametrize("method, threshold", [('zscore', 3.0), ('iqr', 1.5)])
+    def test_detect_anomalies_with_gaps(self, time_series_data, method, threshold):
+        """Test that the outlier is flagged, missing values are not, and the mask keeps the data's index"""
+        data = time_series_data.copy()
+        data.iloc[25] = 1000
+        data.iloc[[3, 40]] = np.nan
+        
+        mask, anomalies = TimeSeriesAnalyzer.detect_anomalies(data, method=method, threshold=threshold)
+        
+        assert mask.index.equals(data.index)
+        assert mask.iloc[25]
+        assert not mask.iloc[[3, 40]].any()
+        assert anomalies.loc[data.index[25]] == 1000
+    
     def test_compute_statistics(self, time_series_data):
         """Test computing statistics"""
         stats = TimeSeriesAnalyzer.compute_statistics(time_series_data)
@@ -368,6 +524,17 @@ class TestTimeSeriesAnalyzer:
         assert len(roc) == len(time_series_data)
         assert pd.isna(roc.iloc[0])  # First value should be NaN
     
+    @pytest.mark.parametrize("period", [1, 3, -2, 60])
+    def test_rate_of_change_matches_pct_change(self, time_series_data, period):
+        """Test that the rate of change agrees with pandas' pct_change, including gaps and zeros"""
+        data = time_series_data.copy()
+        data.iloc[[5, 20]] = np.nan
+        data.iloc[10] = 0.0
+        
+        roc = TimeSeriesAnalyzer.compute_rate_of_change(data, period=period)
+        
+        pd.testing.assert_series_equal(roc, data.pct_change(periods=period) * 100)
+    
     def test_analyze_patient_timeseries(self):
         """Test analyzing patient time-series"""
         dates = pd.date_range(start='2024-01-01', periods=20, freq='D')
@@ -5,67 +5,40 @@ Tests image loading, processing operations, and metadata handling
 
 import pytest
 import os
-import sys
-import tempfile
 import numpy as np
 import cv2
 
-# Add project root to path
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, project_root)
-
 from src.image_processing.image_loader import ImageLoader
 from src.image_processing.processor import ImageProcessor
 from src.image_processing.metadata import ImageMetadataHandler
-from src.database.connection import DatabaseConnection
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_image():
-    """Create sample test image"""
+    """Create sample test image, read-only since every test shares it"""
     # Create a simple test image (100x100 RGB)
-    image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
+    image = np.random.default_rng(0).integers(0, 255, (100, 100, 3), dtype=np.uint8)
+    image.setflags(write=False)
     return image
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_grayscale_image():
-    """Create sample grayscale image"""
-    image = np.random.randint(0, 255, (100, 100), dtype=np.uint8)
+    """Create sample grayscale image, read-only since every test shares it"""
+    image = np.random.default_rng(1).integers(0, 255, (100, 100), dtype=np.uint8)
+    image.setflags(write=False)
     return image
 
 
-@pytest.fixture
-def test_image_file(sample_image):
-    """Create temporary image file for testing"""
-    fd, image_path = tempfile.mkstemp(suffix='.png')
-    os.close(fd)
+@pytest.fixture(scope="session")
+def test_image_file(sample_image, tmp_path_factory):
+    """Create the temporary image file once; tests only read it"""
+    image_path = str(tmp_path_factory.mktemp('images') / 'test.png')
     
     # Save image
     cv2.imwrite(image_path, cv2.cvtColor(sample_image, cv2.COLOR_RGB2BGR))
     
-    yield image_path
-    
-    if os.path.exists(image_path):
-        os.remove(image_path)
-
-
-@pytest.fixture
-def db_connection():
-    """Create a temporary database for testing"""
-    import tempfile
-    fd, db_path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
-    
-    db_url = f'sqlite:///{db_path}'
-    db_conn = DatabaseConnection(db_url)
-    db_conn.create_tables()
-    
-    yield db_conn
-    
-    db_conn.close()
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    return image_path
 
 
 class TestImageLoader:
@@ -100,24 +73,35 @@ class TestImageLoader:
         assert metadata['width'] == 50
         assert metadata['height'] == 50
     
-    def test_save_image(self, sample_image):
+    @pytest.mark.parametrize("grayscale", [False, True])
+    def test_load_jpeg_resize_reduced_decode(self, tmp_path, grayscale):
+        """Test that a JPEG decoded at reduced scale still comes back at the target size"""
+        rows, cols = np.mgrid[0:300, 0:400]
+        gradient = (rows * 0.4 + cols * 0.3).astype(np.uint8)
+        image_path = str(tmp_path / 'large.jpg')
+        cv2.imwrite(image_path, cv2.merge([gradient, gradient, gradient]))
+        
+        loader = ImageLoader()
+        image, metadata = loader.load_image(image_path, grayscale=grayscale, target_size=(100, 75))
+        full, _ = loader.load_image(image_path, grayscale=grayscale)
+        expected = cv2.resize(full, (100, 75), interpolation=cv2.INTER_AREA)
+        
+        assert image.shape[:2] == (75, 100)
+        assert metadata['is_grayscale'] is grayscale
+        assert np.abs(image.astype(int) - expected).mean() < 2
+    
+    def test_save_image(self, sample_image, tmp_path):
         """Test saving image to file"""
         loader = ImageLoader()
+        output_path = str(tmp_path / 'saved.png')
         
-        fd, output_path = tempfile.mkstemp(suffix='.png')
-        os.close(fd)
+        success = loader.save_image(sample_image, output_path)
+        assert success
+        assert os.path.exists(output_path)
         
-        try:
-            success = loader.save_image(sample_image, output_path)
-            assert success
-            assert os.path.exists(output_path)
-            
-            # Verify can load it back
-            loaded_image, _ = loader.load_image(output_path)
-            assert loaded_image.shape == sample_image.shape
-        finally:
-            if os.path.exists(output_path):
-                os.remove(output_path)
+        # Verify can load it back
+        loaded_image, _ = loader.load_image(output_path)
+        assert loaded_image.shape == sample_image.shape
     
     def test_validate_image(self, sample_image):
         """Test image validation"""
@@ -244,6 +228,14 @@ class TestImageProcessor:
         
         assert processed is not None
         assert len(processed.shape) == 2  # Should be grayscale after first operation
+    
+    def test_empty_pipeline_returns_copy(self, sample_image):
+        """Test that a pipeline with no operations still returns an independent array"""
+        processed = ImageProcessor.process_image_pipeline(sample_image, [])
+        
+        assert processed is not sample_image
+        assert processed.flags.writeable
+        assert np.array_equal(processed, sample_image)
 
 
 class TestImageMetadataHandler:
@@ -268,9 +260,8 @@ class TestImageMetadataHandler:
         assert handler._detect_image_type('/path/to/mri_scan.jpg') == 'MRI'
         assert handler._detect_image_type('/path/to/ct_scan.png') == 'CT scan'
     
-    def test_store_image_metadata(self, sample_image, test_image_file, db_connection):
+    def test_store_image_metadata(self, sample_image, test_image_file, session):
         """Test storing image metadata in database"""
-        session = db_connection.get_session()
         handler = ImageMetadataHandler(session=session)
         
         image_id = handler.store_image_metadata(
@@ -286,12 +277,9 @@ class TestImageMetadataHandler:
         images = crud.retrieve_image_metadata(session, image_id=image_id)
         assert len(images) == 1
         assert images[0].processing_method == 'grayscale'
-        
-        session.close()
     
-    def test_get_processing_history(self, sample_image, test_image_file, db_connection):
+    def test_get_processing_history(self, sample_image, test_image_file, session):
         """Test retrieving processing history"""
-        session = db_connection.get_session()
         handler = ImageMetadataHandler(session=session)
         
         # Store an image
@@ -306,17 +294,13 @@ class TestImageMetadataHandler:
         
         assert len(history) > 0
         assert history[0]['image_id'] == image_id
-        
-        session.close()
 
 
 class TestIntegration:
     """Integration tests for image processing"""
     
-    def test_load_process_store(self, test_image_file, db_connection):
+    def test_load_process_store(self, test_image_file, session):
         """Test complete workflow: load, process, store"""
-        session = db_connection.get_session()
-        
         # Load image
         loader = ImageLoader()
         image, metadata = loader.load_image(test_image_file)
@@ -335,8 +319,6 @@ class TestIntegration:
         )
         
         assert image_id > 0
-        
-        session.close()
     
     def test_process_pipeline_with_real_image(self):
         """Test processing pipeline with real image data"""
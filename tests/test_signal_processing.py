@@ -5,33 +5,27 @@ Tests signal loading, preprocessing, spectrum analysis, and signal generation
 
 import pytest
 import os
-import sys
-import tempfile
 import numpy as np
 import pandas as pd
 
-# Add project root to path
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, project_root)
-
 from src.signal_processing.signal_loader import SignalLoader
 from src.signal_processing.preprocessing import SignalPreprocessor
 from src.signal_processing.spectrum import SpectrumAnalyzer
 from src.signal_processing.signal_generator import SignalGenerator
-from src.database.connection import DatabaseConnection
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_signal():
-    """Create sample signal for testing"""
+    """Create sample signal for testing, read-only since every test shares it"""
     t = np.linspace(0, 1, 1000)
     signal = np.sin(2 * np.pi * 10 * t) + 0.5 * np.sin(2 * np.pi * 20 * t)
+    signal.setflags(write=False)
     return signal, 1000.0  # signal, sampling_rate
 
 
-@pytest.fixture
-def csv_signal_file():
-    """Create temporary CSV file with signal data"""
+@pytest.fixture(scope="session")
+def csv_signal_file(tmp_path_factory):
+    """Create the temporary CSV file with signal data once; tests only read it"""
     t = np.linspace(0, 1, 100)
     signal = np.sin(2 * np.pi * 10 * t)
     
@@ -40,32 +34,10 @@ def csv_signal_file():
         'amplitude': signal
     })
     
-    fd, csv_path = tempfile.mkstemp(suffix='.csv')
-    os.close(fd)
-    
+    csv_path = str(tmp_path_factory.mktemp('signals') / 'signal.csv')
     df.to_csv(csv_path, index=False)
     
-    yield csv_path
-    
-    if os.path.exists(csv_path):
-        os.remove(csv_path)
-
-
-@pytest.fixture
-def db_connection():
-    """Create a temporary database for testing"""
-    fd, db_path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
-    
-    db_url = f'sqlite:///{db_path}'
-    db_conn = DatabaseConnection(db_url)
-    db_conn.create_tables()
-    
-    yield db_conn
-    
-    db_conn.close()
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    return csv_path
 
 
 class TestSignalLoader:
@@ -94,25 +66,53 @@ class TestSignalLoader:
         assert sampling_rate == 1000.0
         assert metadata['sampling_rate'] == 1000.0
     
-    def test_save_signal_to_csv(self):
+    def test_save_signal_to_csv(self, tmp_path):
         """Test saving signal to CSV"""
         loader = SignalLoader()
         signal = np.sin(np.linspace(0, 2*np.pi, 100))
+        output_path = str(tmp_path / 'signal.csv')
+        
+        success = loader.save_signal_to_csv(signal, output_path, 1000.0)
+        assert success
+        assert os.path.exists(output_path)
+        
+        # Verify can load it back
+        loaded_signal, sr, _ = loader.load_signal_from_csv(output_path)
+        assert len(loaded_signal) == len(signal)
+    
+    @pytest.mark.parametrize("use_pyarrow", [False, True])
+    def test_csv_round_trip(self, tmp_path, monkeypatch, use_pyarrow):
+        """Test that saved signals load back with and without pyarrow"""
+        from src.signal_processing import signal_loader
+        if use_pyarrow:
+            pytest.importorskip('pyarrow')
+        monkeypatch.setattr(signal_loader, 'HAS_PYARROW', use_pyarrow)
+        loader = SignalLoader()
+        signal = np.random.default_rng(0).standard_normal(500)
+        output_path = str(tmp_path / 'signal.csv')
+        
+        assert loader.save_signal_to_csv(signal, output_path, 250.0)
+        loaded_signal, sr, metadata = loader.load_signal_from_csv(output_path)
+        
+        np.testing.assert_allclose(loaded_signal, signal, rtol=1e-12)
+        assert sr == pytest.approx(250.0)
+        assert metadata['amplitude_column'] == 'amplitude'
+        
+        empty_path = tmp_path / 'empty.csv'
+        empty_path.write_text('')
+        with pytest.raises(ValueError, match='empty'):
+            loader.load_signal_from_csv(str(empty_path))
+    
+    def test_parquet_requires_pyarrow(self, tmp_path, monkeypatch):
+        """Test that Parquet storage reports the missing optional dependency"""
+        from src.signal_processing import signal_loader
+        monkeypatch.setattr(signal_loader, 'HAS_PYARROW', False)
+        loader = SignalLoader()
         
-        fd, output_path = tempfile.mkstemp(suffix='.csv')
-        os.close(fd)
-        
-        try:
-            success = loader.save_signal_to_csv(signal, output_path, 1000.0)
-            assert success
-            assert os.path.exists(output_path)
-            
-            # Verify can load it back
-            loaded_signal, sr, _ = loader.load_signal_from_csv(output_path)
-            assert len(loaded_signal) == len(signal)
-        finally:
-            if os.path.exists(output_path):
-                os.remove(output_path)
+        with pytest.raises(ImportError, match='pyarrow'):
+            loader.save_signal_to_parquet(np.zeros(10), str(tmp_path / 'signal.parquet'), 250.0)
+        with pytest.raises(ImportError, match='pyarrow'):
+            loader.load_signal_from_parquet(str(tmp_path / 'signal.parquet'))
     
     def test_detect_signal_type(self):
         """Test signal type detection"""
@@ -163,6 +163,22 @@ class TestSignalPreprocessor:
         assert len(filtered) == len(signal)
         assert not np.any(np.isnan(filtered))
     
+    def test_bandpass_filter_high_order_narrow_band(self):
+        """Test that a high-order filter with a low normalized cutoff stays stable"""
+        signal, sampling_rate, _ = SignalGenerator.generate_multi_tone(
+            [0.1, 10.0, 200.0], [1.0, 1.0, 1.0], duration=10.0, sampling_rate=1000.0
+        )
+        passband, _, _ = SignalGenerator.generate_sine_wave(10.0, duration=10.0, sampling_rate=1000.0)
+        
+        filtered = SignalPreprocessor.apply_bandpass_filter(
+            signal, sampling_rate, lowcut=0.5, highcut=40.0, order=6
+        )
+        
+        # (b, a) coefficients blow up here; with SOS only the 10 Hz tone survives,
+        # compared away from the slow edge transients
+        assert np.all(np.isfinite(filtered))
+        np.testing.assert_allclose(filtered[3000:7000], passband[3000:7000], atol=0.1)
+    
     def test_lowpass_filter(self, sample_signal):
         """Test lowpass filtering"""
         signal, sampling_rate = sample_signal
@@ -184,6 +200,17 @@ class TestSignalPreprocessor:
         assert len(filtered) == len(signal)
         assert filtered[100] != 100.0  # Should be filtered
     
+    @pytest.mark.parametrize("kernel_size", [3, 4, 9])
+    def test_median_filter_matches_medfilt(self, sample_signal, kernel_size):
+        """Test that the median filter keeps scipy medfilt's zero-padded edges"""
+        from scipy.signal import medfilt
+        signal, _ = sample_signal
+        noisy_signal = signal + 10.0
+        
+        filtered = SignalPreprocessor.apply_median_filter(noisy_signal, kernel_size=kernel_size)
+        
+        np.testing.assert_array_equal(filtered, medfilt(noisy_signal, kernel_size | 1))
+    
     def test_preprocess_pipeline(self, sample_signal):
         """Test preprocessing pipeline"""
         signal, sampling_rate = sample_signal
@@ -198,6 +225,28 @@ class TestSignalPreprocessor:
         
         assert len(processed) == len(signal)
         assert not np.any(np.isnan(processed))
+    
+    @pytest.mark.parametrize("method_type", ['zscore', 'minmax'])
+    def test_preprocess_pipeline_matches_steps(self, sample_signal, method_type):
+        """Test that the pipeline matches applying its steps one by one"""
+        signal, sampling_rate = sample_signal
+        offset_signal = signal + 3.0
+        
+        steps = [
+            {'method': 'remove_dc_offset'},
+            {'method': 'normalize', 'method_type': method_type}
+        ]
+        processed = SignalPreprocessor.preprocess_pipeline(offset_signal, sampling_rate, steps)
+        
+        expected = SignalPreprocessor.normalize(
+            SignalPreprocessor.remove_dc_offset(offset_signal), method=method_type
+        )
+        np.testing.assert_allclose(processed, expected, atol=1e-12)
+        np.testing.assert_array_equal(offset_signal, signal + 3.0)  # Input untouched
+        
+        empty = SignalPreprocessor.preprocess_pipeline(offset_signal, sampling_rate, [])
+        assert empty is not offset_signal
+        np.testing.assert_array_equal(empty, offset_signal)
 
 
 class TestSpectrumAnalyzer:
@@ -214,6 +263,55 @@ class TestSpectrumAnalyzer:
         assert len(fft_values) == len(frequencies)
         assert np.all(frequencies >= 0)  # Only positive frequencies
     
+    @pytest.mark.parametrize("nfft", [None, 999, 2048])
+    @pytest.mark.parametrize("window", [None, 'hamming'])
+    def test_compute_fft_matches_full_fft(self, sample_signal, nfft, window):
+        """Test that the FFT matches the non-negative half of numpy's full FFT"""
+        signal, sampling_rate = sample_signal
+        analyzer = SpectrumAnalyzer()
+        
+        frequencies, fft_values = analyzer.compute_fft(signal, sampling_rate, window=window, nfft=nfft)
+        
+        n = nfft or len(signal)
+        windowed = signal * np.hamming(len(signal)) if window else signal
+        expected_freqs = np.fft.fftfreq(n, 1 / sampling_rate)
+        positive = expected_freqs >= 0
+        np.testing.assert_array_equal(frequencies, expected_freqs[positive])
+        np.testing.assert_allclose(fft_values, np.fft.fft(windowed, n=n)[positive], atol=1e-9)
+    
+    @pytest.mark.parametrize("window", [None, 'hann'])
+    def test_compute_fft_batch(self, window):
+        """Test that one batched FFT matches per-signal FFTs over generated signals"""
+        tones = [5.0, 10.0, 25.0, 40.0]
+        signals = np.stack([
+            SignalGenerator.generate_sine_wave(frequency, duration=1.0, sampling_rate=1000.0)[0]
+            for frequency in tones
+        ])
+        analyzer = SpectrumAnalyzer()
+        
+        frequencies, fft_values = analyzer.compute_fft_batch(signals, 1000.0, window=window)
+        power_spectrum = np.abs(fft_values) ** 2 / signals.shape[1]
+        
+        assert fft_values.shape == (len(tones), len(frequencies))
+        for signal, row in zip(signals, fft_values):
+            expected_freqs, expected = analyzer.compute_fft(signal, 1000.0, window=window)
+            np.testing.assert_array_equal(frequencies, expected_freqs)
+            np.testing.assert_allclose(row, expected, atol=1e-9)
+        np.testing.assert_allclose(frequencies[power_spectrum.argmax(axis=1)], tones)
+    
+    def test_compute_fft_batch_single_signal(self, sample_signal):
+        """Test batching a single signal as a one-row stack"""
+        signal, sampling_rate = sample_signal
+        analyzer = SpectrumAnalyzer()
+        
+        frequencies, fft_values = analyzer.compute_fft_batch(signal[None, :], sampling_rate)
+        
+        assert fft_values.shape == (1, len(frequencies))
+        np.testing.assert_allclose(fft_values[0], analyzer.compute_fft(signal, sampling_rate)[1], atol=1e-9)
+        
+        with pytest.raises(ValueError):
+            analyzer.compute_fft_batch(signal, sampling_rate)
+    
     def test_compute_power_spectrum(self, sample_signal):
         """Test power spectrum computation"""
         signal, sampling_rate = sample_signal
@@ -277,6 +375,18 @@ class TestSignalGenerator:
         assert metadata['heart_rate'] == 72.0
         assert metadata['duration'] == 2.0
     
+    def test_generate_ecg_r_peaks(self):
+        """Test that a noiseless ECG peaks at the R wave of every beat"""
+        signal, sampling_rate, _ = SignalGenerator.generate_ecg(
+            duration=3.0, sampling_rate=1000.0, heart_rate=60.0,
+            noise_level=0.0, add_baseline_wander=False
+        )
+        
+        # One beat per second, R wave centred 0.18 of the way through the cycle
+        peaks = [np.argmax(signal[start:start + 1000]) for start in range(0, len(signal), 1000)]
+        assert peaks == [180, 180, 180]
+        assert signal.max() == pytest.approx(1.0)
+    
     def test_generate_eeg(self):
         """Test EEG signal generation"""
         signal, sampling_rate, metadata = SignalGenerator.generate_eeg(
@@ -311,6 +421,27 @@ class TestSignalGenerator:
         assert len(signal) > 0
         assert metadata['frequencies'] == frequencies
         assert metadata['amplitudes'] == amplitudes
+    
+    def test_generate_multi_tone_sums_sine_waves(self):
+        """Test that a multi-tone signal is the sum of its sine waves"""
+        frequencies = [5.0, 12.5, 40.0]
+        amplitudes = [1.0, 0.5, 0.25]
+        
+        signal, _, _ = SignalGenerator.generate_multi_tone(
+            frequencies, amplitudes, duration=2.0, sampling_rate=500.0
+        )
+        
+        expected = sum(
+            SignalGenerator.generate_sine_wave(freq, duration=2.0, sampling_rate=500.0, amplitude=amp)[0]
+            for freq, amp in zip(frequencies, amplitudes)
+        )
+        np.testing.assert_allclose(signal, expected, atol=1e-12)
+        
+        t = np.arange(0, 2.0, 1/500.0)
+        shifted, _, _ = SignalGenerator.generate_sine_wave(
+            5.0, duration=2.0, sampling_rate=500.0, amplitude=2.0, phase=0.5
+        )
+        np.testing.assert_allclose(shifted, 2.0 * np.sin(2 * np.pi * 5.0 * t + 0.5), atol=1e-12)
 
 
 class TestIntegration:
@@ -358,13 +489,16 @@ class TestIntegration:
         assert 'power_spectrum' in result
         assert len(result['frequencies']) > 0
     
-    def test_database_integration(self, db_connection):
+    def test_database_integration(self, session, tmp_path, monkeypatch):
         """Test spectrum analysis with database storage"""
+        # Keep the frequency data out of data/processed; parallel workers would share it
+        from src.signal_processing import spectrum
+        monkeypatch.setattr(spectrum, 'SPECTRUM_OUTPUT_DIR', str(tmp_path))
+        
         # Generate signal
         signal, sampling_rate, _ = SignalGenerator.generate_ecg(duration=2.0)
         
         # Create signal record in database
-        session = db_connection.get_session()
         from src.database import crud
         
         signal_record = crud.insert_biomedical_signal(
@@ -388,5 +522,31 @@ class TestIntegration:
         from src.database import crud
         analyses = crud.retrieve_spectrum_analyses(session, signal_id=signal_record.signal_id)
         assert len(analyses) > 0
+        assert (tmp_path / f'spectrum_signal_{signal_record.signal_id}.csv').exists()
+    
+    def test_parquet_signal_database_round_trip(self, session, tmp_path):
+        """Test storing samples as Parquet and loading them back through the database path"""
+        pytest.importorskip('pyarrow')
+        from src.database import crud
+        signal, sampling_rate, _ = SignalGenerator.generate_ecg(duration=2.0)
+        loader = SignalLoader()
+        parquet_path = str(tmp_path / 'ecg.parquet')
         
-        session.close()
+        assert loader.save_signal_to_parquet(signal, parquet_path, sampling_rate)
+        signal_record = crud.insert_biomedical_signal(
+            session=session,
+            signal_type='ECG',
+            signal_data_path=parquet_path,
+            sampling_rate=sampling_rate,
+            duration=2.0
+        )
+        session.commit()
+        
+        loaded_signal, loaded_rate, metadata = loader.load_signal_from_parquet(
+            signal_record.signal_data_path
+        )
+        
+        np.testing.assert_array_equal(loaded_signal, signal)
+        assert loaded_rate == sampling_rate
+        assert metadata['signal_length'] == len(signal)
+        assert not loaded_signal.flags.owndata  # Zero-copy view of the Arrow buffer
@@ -5,15 +5,10 @@ Tests all plotting functionality
 
 import pytest
 import os
-import sys
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-# Add project root to path
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, project_root)
-
 # Set matplotlib backend before importing
 import matplotlib
 matplotlib.use('Agg')
@@ -25,33 +20,40 @@ from src.visualization.spectrum_plot import SpectrumPlotter
 from src.visualization.image_viewer import ImageViewer
 from src.visualization.utils import VisualizationUtils
 
+# The tests check the returned figures and saved files, never their layout
+pytestmark = pytest.mark.usefixtures('unrendered_figures')
+
 
 @pytest.fixture
 def sample_time_series_data():
     """Create sample time-series data"""
+    rng = np.random.default_rng(0)
     dates = pd.date_range(start='2024-01-01', periods=100, freq='D')
     return pd.DataFrame({
         'timestamp': dates,
-        'heart_rate': np.random.randint(60, 100, 100),
-        'blood_pressure': np.random.randint(110, 140, 100),
-        'temperature': np.random.uniform(36.5, 37.5, 100)
+        'heart_rate': rng.integers(60, 100, 100),
+        'blood_pressure': rng.integers(110, 140, 100),
+        'temperature': rng.uniform(36.5, 37.5, 100)
     })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_signal():
-    """Create sample signal for FFT testing"""
+    """Create sample signal for FFT testing, read-only since every test shares it"""
     sample_rate = 1000
     duration = 1.0
     t = np.linspace(0, duration, int(sample_rate * duration))
     signal_data = np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t)
+    signal_data.setflags(write=False)
     return signal_data, sample_rate
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_image():
-    """Create sample image"""
-    return np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
+    """Create sample image, read-only since every test shares it"""
+    image = np.random.default_rng(0).integers(0, 255, (100, 100, 3), dtype=np.uint8)
+    image.setflags(write=False)
+    return image
 
 
 class TestTimeSeriesPlotter:
@@ -78,6 +80,25 @@ class TestTimeSeriesPlotter:
         )
         assert fig is not None
     
+    def test_reuse_figures(self, sample_time_series_data, tmp_path):
+        """Test released figures are recycled between batch calls"""
+        plotter = TimeSeriesPlotter(reuse_figures=True)
+        first = plotter.plot_single_metric(
+            sample_time_series_data['timestamp'],
+            sample_time_series_data['heart_rate'].values,
+            show_plot=False
+        )
+        save_path = tmp_path / 'second.png'
+        second = plotter.plot_single_metric(
+            sample_time_series_data['timestamp'],
+            sample_time_series_data['temperature'].values,
+            save_path=str(save_path),
+            show_plot=False
+        )
+        assert second is first
+        assert len(second.axes) == 1
+        assert save_path.exists()
+    
     def test_plot_with_statistics(self, sample_time_series_data):
         """Test plotting with statistics"""
         plotter = TimeSeriesPlotter()
@@ -96,8 +117,8 @@ class TestScatterPlotter:
     def test_plot_correlation(self):
         """Test correlation scatter plot"""
         plotter = ScatterPlotter()
-        x_data = np.random.randn(100)
-        y_data = x_data + np.random.randn(100) * 0.5
+        x_data, noise = np.random.default_rng(0).standard_normal((2, 100))
+        y_data = x_data + noise * 0.5
         fig = plotter.plot_correlation(
             x_data, y_data,
             x_label='Variable X',
@@ -109,11 +130,9 @@ class TestScatterPlotter:
     def test_plot_from_dataframe(self):
         """Test scatter plot from DataFrame"""
         plotter = ScatterPlotter()
-        df = pd.DataFrame({
-            'x': np.random.randn(100),
-            'y': np.random.randn(100),
-            'color': np.random.randint(0, 3, 100)
-        })
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.standard_normal((100, 2)), columns=['x', 'y'])
+        df['color'] = rng.integers(0, 3, 100)
         fig = plotter.plot_from_dataframe(
             df, 'x', 'y', color_column='color',
             show_plot=False
@@ -123,8 +142,8 @@ class TestScatterPlotter:
     def test_plot_with_regression(self):
         """Test scatter plot with regression"""
         plotter = ScatterPlotter()
-        x_data = np.random.randn(100)
-        y_data = 2 * x_data + np.random.randn(100) * 0.5
+        x_data, noise = np.random.default_rng(0).standard_normal((2, 100))
+        y_data = 2 * x_data + noise * 0.5
         fig = plotter.plot_with_regression(
             x_data, y_data,
             regression_type='linear',
@@ -139,18 +158,17 @@ class TestHeatmapPlotter:
     def test_plot_correlation_matrix(self):
         """Test correlation matrix heatmap"""
         plotter = HeatmapPlotter()
-        data = pd.DataFrame({
-            'var1': np.random.randn(100),
-            'var2': np.random.randn(100),
-            'var3': np.random.randn(100)
-        })
+        data = pd.DataFrame(
+            np.random.default_rng(0).standard_normal((100, 3)),
+            columns=['var1', 'var2', 'var3']
+        )
         fig = plotter.plot_correlation_matrix(data, show_plot=False)
         assert fig is not None
     
     def test_plot_data_heatmap(self):
         """Test general data heatmap"""
         plotter = HeatmapPlotter()
-        data = np.random.rand(10, 10)
+        data = np.random.default_rng(0).random((10, 10))
         fig = plotter.plot_data_heatmap(data, show_plot=False)
         assert fig is not None
 
@@ -179,6 +197,13 @@ class TestSpectrumPlotter:
         )
         assert fig is not None
     
+    def test_welch_window_is_cached(self):
+        """Test Welch window is generated once per segment length"""
+        from src.visualization.spectrum_plot import _hann_window
+        window = _hann_window(250)
+        assert _hann_window(250) is window
+        assert not window.flags.writeable
+    
     def test_plot_time_frequency(self, sample_signal):
         """Test time-frequency plot"""
         plotter = SpectrumPlotter()
@@ -238,21 +263,64 @@ class TestVisualizationUtils:
         assert '1.00K' in VisualizationUtils.format_large_numbers(1000)
         assert '1.00M' in VisualizationUtils.format_large_numbers(1000000)
     
-    def test_save_figure(self):
+    def test_finalize_saves_and_closes(self, tmp_path):
+        """Test finalize saves the figure and releases it from pyplot"""
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots()
+        ax.plot([1, 2, 3], [1, 2, 3])
+        save_path = tmp_path / 'plot.png'
+        
+        result = VisualizationUtils.finalize(fig, str(save_path), show_plot=False)
+        
+        assert result is fig
+        assert save_path.exists()
+        assert fig.number not in plt.get_fignums()
+    
+    def test_finalize_keeps_backend(self, monkeypatch):
+        """Test closing a batch plot never switches the backend for later shown plots"""
+        import matplotlib.pyplot as plt
+        
+        def fail_use(*args, **kwargs):
+            raise AssertionError("finalize switched the matplotlib backend")
+        
+        # Pretend a GUI backend is active, as it is when the app runs
+        monkeypatch.setattr(matplotlib, 'get_backend', lambda: 'QtAgg')
+        monkeypatch.setattr(matplotlib, 'use', fail_use)
+        fig, _ = plt.subplots()
+        
+        VisualizationUtils.finalize(fig, None, show_plot=False)
+        
+        assert fig.number not in plt.get_fignums()
+    
+    def test_batch_plots_bypass_pyplot(self, sample_signal, tmp_path, monkeypatch):
+        """Test plots made with show_plot=False never go through pyplot but still save"""
+        import matplotlib.pyplot as plt
+        
+        def fail_subplots(*args, **kwargs):
+            raise AssertionError("batch plot created a pyplot figure")
+        
+        monkeypatch.setattr(plt, 'subplots', fail_subplots)
+        signal_data, sample_rate = sample_signal
+        save_path = tmp_path / 'spectrum.png'
+        
+        fig = SpectrumPlotter().plot_fft_spectrum(
+            signal_data, sample_rate, save_path=str(save_path), show_plot=False
+        )
+        
+        assert len(fig.axes) == 1
+        assert save_path.exists()
+    
+    def test_save_figure(self, tmp_path):
         """Test figure saving"""
         import matplotlib.pyplot as plt
         fig, ax = plt.subplots()
         ax.plot([1, 2, 3], [1, 2, 3])
         
-        import tempfile
-        fd, temp_path = tempfile.mkstemp(suffix='.png')
-        os.close(fd)
+        base_path = str(tmp_path / 'figure')
         
         try:
-            success = VisualizationUtils.save_figure(fig, temp_path.replace('.png', ''), formats=['png'])
+            success = VisualizationUtils.save_figure(fig, base_path, formats=['png'])
             assert success
-            assert os.path.exists(f'{temp_path.replace(".png", "")}.png')
+            assert os.path.exists(f'{base_path}.png')
         finally:
-            if os.path.exists(f'{temp_path.replace(".png", "")}.png'):
-                os.remove(f'{temp_path.replace(".png", "")}.png')
             plt.close(fig)